@@ -0,0 +1,73 @@
+"""Compare evaluating expressions as parsed with evaluating them after optimization.
+
+    python -m benchmarks.expression_eval [--number 100000] [expression ...]
+
+For each expression, both versions are called on the same random letter values, and
+the best time per call of several runs is reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import timeit
+from collections.abc import Callable, Sequence
+
+from solver import EquationParser, Evaluator
+from solver.expression_optimizer import optimize, to_python
+
+EXPRESSIONS = (
+    '2AB(C+D) - AB',
+    'A^2 + 2AB + B^2',
+    '(A+B)^3 - (A-B)^3',
+    '√(A^2 + B^2) + (A+B)^2',
+    '(AB - C)(AB + C) + D!',
+    'A(B+C)(B+C) - 3*4*A',
+    '√(ABC) + (A+B+C)^2 - ABC',
+)
+
+
+def _compile(source: str, variables: Sequence[str]) -> Callable:
+    my_globals = {'fact': Evaluator.factorial, 'sqrt': Evaluator.sqrt, 'math': math}
+    return eval(f"lambda {', '.join(variables)}: {source}", my_globals)
+
+
+def _time(function: Callable, arguments: list[tuple[int, ...]], number: int) -> float:
+    def run() -> None:
+        for args in arguments:
+            try:  # noqa: SIM105 -- contextlib.suppress would dominate the timing
+                function(*args)
+            except ArithmeticError:
+                pass
+
+    repeats = max(1, number // len(arguments))
+    best = min(timeit.repeat(run, number=repeats, repeat=5))
+    return best / (repeats * len(arguments))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100_000,
+                        help='calls per run of each version')
+    parser.add_argument('expressions', nargs='*', default=EXPRESSIONS)
+    args = parser.parse_args(argv)
+
+    equation_parser = EquationParser()
+    rng = random.Random(1)
+    print(f'{"expression":<32} {"before":>10} {"after":>10} {"speedup":>8}')
+    for expression in args.expressions:
+        for parse in equation_parser.parse(expression):
+            variables = sorted(parse.vars())
+            before = _compile(parse.to_string(set(), False), variables)
+            after = _compile(to_python(optimize(parse.expression)), variables)
+            arguments = [tuple(rng.randint(1, 99) for _ in variables) for _ in range(1000)]
+            before_time = _time(before, arguments, args.number)
+            after_time = _time(after, arguments, args.number)
+            print(f'{expression:<32} {before_time * 1e9:8.0f}ns {after_time * 1e9:8.0f}ns '
+                  f'{before_time / after_time:7.2f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
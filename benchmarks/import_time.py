@@ -0,0 +1,96 @@
+"""Measure how long it takes to import the solver package, and check it against a budget.
+
+    python -m benchmarks.import_time [--repeat 7] [--scale 1.0]
+
+Each scenario runs in a fresh interpreter, and the best of several runs is reported.
+The budgets are for a warm bytecode cache; use --scale on slow machines.  The exit
+status is non-zero if any scenario is over budget, or imports a module it shouldn't.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that are expensive to import, and only needed by some code paths.
+HEAVY_MODULES = (
+    'lark',
+    'matplotlib',
+    'more_itertools',
+    'multiprocessing',
+    'numpy',
+    'rich',
+    'solver.equation_parser_prebuilt',
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    code: str
+    budget_ms: float
+    # Heavy modules this scenario is allowed to load.
+    allowed: frozenset[str] = frozenset()
+
+
+SCENARIOS = (
+    Scenario('import solver', 'import solver', 25),
+    Scenario('DancingLinks', 'from solver import DancingLinks', 60),
+    Scenario('ConstraintSolver', 'from solver import Clue, ConstraintSolver, generators', 60),
+    Scenario('Evaluator', "from solver import Evaluator; Evaluator.create_evaluator('A+B')",
+             150, frozenset({'solver.equation_parser_prebuilt'})),
+)
+
+_PROBE = """
+import sys, time, json
+heavy = {heavy!r}
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in heavy if m in sys.modules]]))
+"""
+
+
+def measure(scenario: Scenario) -> tuple[float, list[str]]:
+    """Return the import time in seconds, and the heavy modules that were loaded."""
+    probe = _PROBE.format(heavy=HEAVY_MODULES, code=scenario.code)
+    output = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    elapsed, loaded = json.loads(output.splitlines()[-1])
+    return elapsed, loaded
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiply every budget by this factor')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for scenario in SCENARIOS:
+        # Run once to warm the bytecode cache, then take the best of the rest.
+        measure(scenario)
+        results = [measure(scenario) for _ in range(args.repeat)]
+        best = min(elapsed for elapsed, _ in results) * 1000
+        unexpected = sorted(set(results[0][1]) - scenario.allowed)
+        budget = scenario.budget_ms * args.scale
+        status = 'ok'
+        if best > budget:
+            status = 'OVER BUDGET'
+        if unexpected:
+            status = f'IMPORTS {", ".join(unexpected)}'
+        failed |= status != 'ok'
+        print(f'{scenario.name:<20} {best:8.1f} ms   budget {budget:6.1f} ms   {status}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""Discovery of the runnable puzzles under listener/ and magpie/."""
+
+from __future__ import annotations
+
+import ast
+import importlib.util
+import json
+import sys
+import warnings
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPUS_DIRECTORIES = ('listener', 'magpie')
+TAGS_FILE = Path(__file__).resolve().parent / 'tags.json'
+
+
+@dataclass(frozen=True)
+class PuzzleEntry:
+    """A single runnable puzzle.
+
+    The id is "<directory>/<file stem>" for a module-level run(), and
+    "<directory>/<file stem>::<class name>" for a class with a run() class or static
+    method.
+    """
+    id: str
+    path: Path
+    class_name: str | None
+    tags: frozenset[str]
+
+    def load(self) -> Callable[[], object]:
+        """Import the puzzle's module and return its run() callable."""
+        module = _import_path(self.path)
+        owner = getattr(module, self.class_name) if self.class_name else module
+        return owner.run
+
+
+def discover(directories: Sequence[str] = CORPUS_DIRECTORIES,
+             tags_file: Path | None = TAGS_FILE) -> list[PuzzleEntry]:
+    """Find every puzzle in the given directories, without importing any of them.
+
+    Classes that define run() as a classmethod or staticmethod are preferred; a
+    module-level run() is used only when the module has no such class.  Runners that
+    need arguments are skipped.  Every entry
+    is tagged with its directory, plus any tags listed for it in the tags file.
+    """
+    extra_tags: dict[str, list[str]] = {}
+    if tags_file is not None and tags_file.exists():
+        extra_tags = json.loads(tags_file.read_text())
+    result = []
+    for directory in directories:
+        for path in sorted((ROOT / directory).glob('*.py')):
+            if path.name == '__init__.py':
+                continue
+            for puzzle_id, class_name in _find_runners(directory, path):
+                tags = frozenset((directory, *extra_tags.get(puzzle_id, ())))
+                result.append(PuzzleEntry(puzzle_id, path, class_name, tags))
+    return result
+
+
+def select(entries: Iterable[PuzzleEntry], *, tags: Sequence[str] = (),
+           exclude_tags: Sequence[str] = (), pattern: str | None = None
+           ) -> list[PuzzleEntry]:
+    """Keep the entries having all of tags, none of exclude_tags, and matching pattern."""
+    return [entry for entry in entries
+            if entry.tags.issuperset(tags)
+            and entry.tags.isdisjoint(exclude_tags)
+            and (pattern is None or pattern.lower() in entry.id.lower())]
+
+
+def _find_runners(directory: str, path: Path) -> list[tuple[str, str | None]]:
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', SyntaxWarning)
+            tree = ast.parse(path.read_text(), filename=str(path))
+    except SyntaxError:
+        return []
+    stem = f'{directory}/{path.stem}'
+    classes = [node.name for node in tree.body
+               if isinstance(node, ast.ClassDef) and _has_class_level_run(node)]
+    if classes:
+        return [(f'{stem}::{name}', name) for name in classes]
+    if any(isinstance(node, ast.FunctionDef) and node.name == 'run'
+           and _required_arguments(node) == 0
+           for node in tree.body):
+        return [(stem, None)]
+    return []
+
+
+def _has_class_level_run(node: ast.ClassDef) -> bool:
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef) and item.name == 'run':
+            decorators = {d.id for d in item.decorator_list if isinstance(d, ast.Name)}
+            if 'classmethod' in decorators:
+                return _required_arguments(item) == 1
+            if 'staticmethod' in decorators:
+                return _required_arguments(item) == 0
+            return False
+    return False
+
+
+def _required_arguments(function: ast.FunctionDef) -> int:
+    arguments = function.args
+    positional = len(arguments.posonlyargs) + len(arguments.args) - len(arguments.defaults)
+    keyword = sum(default is None for default in arguments.kw_defaults)
+    return positional + keyword
+
+
+def _import_path(path: Path) -> ModuleType:
+    # Puzzle file names aren't valid module names, so import them by location.
+    name = f'_puzzle_{path.parent.name}_{path.stem}'.replace('-', '_').replace('.', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
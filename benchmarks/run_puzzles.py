@@ -0,0 +1,276 @@
+"""Run the puzzle corpus and compare the timings against a stored baseline.
+
+    python -m benchmarks.run_puzzles --tag fast --output bench_results.json
+    python -m benchmarks.run_puzzles --baseline bench_results.json --output new.json
+
+Each puzzle runs in a fresh process with plotting disabled and its output discarded.
+We record the wall time of run(), the search steps and solutions reported by the
+solvers, and the peak RSS of the process.  Puzzles that exceed the timeout are killed.
+
+Every puzzle is tagged with its directory.  benchmarks/tags.json adds "fast" (under
+two seconds), "slow" (over ten seconds) and "broken" (currently fails to run), so CI
+can use "--tag fast" and an overnight run "--exclude-tag broken".
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import signal
+import sys
+import time
+import traceback
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+
+from .puzzle_corpus import PuzzleEntry, discover, select
+
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_THRESHOLD = 0.25
+# Changes in wall time smaller than this are noise, whatever the ratio.
+MIN_SIGNIFICANT_SECONDS = 0.05
+
+
+@dataclass
+class PuzzleResult:
+    status: str  # "ok", "error", or "timeout"
+    wall: float
+    steps: int = 0
+    solutions: int = 0
+    peak_rss: int = 0
+    error: str | None = None
+
+
+@dataclass
+class _Counters:
+    steps: int = 0
+    solutions: int = 0
+
+
+def _install_instrumentation(counters: _Counters) -> None:
+    """Collect the step/solution counts reported by the solvers."""
+    from solver.constraint_solver import ConstraintSolver
+    from solver.dancing_links.dancing_links_common import DancingLinksBase
+    from solver.equation_solver import EquationSolver
+
+    print_solve_summary = DancingLinksBase._print_solve_summary
+
+    def dl_summary(self, steps, solutions, elapsed):
+        counters.steps += steps
+        counters.solutions += solutions
+        print_solve_summary(self, steps, solutions, elapsed)
+
+    DancingLinksBase._print_solve_summary = dl_summary
+
+    constraint_solve = ConstraintSolver.solve
+
+    def constraint_solver_solve(self, *args, **kwargs):
+        try:
+            return constraint_solve(self, *args, **kwargs)
+        finally:
+            counters.steps += getattr(self, '_step_count', 0)
+            counters.solutions += getattr(self, '_solution_count', 0)
+
+    ConstraintSolver.solve = constraint_solver_solve
+
+    equation_solve = EquationSolver.solve
+
+    def equation_solver_solve(self, *args, **kwargs):
+        try:
+            return equation_solve(self, *args, **kwargs)
+        finally:
+            counters.steps += getattr(self, '_step_count', 0)
+            counters.solutions += len(getattr(self, '_solutions', ()))
+
+    EquationSolver.solve = equation_solver_solve
+
+
+def _run_puzzle(entry: PuzzleEntry, connection: Connection) -> None:
+    """Worker process body.  Sends a PuzzleResult back through the connection."""
+    # Solutions aren't drawn or printed; puzzles that plot by hand get a quiet backend.
+    os.environ['PUZZLE_SOLVER_HEADLESS'] = 'none'
+    os.environ['MPLBACKEND'] = 'Agg'
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    # Puzzles open their data files relative to their own directory.
+    os.chdir(entry.path.parent)
+    if hasattr(os, 'setpgrp'):
+        # Lets the parent kill any processes the puzzle starts, too.
+        os.setpgrp()
+    counters = _Counters()
+    start = time.perf_counter()
+    try:
+        _install_instrumentation(counters)
+        with (Path(os.devnull).open('w') as devnull,
+              contextlib.redirect_stdout(devnull)):
+            runner = entry.load()
+            start = time.perf_counter()
+            runner()
+        status, error = 'ok', None
+    except BaseException:  # Puzzles occasionally call sys.exit()
+        status, error = 'error', traceback.format_exc(limit=5)
+    wall = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    connection.send(PuzzleResult(status, wall, counters.steps, counters.solutions,
+                                 peak_rss, error))
+    connection.close()
+
+
+def run_all(entries: Sequence[PuzzleEntry], *, jobs: int, timeout: float,
+            verbose: bool = True) -> dict[str, PuzzleResult]:
+    """Run the entries, at most jobs at a time, each in its own fresh process."""
+    context = multiprocessing.get_context('spawn')
+    pending = deque(entries)
+    running: dict[Connection, tuple[PuzzleEntry, multiprocessing.Process, float]] = {}
+    results: dict[str, PuzzleResult] = {}
+
+    def finish(entry: PuzzleEntry, result: PuzzleResult) -> None:
+        results[entry.id] = result
+        if verbose:
+            print(f'[{len(results)}/{len(entries)}] {entry.id}: {result.status} '
+                  f'{result.wall:.2f}s', file=sys.stderr)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            entry = pending.popleft()
+            receiver, sender = context.Pipe(duplex=False)
+            # Not a daemon, since some puzzles use multiprocessing themselves.
+            process = context.Process(target=_run_puzzle, args=(entry, sender))
+            process.start()
+            sender.close()
+            running[receiver] = entry, process, time.perf_counter()
+
+        now = time.perf_counter()
+        next_deadline = min(started + timeout for _, _, started in running.values())
+        for receiver in wait(list(running), timeout=max(0.0, next_deadline - now)):
+            entry, process, started = running.pop(receiver)
+            try:
+                result = receiver.recv()
+            except EOFError:
+                result = PuzzleResult('error', time.perf_counter() - started,
+                                      error=f'worker exited with code {process.exitcode}')
+            process.join()
+            finish(entry, result)
+
+        now = time.perf_counter()
+        for receiver, (entry, process, started) in list(running.items()):
+            if now - started >= timeout:
+                _kill(process)
+                del running[receiver]
+                finish(entry, PuzzleResult('timeout', now - started))
+    return results
+
+
+def _kill(process: multiprocessing.Process) -> None:
+    if hasattr(os, 'killpg') and process.pid is not None:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGKILL)
+    process.kill()
+    process.join()
+
+
+def write_results(path: Path, results: dict[str, PuzzleResult]) -> None:
+    data = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {key: asdict(value) for key, value in sorted(results.items())},
+    }
+    path.write_text(json.dumps(data, indent=2) + '\n')
+
+
+def read_results(path: Path) -> dict[str, PuzzleResult]:
+    data = json.loads(path.read_text())
+    return {key: PuzzleResult(**value) for key, value in data['results'].items()}
+
+
+def compare(results: dict[str, PuzzleResult], baseline: dict[str, PuzzleResult],
+            threshold: float = DEFAULT_THRESHOLD) -> list[tuple[str, str]]:
+    """Return (puzzle id, description) for every regression against the baseline.
+
+    A regression is a puzzle that newly fails or times out, whose solution count
+    changed, or whose wall time grew by more than the threshold fraction.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        old = baseline.get(key)
+        if old is None or old.status != 'ok':
+            continue
+        if result.status != 'ok':
+            regressions.append((key, f'was ok, now {result.status}'))
+        elif result.solutions != old.solutions:
+            regressions.append((key, f'solutions {old.solutions} -> {result.solutions}'))
+        elif (result.wall > old.wall * (1 + threshold)
+              and result.wall - old.wall > MIN_SIGNIFICANT_SECONDS):
+            regressions.append((key, f'time {old.wall:.2f}s -> {result.wall:.2f}s'))
+    return regressions
+
+
+def print_comparison(results: dict[str, PuzzleResult],
+                     baseline: dict[str, PuzzleResult]) -> None:
+    from rich import print as rprint
+    from rich.table import Table
+
+    table = Table(title='Puzzle benchmark')
+    for column in ('Puzzle', 'Status', 'Time', 'Δ time', 'Steps', 'Δ steps', 'Peak RSS'):
+        table.add_column(column, justify='left' if column == 'Puzzle' else 'right')
+    for key, result in sorted(results.items()):
+        old = baseline.get(key)
+        delta_time = delta_steps = ''
+        if old is not None and old.status == 'ok' and result.status == 'ok':
+            if old.wall > 0:
+                delta_time = f'{(result.wall / old.wall - 1) * 100:+.0f}%'
+            if result.steps != old.steps:
+                delta_steps = f'{result.steps - old.steps:+,}'
+        table.add_row(key, result.status, f'{result.wall:.2f}s', delta_time,
+                      f'{result.steps:,}', delta_steps, f'{result.peak_rss >> 20} MiB')
+    rprint(table)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='seconds allowed per puzzle')
+    parser.add_argument('--tag', action='append', default=[],
+                        help='only run puzzles having this tag (repeatable)')
+    parser.add_argument('--exclude-tag', action='append', default=[],
+                        help='skip puzzles having this tag (repeatable)')
+    parser.add_argument('-k', dest='pattern', help='only run puzzles whose id contains this')
+    parser.add_argument('--output', type=Path, default=Path('bench_results.json'))
+    parser.add_argument('--baseline', type=Path,
+                        help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fractional slowdown reported as a regression')
+    parser.add_argument('--list', action='store_true', help='list the selected puzzles')
+    args = parser.parse_args(argv)
+
+    entries = select(discover(), tags=args.tag, exclude_tags=args.exclude_tag,
+                     pattern=args.pattern)
+    if args.list:
+        for entry in entries:
+            print(f'{entry.id}  [{", ".join(sorted(entry.tags))}]')
+        return 0
+
+    results = run_all(entries, jobs=args.jobs, timeout=args.timeout)
+    write_results(args.output, results)
+    baseline = read_results(args.baseline) if args.baseline else {}
+    print_comparison(results, baseline)
+    regressions = compare(results, baseline, args.threshold)
+    for key, description in regressions:
+        print(f'REGRESSION {key}: {description}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,8 +1,9 @@
-import pathlib
 from collections import Counter
 
 import numpy as np
 
+from solver.word_index import WordIndex
+
 
 class X:
     string: str
@@ -49,23 +50,17 @@ class X:
 
 
 def run():
-    words = set()
-    with pathlib.Path("../misc/words.txt").open() as file:
-        for word in file:
-            word = word.strip()
-            if all(x.isalpha() for x in word):
-                words.add(word.lower())
+    words = WordIndex.from_file("../misc/words.txt")
     across = X("escortfunnelquartztuckersecretcombed")
     down = X("egspfsrupaeiasacrishrkrpeeeeeeddddtd")
-    for word in words:
-        if len(word) ==  6:
-            secret1 = word * 6
-            secret2 = ''.join(x * 6 for x in word)
-            result1 = across + secret1
-            result2 = down + secret2
-            count = sum(x == y for x, y in zip(result1.string, result2.string))
-            if count > 15:
-                print(word, count, result1, result2)
+    for word in map(str.lower, words.words(6)):
+        secret1 = word * 6
+        secret2 = ''.join(x * 6 for x in word)
+        result1 = across + secret1
+        result2 = down + secret2
+        count = sum(x == y for x, y in zip(result1.string, result2.string))
+        if count > 15:
+            print(word, count, result1, result2)
 
 WORD1 = ["ESCORT", "FUNNEL", "QUARTZ", "TUCKER", "SECRET", "COMBED"]
 WORD2 = ["ERASED", "GUSHED", "SPARED", "PACKED", "FERRET", "SWIPED"]
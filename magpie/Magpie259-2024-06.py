@@ -1,16 +1,15 @@
-from typing import Any, Unpack
+from typing import Unpack
 
 from more_itertools import is_prime
 
 from misc.Pentomino import get_graph_shading, get_hard_bars
 from solver import (
+    BoundedLetterCountHandler,
     Clue,
     Clues,
-    ClueValue,
     ConstraintSolver,
     DancingLinks,
     DrawGridKwargs,
-    LetterCountHandler,
     Location,
 )
 from solver.generators import (
@@ -53,7 +52,8 @@ class Magpie253 (ConstraintSolver):
 
     def __init__(self):
         clues = self.get_clues()
-        super().__init__(clues, letter_handler=self.MyLetterHandler())
+        super().__init__(clues,
+                         letter_handler=BoundedLetterCountHandler('0123456', maximum=8))
         self.__get_constraints()
         # self.coloring = None
 
@@ -71,11 +71,6 @@ class Magpie253 (ConstraintSolver):
     def get_allowed_regexp(self, location: Location) -> str:
         return '[1-6]' if self.is_start_location(location) else '[0-6]'
 
-    class MyLetterHandler(LetterCountHandler):
-        def real_checking_value(self, value: ClueValue, _info: Any) -> bool:
-            counter = self.counter
-            return all(x <= 8 for x in counter.values())
-
     def draw_grid(self, **args: Unpack[DrawGridKwargs]) -> None:
         location_to_entry = args.pop('location_to_entry')
         location_to_clue_numbers = args.pop('location_to_clue_numbers')
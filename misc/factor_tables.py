@@ -0,0 +1,125 @@
+"""Tables of arithmetic functions, for every number up to a limit.
+
+The tables are computed together by one NumPy sieve, and saved as .npy files so that
+later runs can memory-map them instead of computing them again.  Saved tables are only
+used if they have the right shape and type, and their first entries match a fresh sieve.  The sieve only loops
+over the primes up to √limit.  Dividing those out of every number leaves either 1 or a
+single prime bigger than √limit, and that is handled for all numbers at once.
+"""
+
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+DEFAULT_DIRECTORY = Path(tempfile.gettempdir()) / 'factor_tables'
+# Part of the file names, so that tables saved in an old format are never used.
+_VERSION = 2
+# How many entries of saved tables are checked against a fresh sieve.
+_CHECKED_ENTRIES = 1000
+
+
+class FactorTables(NamedTuple):
+    """Each table is indexed by n, for 0 <= n <= limit.  Entries 0 and 1 are unused."""
+    limit: int
+    smallest_prime_factor: np.ndarray
+    divisor_count: np.ndarray
+    divisor_sum: np.ndarray
+    totient: np.ndarray
+    distinct_prime_count: np.ndarray
+
+
+_TABLE_NAMES = FactorTables._fields[1:]
+
+
+def get_factor_tables(limit: int, directory: Path | None = DEFAULT_DIRECTORY) -> FactorTables:
+    """
+    Return the tables up to limit, memory-mapped from directory if they've been saved
+    there, and otherwise computed and saved there.  With no directory, just compute them.
+    """
+    if directory is None:
+        return _compute_tables(limit)
+    paths = [directory / f'{name}_{limit}_v{_VERSION}.npy' for name in _TABLE_NAMES]
+    if (all(path.exists() for path in paths)
+            and (tables := _load_tables(limit, paths)) is not None):
+        return tables
+    directory.mkdir(parents=True, exist_ok=True)
+    for path, table in zip(paths, _compute_tables(limit)[1:], strict=True):
+        # Write to a temporary file first, so that no one maps a half-written table.
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        with temporary.open('wb') as file:
+            np.save(file, table)
+        temporary.replace(path)
+    return FactorTables(limit, *(np.load(path, mmap_mode='r') for path in paths))
+
+
+def _load_tables(limit: int, paths: list[Path]) -> FactorTables | None:
+    """The saved tables, or None if any is unreadable or doesn't match a fresh sieve."""
+    try:
+        tables = FactorTables(limit, *(np.load(path, mmap_mode='r') for path in paths))
+    except (OSError, ValueError):
+        return None
+    expected = _compute_tables(min(limit, _CHECKED_ENTRIES))
+    for table, sample in zip(tables[1:], expected[1:], strict=True):
+        if (table.shape != (limit + 1,) or table.dtype != sample.dtype
+                or not np.array_equal(table[:len(sample)], sample)):
+            return None
+    return tables
+
+
+def _compute_tables(limit: int) -> FactorTables:
+    size = limit + 1
+    smallest_prime_factor = np.zeros(size, dtype=np.int64)
+    divisor_count = np.ones(size, dtype=np.int32)
+    divisor_sum = np.ones(size, dtype=np.int64)
+    totient = np.ones(size, dtype=np.int64)
+    distinct_prime_count = np.zeros(size, dtype=np.int8)
+    # What's left of each number once the small primes are divided out.
+    rest = np.arange(size, dtype=np.int64)
+
+    small_primes = _primes_up_to(math.isqrt(limit))
+    for p in small_primes.tolist():
+        multiples = slice(p, size, p)
+        distinct_prime_count[multiples] += 1
+        divisor_count[multiples] *= 2
+        divisor_sum[multiples] *= 1 + p
+        totient[multiples] *= p - 1
+        rest[multiples] //= p
+        # Numbers divisible by p^k, for k >= 2, go from p^(k-1) to p^k.
+        power, k, power_sum = p * p, 2, 1 + p
+        while power <= limit:
+            multiples = slice(power, size, power)
+            divisor_count[multiples] //= k
+            divisor_count[multiples] *= k + 1
+            divisor_sum[multiples] //= power_sum
+            power_sum += power
+            divisor_sum[multiples] *= power_sum
+            totient[multiples] *= p
+            rest[multiples] //= p
+            power, k = power * p, k + 1
+    # Largest first, so that each number ends up with its smallest.
+    for p in reversed(small_primes.tolist()):
+        smallest_prime_factor[p::p] = p
+
+    large = rest > 1
+    large_prime = rest[large]
+    distinct_prime_count[large] += 1
+    divisor_count[large] *= 2
+    divisor_sum[large] *= 1 + large_prime
+    totient[large] *= large_prime - 1
+    unset = smallest_prime_factor == 0
+    smallest_prime_factor[unset] = np.arange(size)[unset]
+    return FactorTables(limit, smallest_prime_factor, divisor_count, divisor_sum,
+                        totient, distinct_prime_count)
+
+
+def _primes_up_to(limit: int) -> np.ndarray:
+    is_prime = np.ones(limit + 1, dtype=bool)
+    is_prime[:2] = False
+    for p in range(2, math.isqrt(limit) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = False
+    return np.flatnonzero(is_prime)
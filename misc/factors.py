@@ -1,8 +1,12 @@
 import functools
 import math
 from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
-from more_itertools import factor, run_length, totient
+from more_itertools import factor, run_length
+
+if TYPE_CHECKING:
+    from .factor_tables import FactorTables
 
 __all__ = [
     'divisor_count',
@@ -19,37 +23,88 @@ __all__ = [
     # 'superscript_mapping',
 ]
 
+# Values up to this are looked up in the factor tables.  Bigger ones have their small
+# prime factors divided out until what's left is in the tables, or else are finished
+# with Pollard's rho.
+TABLE_LIMIT = 10 ** 6
+# The primes that are divided out of bigger values, before giving up on the tables.
+TRIAL_LIMIT = 500
+# Each function keeps the results for this many recent values.
+CACHE_SIZE = 1 << 16
+
+
 @functools.cache
+def _tables() -> FactorTables:
+    # Deferred, so that importing misc doesn't import NumPy.
+    from .factor_tables import get_factor_tables
+    return get_factor_tables(TABLE_LIMIT)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def prime_factors(value: int) -> list[tuple[int, int]]:
-    items = factor(value)
-    return list(run_length.encode(items))
+    if value <= TABLE_LIMIT:
+        return _table_prime_factors(value)
+    result: list[tuple[int, int]] = []
+    for prime in _trial_primes():
+        if value % prime == 0:
+            count = 0
+            while value % prime == 0:
+                value //= prime
+                count += 1
+            result.append((prime, count))
+            if value <= TABLE_LIMIT:
+                return result + _table_prime_factors(value)
+    return result + list(run_length.encode(factor(value)))
+
+
+def _table_prime_factors(value: int) -> list[tuple[int, int]]:
+    smallest_prime_factor = _tables().smallest_prime_factor
+    result: list[tuple[int, int]] = []
+    while value > 1:
+        prime = int(smallest_prime_factor[value])
+        count = 0
+        while value % prime == 0:
+            value //= prime
+            count += 1
+        result.append((prime, count))
+    return result
 
 
 @functools.cache
+def _trial_primes() -> list[int]:
+    smallest_prime_factor = _tables().smallest_prime_factor[:TRIAL_LIMIT]
+    return [n for n, prime in enumerate(smallest_prime_factor.tolist()) if n == prime > 1]
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def divisor_count(value: int) -> int:
-    factorization = prime_factors(value)
-    return math.prod(count + 1 for _prime, count in factorization)
+    if 1 <= value <= TABLE_LIMIT:
+        return int(_tables().divisor_count[value])
+    return math.prod(count + 1 for _prime, count in prime_factors(value))
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def phi(value: int) -> int:
-    return totient(value);
+    if 1 <= value <= TABLE_LIMIT:
+        return int(_tables().totient[value])
+    return math.prod(prime ** (count - 1) * (prime - 1) for prime, count in prime_factors(value))
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def factor_sum(value: int) -> int:
+    if 1 <= value <= TABLE_LIMIT:
+        return int(_tables().divisor_sum[value])
     factorization = prime_factors(value)
     return math.prod((prime ** (count + 1) - 1) // (prime - 1)
                      for prime, count in factorization)
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def factor_count(value: int) -> int:
-    factorization = prime_factors(value)
-    return math.prod(count + 1 for _, count in factorization)
+    return divisor_count(value)
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def factor_list(value: int) -> Sequence[int]:
     def recurse(prime_factor_list) -> Sequence[int]:
         if not prime_factor_list:
@@ -63,20 +118,20 @@ def factor_list(value: int) -> Sequence[int]:
     return result
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def shared_factor_count(x: int, y: int) -> int:
     gcd = math.gcd(x, y)
     return factor_count(gcd)
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def odd_factor_count(value: int) -> int:
     while value % 2 == 0:
         value = value // 2
     return factor_count(value)
 
 
-@functools.cache
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def even_factor_count(value: int) -> int:
     count = 0
     while value & 1 == 0:
@@ -1,27 +1,48 @@
-from .base_solver import BaseSolver, KnownClueDict
-from .clue import Clue, ClueValueGenerator
-from .clue_types import AbstractClueValue, ClueValue, Letter, Location
-from .clues import Clues
-from .constraint_solver import (
-    AbstractLetterCountHandler,
-    Constraint,
-    ConstraintSolver,
-    LCH_Info,
-    LetterCountHandler,
-)
-from .dancing_links import DancingLinks, DancingLinksBounds, DLConstraint, Orderer
-from .dancing_links_solver import DancingLinksSolver
-from .draw_grid import DrawGridKwargs
-from .equation_parser import EquationParser, Parse
-from .equation_solver import EquationSolver, KnownLetterDict
-from .evaluator import Evaluator
-from .intersection import Intersection
-from .multi_equation_solver import MultiEquationSolver
+# ruff: noqa: RUF067
+"""Public names of the solver package.
+
+The names are loaded lazily (PEP 562), so that "import solver" stays cheap and a
+script only pays for the submodules, and the third-party packages behind them, that
+it actually uses.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base_solver import BaseSolver, KnownClueDict
+    from .clue import Clue, ClueValueGenerator
+    from .clue_types import AbstractClueValue, ClueValue, Letter, Location
+    from .clues import Clues
+    from .constraint_solver import (
+        AbstractLetterCountHandler,
+        BoundedLetterCountHandler,
+        Constraint,
+        ConstraintSolver,
+        LCH_Info,
+        LetterCountHandler,
+    )
+    from .dancing_links import (
+        DancingLinks,
+        DancingLinksBounds,
+        DLConstraint,
+        Orderer,
+        Precedence,
+    )
+    from .dancing_links_solver import DancingLinksSolver
+    from .draw_grid import DrawGridKwargs
+    from .equation_parser import EquationParser, Parse
+    from .equation_solver import EquationSolver, KnownLetterDict
+    from .evaluator import Evaluator
+    from .intersection import Intersection
+    from .multi_equation_solver import MultiEquationSolver
+    from .render import RenderMode, render_mode, set_render_mode
 
 __all__ = [
     "AbstractClueValue",
     "AbstractLetterCountHandler",
     "BaseSolver",
+    "BoundedLetterCountHandler",
     "Clue",
     "ClueValue",
     "ClueValueGenerator",
@@ -46,4 +67,57 @@ __all__ = [
     "MultiEquationSolver",
     "Orderer",
     "Parse",
+    "Precedence",
+    "RenderMode",
+    "render_mode",
+    "set_render_mode",
 ]
+
+# Public name -> submodule that defines it.
+_LAZY_NAMES = {
+    "AbstractClueValue": ".clue_types",
+    "AbstractLetterCountHandler": ".constraint_solver",
+    "BaseSolver": ".base_solver",
+    "BoundedLetterCountHandler": ".constraint_solver",
+    "Clue": ".clue",
+    "ClueValue": ".clue_types",
+    "ClueValueGenerator": ".clue",
+    "Clues": ".clues",
+    "Constraint": ".constraint_solver",
+    "ConstraintSolver": ".constraint_solver",
+    "DLConstraint": ".dancing_links",
+    "DancingLinks": ".dancing_links",
+    "DancingLinksBounds": ".dancing_links",
+    "DancingLinksSolver": ".dancing_links_solver",
+    "DrawGridKwargs": ".draw_grid",
+    "EquationParser": ".equation_parser",
+    "EquationSolver": ".equation_solver",
+    "Evaluator": ".evaluator",
+    "Intersection": ".intersection",
+    "KnownClueDict": ".base_solver",
+    "KnownLetterDict": ".equation_solver",
+    "LCH_Info": ".constraint_solver",
+    "Letter": ".clue_types",
+    "LetterCountHandler": ".constraint_solver",
+    "Location": ".clue_types",
+    "MultiEquationSolver": ".multi_equation_solver",
+    "Orderer": ".dancing_links",
+    "Parse": ".equation_parser",
+    "Precedence": ".dancing_links",
+    "RenderMode": ".render",
+    "render_mode": ".render",
+    "set_render_mode": ".render",
+}
+
+
+def __getattr__(name: str) -> object:
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
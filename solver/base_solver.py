@@ -1,7 +1,7 @@
 import itertools
 import re
 from abc import ABC, abstractmethod
-from collections import Counter, OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict
 from collections.abc import Mapping, Sequence
 from typing import Unpack
 
@@ -23,21 +23,33 @@ class BaseSolver(ABC):
     __start_locations: frozenset[Location]
     # The set of all locations at which two clues intersect
     __intersections: frozenset[Location]
+    # The (clue, index) pairs of the clues using each location
+    __location_to_entries: Mapping[Location, Sequence[tuple[Clue, int]]]
+    # The other clues sharing at least one location with each clue
+    __crossing_clues: Mapping[Clue, Sequence[Clue]]
 
     def __init__(self, clue_list: Sequence[Clue], *, allow_duplicates: bool = False
                  ) -> None:
         self._clue_list = clue_list
         self._allow_duplicates = allow_duplicates
 
-        all_locations: Counter[Location] = Counter(
-            location for clue in clue_list for location in clue.locations)
+        location_to_entries: defaultdict[Location, list[tuple[Clue, int]]] = defaultdict(list)
+        for clue in clue_list:
+            for index, location in enumerate(clue.locations):
+                location_to_entries[location].append((clue, index))
+        self.__location_to_entries = dict(location_to_entries)
+        self.__crossing_clues = {
+            clue: tuple(dict.fromkeys(other for location in clue.locations
+                                      for other, _ in location_to_entries[location]
+                                      if other is not clue))
+            for clue in clue_list}
         self.__name_to_clue = OrderedDict((clue.name, clue) for clue in clue_list)
-        self.__max_row = 1 + max(row for (row, _) in all_locations)
-        self.__max_column = 1 + max(column for (_, column) in all_locations)
+        self.__max_row = 1 + max(row for (row, _) in location_to_entries)
+        self.__max_column = 1 + max(column for (_, column) in location_to_entries)
         self.__start_locations = frozenset(clue.base_location for clue in clue_list)
         self.__intersections = frozenset(location
-                                         for location, count in all_locations.items()
-                                         if count >= 2)
+                                         for location, entries in location_to_entries.items()
+                                         if len(entries) >= 2)
 
     @property
     def clue_list(self) -> Sequence[Clue]:
@@ -55,6 +67,14 @@ class BaseSolver(ABC):
         """Returns true if the location is the starting location of a clue."""
         return location in self.__start_locations
 
+    def clues_at(self, location: Location) -> Sequence[tuple[Clue, int]]:
+        """Returns the clues using the location, each with the location's index in the clue."""
+        return self.__location_to_entries.get(location, ())
+
+    def crossing_clues(self, clue: Clue) -> Sequence[Clue]:
+        """Returns the other clues that share at least one location with the clue."""
+        return self.__crossing_clues[clue]
+
     # Override this if there are addition restrictions on the value
     # that can go into a field.
     def get_allowed_regexp(self, location: Location) -> str:
@@ -188,5 +208,8 @@ class BaseSolver(ABC):
 
     @abstractmethod
     def solve(self, *, show_time: bool = True, debug: bool = False,
-              max_debug_depth: int | None = None) -> int:
-        ...
+              max_debug_depth: int | None = None, render: bool | None = None) -> int:
+        """
+        Solve the puzzle, showing each solution.  render=False shows solutions as text
+        instead of drawing them; None uses the current render mode (see solver.render).
+        """
@@ -1,18 +1,28 @@
 import abc
-import itertools
+import sys
 from collections import Counter, defaultdict
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from datetime import datetime
 from heapq import nlargest, nsmallest
 from typing import Any, NamedTuple, Protocol, cast
 
 from .base_solver import KnownClueDict
 from .clue import Clue
-from .clue_types import ClueValue
+from .clue_types import ClueValue, Location
 from .generator_based_solver import GeneratorBasedSolver
-from .intersection import Intersection
+from .render import rendering
 
 type UnknownClueDict = dict[Clue, Sequence[ClueValue]]
+# Given an unknown clue and its values, returns the values the letter handler still allows.
+type ValueFilter = Callable[[Clue, Sequence[ClueValue]], Sequence[ClueValue]]
+# For each location shared by two or more clues, the characters it can still hold.
+type SupportDict = dict[Location, frozenset[str]]
+# The clues known so far, in the order they were solved, and the state of the search there.
+type _Subproblem = tuple[KnownClueDict, UnknownClueDict, SupportDict]
+
+# When choosing the split depth for solve(workers=...), go deep enough to give each
+# worker at least this many subproblems, so that they can balance their loads.
+_SUBPROBLEMS_PER_WORKER = 8
 
 
 class ConstraintSolver(GeneratorBasedSolver):
@@ -24,6 +34,12 @@ class ConstraintSolver(GeneratorBasedSolver):
     _max_debug_depth: int
     _multi_constraints: dict[Clue, list[Callable[..., bool]]]
     _letter_handler: AbstractLetterCountHandler | None
+    # The (index, location) pairs of each clue's shared locations
+    _clue_to_shared_locations: dict[Clue, Sequence[tuple[int, Location]]]
+    # When splitting a search into subproblems, the depth at which to stop, and the
+    # subproblems found there.
+    _split_depth: int | None
+    _subproblems: list[_Subproblem]
 
     def __init__(self, clue_list: Sequence[Clue], constraints: Sequence[Constraint] = (),
                  *, letter_handler: AbstractLetterCountHandler | None = None,
@@ -33,10 +49,13 @@ class ConstraintSolver(GeneratorBasedSolver):
         self._letter_handler = letter_handler
         self._debug = False
         self._max_debug_depth = -1
+        self._split_depth = None
+        self._subproblems = []
 
-        for clue, clue2 in itertools.permutations(self._clue_list, 2):
-            for intersection in Intersection.get_intersections(clue, clue2):
-                self.__add_intersection_constraint(clue, clue2, intersection)
+        self._clue_to_shared_locations = {
+            clue: [(index, location) for index, location in enumerate(clue.locations)
+                   if self.is_intersection(location)]
+            for clue in self._clue_list}
 
         for constraint in constraints:
             clues, predicate, name = constraint
@@ -76,27 +95,57 @@ class ConstraintSolver(GeneratorBasedSolver):
         for clue in actual_clues:
             self._multi_constraints[clue].append(check_relationship)
 
-    def __add_intersection_constraint(self, this_clue: Clue, other_clue: Clue,
-                                      intersection: Intersection):
-        name = str(intersection)
-        this_index, other_index = intersection.this_index, intersection.other_index
+    def solve(self, *, show_time: bool = True, debug: bool = False,
+              max_debug_depth: int | None = None,
+              start_clues: Sequence[Clue | str] = (), render: bool | None = None,
+              workers: int = 1, split_depth: int | None = None) -> int:
+        """
+        Solve the puzzle, showing each solution.
 
-        def check_relationship(unknown_clues: UnknownClueDict) -> bool:
-            if other_clue not in unknown_clues:
-                return True
-            char = self._known_clues[this_clue][this_index]
-            start_value = unknown_clues[other_clue]
-            end_value = [value for value in start_value if char == value[other_index]]
-            if len(self._known_clues) < self._max_debug_depth:
-                self.__debug_show_constraint(other_clue, name, start_value, end_value)
-            unknown_clues[other_clue] = end_value
-            return bool(end_value)
+        With workers > 1, the search is split into subproblems at split_depth clues, or
+        deep enough to keep the workers busy if split_depth is None, and the subproblems
+        are solved by that many worker processes.  The workers are forked, so they start
+        with this solver's state, and check_solution() runs in them; show_solution() runs
+        in this process.  Where processes can't be forked, the search runs here.
+        """
+        time1 = datetime.now()
+        start = self.__start_solve(debug, max_debug_depth, start_clues)
+        time2 = datetime.now()
+        with rendering(render):
+            solutions: Iterable[KnownClueDict]
+            if start is None:
+                solutions = ()
+            elif workers > 1:
+                solutions = self.__run_parallel(*start, workers, split_depth)
+            else:
+                solutions = self.__run_solve(*start)
+            for known_clues in solutions:
+                self.show_solution(known_clues)
+        time3 = datetime.now()
+        if show_time:
+            print(f'Solutions {self._solution_count}; Steps: {self._step_count}; '
+                  f'Setup: {time2 - time1}; Execution: {time3 - time2}; '
+                  f'Total: {time3 - time1}')
+        return self._solution_count
 
-        self._multi_constraints[this_clue].append(check_relationship)
+    def iter_solutions(self, *, debug: bool = False, max_debug_depth: int | None = None,
+                       start_clues: Sequence[Clue | str] = ()) -> Iterator[KnownClueDict]:
+        """Yield a copy of each solution as soon as it is found.
 
-    def solve(self, *, show_time: bool = True, debug: bool = False,
-              max_debug_depth: int | None = None,
-              start_clues: Sequence[Clue | str] = ()) -> int:
+        The search is suspended between yields, so the caller can stop early without
+        enumerating every solution.  show_solution is not called.  Only one search
+        per solver may be active at a time.
+        """
+        start = self.__start_solve(debug, max_debug_depth, start_clues)
+        if start is None:
+            return
+        for known_clues in self.__run_solve(*start):
+            yield dict(known_clues)
+
+    def __start_solve(self, debug: bool, max_debug_depth: int | None,
+                      start_clues: Sequence[Clue | str]
+                      ) -> tuple[UnknownClueDict, SupportDict] | None:
+        """The clues' initial values and the supports, or None if there's no solution."""
         self._step_count = 0
         self._solution_count = 0
         self._known_clues = {}
@@ -104,31 +153,116 @@ class ConstraintSolver(GeneratorBasedSolver):
         self._start_clues = [self.clue_named(x) if isinstance(x, str) else x
                              for x in start_clues]
         self._max_debug_depth = -1 if not debug else (max_debug_depth or 1000)
-        time1 = datetime.now()
         initial_unknown_clues = {clue: self.get_initial_values_for_clue(clue)
                                  for clue in self._clue_list if clue.generator}
+        # Start with every character any clue can put in each shared location, and narrow
+        # them down until they agree with all the clues.
+        supports = {location: frozenset(value[index]
+                                        for clue, index in self.clues_at(location)
+                                        if clue in initial_unknown_clues
+                                        for value in initial_unknown_clues[clue])
+                    for shared_locations in self._clue_to_shared_locations.values()
+                    for _, location in shared_locations}
+        propagated = self.__propagate(initial_unknown_clues, supports,
+                                      list(initial_unknown_clues.items()))
+        if propagated is None:
+            # Some clue has no values left that fit the others.
+            return None
+        supports = propagated
         if self._letter_handler:
             self._letter_handler.start()
-        time2 = datetime.now()
-        self.__solve(initial_unknown_clues)
-        if self._letter_handler:
-            self._letter_handler.close()
-        time3 = datetime.now()
-        if show_time:
-            print(f'Solutions {self._solution_count}; Steps: {self._step_count}; '
-                  f'Setup: {time2 - time1}; Execution: {time3 - time2}; '
-                  f'Total: {time3 - time1}')
-        return self._solution_count
+        return initial_unknown_clues, supports
 
-    def __solve(self, unknown_clues: UnknownClueDict) -> None:
+    def __run_solve(self, unknown_clues: UnknownClueDict, supports: SupportDict
+                    ) -> Iterator[KnownClueDict]:
+        try:
+            yield from self.__solve(unknown_clues, supports)
+        finally:
+            # The search unwinds fully even when abandoned, so the handler is clean.
+            if self._letter_handler:
+                self._letter_handler.close()
+
+    def __run_parallel(self, unknown_clues: UnknownClueDict, supports: SupportDict,
+                       workers: int, split_depth: int | None) -> Iterator[KnownClueDict]:
+        import multiprocessing  # Deferred, as only this code path needs it.
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            yield from self.__run_solve(unknown_clues, supports)
+            return
+        yield from self.__split(unknown_clues, supports, workers, split_depth)
+        global _forked_solver
+        _forked_solver = self
+        try:
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                # One subproblem at a time, so that idle workers pick up the remaining ones.
+                results = pool.imap_unordered(_solve_subproblem, range(len(self._subproblems)))
+                for index, worker_solutions, step_count, solution_count in results:
+                    self._step_count += step_count
+                    self._solution_count += solution_count
+                    known_clues, subproblem_unknown_clues, _ = self._subproblems[index]
+                    for solution in worker_solutions:
+                        yield known_clues | {
+                            clue: subproblem_unknown_clues[clue][x] if isinstance(x, int) else x
+                            for clue, x in zip(subproblem_unknown_clues, solution, strict=True)}
+        finally:
+            _forked_solver = None
+            self._subproblems = []
+
+    def __split(self, unknown_clues: UnknownClueDict, supports: SupportDict,
+                workers: int, split_depth: int | None) -> list[KnownClueDict]:
+        """
+        Search down to split_depth clues, filling in _subproblems with the state of the
+        search there, and return the solutions found on the way.  If split_depth is None,
+        search deeper and deeper until there are enough subproblems.
+        """
+        depth = split_depth or 1
+        while True:
+            self._split_depth, self._subproblems = depth, []
+            self._step_count = self._solution_count = 0
+            solutions = [dict(known_clues) for known_clues in self.__run_solve(unknown_clues, supports)]
+            if (split_depth is not None or not self._subproblems or depth >= len(unknown_clues)
+                    or len(self._subproblems) >= workers * _SUBPROBLEMS_PER_WORKER):
+                break
+            depth += 1
+        self._split_depth = None
+        return solutions
+
+    def _solve_subproblem(self, index: int
+                          ) -> tuple[int, list[tuple[int | ClueValue, ...]], int, int]:
+        """
+        Runs in a worker process.  Solves a subproblem, and returns its solutions, giving
+        each of the subproblem's unknown clues the index of its value, or the value itself.
+        """
+        known_clues, unknown_clues, supports = self._subproblems[index]
+        self._step_count = self._solution_count = 0
+        self._known_clues = dict(known_clues)
+        if self._letter_handler:
+            # Rebuild the handler's state, adding the known values in their original order.
+            self._letter_handler.start()
+            for clue, value in known_clues.items():
+                self._letter_handler.adding_value(value, self._letter_handler.get_clue_info(clue))
+        # Values are sent back as indices where possible, as some puzzles' values can't be
+        # pickled.  Constraints can create new values, and those are sent as they are.
+        positions = {clue: {id(value): i for i, value in enumerate(values)}
+                     for clue, values in unknown_clues.items()}
+        solutions = [tuple(positions[clue].get(id(solution[clue]), solution[clue])
+                           for clue in unknown_clues)
+                     for solution in self.__solve(unknown_clues, supports)]
+        return index, solutions, self._step_count, self._solution_count
+
+    def __solve(self, unknown_clues: UnknownClueDict, supports: SupportDict
+                ) -> Iterator[KnownClueDict]:
+        """Yield the live _known_clues dictionary at each solution."""
         depth = len(self._known_clues)
         if not unknown_clues:
             if self.check_solution(self._known_clues):
                 self._solution_count += 1
-                self.show_solution(self._known_clues)
+                yield self._known_clues
                 if depth < self._max_debug_depth:
                     print(f'{"***" * depth}***SOLVED***')
             return
+        if depth == self._split_depth:
+            self._subproblems.append((dict(self._known_clues), unknown_clues, supports))
+            return
 
         if depth < len(self._start_clues):
             clue = self._start_clues[depth]
@@ -168,18 +302,96 @@ class ConstraintSolver(GeneratorBasedSolver):
                 # Make a shallow copy of unknown_clues, but remove this clue.
                 next_unknown_clues = dict(unknown_clues)
                 del next_unknown_clues[clue]
-                # Check the constraints.
-                if not all(constraint(next_unknown_clues) for constraint in constraints):
+                # Narrow down the other clues to fit this value, then check the constraints,
+                # and then narrow down again from whichever clues the constraints changed.
+                next_supports = self.__propagate(next_unknown_clues, supports, [(clue, (value,))])
+                if next_supports is None:
                     continue
+                if constraints:
+                    before_constraints = dict(next_unknown_clues)
+                    if not all(constraint(next_unknown_clues) for constraint in constraints):
+                        continue
+                    changed = [(other, other_values)
+                               for other, other_values in next_unknown_clues.items()
+                               if other_values is not before_constraints[other]]
+                    next_supports = self.__propagate(next_unknown_clues, next_supports, changed)
+                    if next_supports is None:
+                        continue
                 if letter_handler:
                     letter_handler.adding_value(value, lh_clue_info)
-                self.__solve(next_unknown_clues)
-                if letter_handler:
-                    letter_handler.removing_value(value, lh_clue_info)
+                try:
+                    if letter_handler and (value_filter := letter_handler.get_value_filter()):
+                        next_supports = self.__apply_value_filter(
+                            next_unknown_clues, next_supports, value_filter)
+                    if next_supports is not None:
+                        yield from self.__solve(next_unknown_clues, next_supports)
+                finally:
+                    if letter_handler:
+                        letter_handler.removing_value(value, lh_clue_info)
 
         finally:
             self._known_clues.pop(clue, None)
 
+    def __apply_value_filter(self, unknown_clues: UnknownClueDict, supports: SupportDict,
+                             value_filter: ValueFilter) -> SupportDict | None:
+        """
+        Remove the values of the unknown clues that the letter handler no longer allows,
+        and then propagate.  Returns None if a clue has no values left.
+        """
+        changed = []
+        for clue, values in unknown_clues.items():
+            new_values = value_filter(clue, values)
+            if len(new_values) != len(values):
+                if not new_values:
+                    return None
+                unknown_clues[clue] = new_values
+                changed.append((clue, new_values))
+        return self.__propagate(unknown_clues, supports, changed) if changed else supports
+
+    def __propagate(self, unknown_clues: UnknownClueDict, supports: SupportDict,
+                    pending: list[tuple[Clue, Sequence[ClueValue]]]) -> SupportDict | None:
+        """
+        The pending clues have new values.  Narrow down the supports of their shared
+        locations to match, and remove the values of the unknown clues that no longer fit
+        their supports, until nothing changes.
+
+        Returns the new supports, which are a copy if anything changed, or None if a clue
+        has no values left.
+        """
+        is_copy = False
+        while pending:
+            clue, values = pending.pop()
+            for index, location in self._clue_to_shared_locations[clue]:
+                # The supported characters that none of the values has.  With many values,
+                # they've usually all been seen after the first few.
+                if len(values) == 1:
+                    missing = supports[location] - {values[0][index]}
+                else:
+                    missing = set(supports[location])
+                    for value in values:
+                        if not missing:
+                            break
+                        missing.discard(value[index])
+                if not missing:
+                    continue
+                if not is_copy:
+                    supports, is_copy = dict(supports), True
+                support = supports[location] = supports[location].difference(missing)
+                for other_clue, other_index in self.clues_at(location):
+                    if other_clue is clue or other_clue not in unknown_clues:
+                        continue
+                    start_value = unknown_clues[other_clue]
+                    end_value = [value for value in start_value if value[other_index] in support]
+                    if len(end_value) == len(start_value):
+                        continue
+                    if len(self._known_clues) < self._max_debug_depth:
+                        self.__debug_show_constraint(other_clue, str(location), start_value, end_value)
+                    if not end_value:
+                        return None
+                    unknown_clues[other_clue] = end_value
+                    pending.append((other_clue, end_value))
+        return supports
+
     def get_initial_values_for_clue(self, clue: Clue) -> Sequence[ClueValue]:
         result = super().get_initial_values_for_clue(clue)
         if self._max_debug_depth > 0:
@@ -282,6 +494,14 @@ class ConstraintSolver(GeneratorBasedSolver):
                   f'{len(end_value)} [{constraint_name}] ')
 
 
+# The solver whose subproblems a forked worker process solves.
+_forked_solver: ConstraintSolver | None = None
+
+
+def _solve_subproblem(index: int) -> tuple[int, list[tuple[int | ClueValue, ...]], int, int]:
+    return _forked_solver._solve_subproblem(index)
+
+
 class Constraint(NamedTuple):
     clues: Sequence[Clue | str] | str
     predicate: Callable[..., bool]
@@ -299,6 +519,13 @@ class AbstractLetterCountHandler[T](Protocol):
     def removing_value(self, value: ClueValue, info: T) -> None: ...
     def close(self) -> None: ...
 
+    def get_value_filter(self) -> ValueFilter | None:
+        """
+        Called after adding_value().  Returns a function that removes the values of the
+        unknown clues that can no longer be added, or None if there's nothing to remove.
+        """
+        return None
+
 
 class LetterCountHandler(AbstractLetterCountHandler):
     _locations: set[tuple[int, int]]
@@ -344,3 +571,149 @@ class LetterCountHandler(AbstractLetterCountHandler):
     def close(self) -> None:
         assert len(self._locations) == 0
         assert all(x == 0 for x in self._counter.values())
+
+
+# For each symbol that a value adds to the grid, its index in the alphabet and how often.
+type _Delta = tuple[tuple[int, int], ...]
+type BLCH_Info = tuple[Sequence[int], set[Location], dict[ClueValue, _Delta]]
+
+
+class BoundedLetterCountHandler(AbstractLetterCountHandler[BLCH_Info]):
+    """
+    A letter handler that bounds how often each symbol of an alphabet appears in the grid.
+
+    The counts are kept in a list indexed by symbol.  For each clue and set of new squares,
+    the change each value makes to the counts is computed once and cached, so checking a
+    value only looks at the symbols it adds.  A minimum is checked against the number of
+    squares still empty, so it needs the total number of squares.
+
+    Subclasses can override real_checking_value() for any further test.  It is called with
+    the value's counts added, once the value is within the bounds.
+
+    When a value brings symbols up to their maximum, get_value_filter() lets the solver
+    remove every unknown clue's values that would put one of them in an empty square.
+    """
+    _symbols: str
+    _alphabet: dict[str, int]
+    _maximum: list[int]
+    _minimum: list[int]
+    _squares: int | None
+    _counts: list[int]
+    _locations: set[Location]
+    # How many more squares the symbols below their minimum need between them.
+    _shortfall: int
+    _deltas: dict[tuple[Clue, tuple[int, ...]], dict[ClueValue, _Delta]]
+    # The symbols that the last value added brought up to their maximum.
+    _newly_full: list[str]
+
+    def __init__(self, alphabet: str = '0123456789', *,
+                 maximum: int | dict[str, int] | None = None,
+                 minimum: int | dict[str, int] | None = None,
+                 squares: int | None = None) -> None:
+        self._symbols = alphabet
+        self._alphabet = {symbol: i for i, symbol in enumerate(alphabet)}
+        self._maximum = self.__get_bounds(maximum, sys.maxsize)
+        self._minimum = self.__get_bounds(minimum, 0)
+        if any(self._minimum) and squares is None:
+            raise ValueError('A minimum needs the total number of squares')
+        self._squares = squares
+        self._deltas = {}
+
+    def __get_bounds(self, bound: int | dict[str, int] | None, default: int) -> list[int]:
+        if bound is None:
+            return [default] * len(self._alphabet)
+        if isinstance(bound, int):
+            return [bound] * len(self._alphabet)
+        return [bound.get(symbol, default) for symbol in self._alphabet]
+
+    def count(self, symbol: str) -> int:
+        return self._counts[self._alphabet[symbol]]
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {symbol: self._counts[i] for symbol, i in self._alphabet.items()}
+
+    def real_checking_value(self, value: ClueValue, info: BLCH_Info) -> bool:
+        return True
+
+    def start(self) -> None:
+        self._counts = [0] * len(self._alphabet)
+        self._locations = set()
+        self._shortfall = sum(self._minimum)
+        self._newly_full = []
+
+    def get_clue_info(self, clue: Clue) -> BLCH_Info:
+        changed = [(index, location) for index, location in enumerate(clue.locations)
+                   if location not in self._locations]
+        indices = tuple(index for index, _ in changed)
+        deltas = self._deltas.setdefault((clue, indices), {})
+        return indices, {location for _, location in changed}, deltas
+
+    def checking_value(self, value: ClueValue, info: BLCH_Info) -> bool:
+        indices, locations, deltas = info
+        delta = deltas.get(value)
+        if delta is None:
+            delta = deltas[value] = self.__get_delta(value, indices)
+        counts, maximum, minimum = self._counts, self._maximum, self._minimum
+        shortfall = self._shortfall
+        for i, n in delta:
+            count = counts[i]
+            if count + n > maximum[i]:
+                return False
+            if count < minimum[i]:
+                shortfall -= min(n, minimum[i] - count)
+        if self._squares is not None and \
+                shortfall > self._squares - len(self._locations) - len(locations):
+            return False
+        if type(self).real_checking_value is BoundedLetterCountHandler.real_checking_value:
+            return True
+        self.__update(delta, 1)
+        try:
+            return self.real_checking_value(value, info)
+        finally:
+            self.__update(delta, -1)
+
+    def adding_value(self, value: ClueValue, info: BLCH_Info) -> None:
+        indices, locations, deltas = info
+        delta = deltas.get(value) or self.__get_delta(value, indices)
+        self.__update(delta, 1)
+        self._locations |= locations
+        counts, maximum = self._counts, self._maximum
+        self._newly_full = [self._symbols[i] for i, _ in delta if counts[i] >= maximum[i]]
+
+    def get_value_filter(self) -> ValueFilter | None:
+        if not self._newly_full:
+            return None
+        full = frozenset(self._newly_full)
+        locations = self._locations
+
+        def value_filter(clue: Clue, values: Sequence[ClueValue]) -> Sequence[ClueValue]:
+            indices = [index for index, location in enumerate(clue.locations)
+                       if location not in locations]
+            if not indices:
+                return values
+            return [value for value in values
+                    if not any(value[index] in full for index in indices)]
+
+        return value_filter
+
+    def removing_value(self, value: ClueValue, info: BLCH_Info) -> None:
+        indices, locations, deltas = info
+        delta = deltas.get(value) or self.__get_delta(value, indices)
+        self.__update(delta, -1)
+        self._locations -= locations
+
+    def close(self) -> None:
+        assert len(self._locations) == 0
+        assert not any(self._counts)
+
+    def __get_delta(self, value: ClueValue, indices: Sequence[int]) -> _Delta:
+        counter = Counter(self._alphabet[value[index]] for index in indices)
+        return tuple(counter.items())
+
+    def __update(self, delta: _Delta, sign: int) -> None:
+        counts, minimum = self._counts, self._minimum
+        for i, n in delta:
+            before = counts[i]
+            counts[i] = after = before + sign * n
+            self._shortfall += max(0, minimum[i] - after) - max(0, minimum[i] - before)
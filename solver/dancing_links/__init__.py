@@ -2,6 +2,7 @@ from .dancing_links import DancingLinks
 from .dancing_links_bounds import DancingLinksBounds
 from .dancing_links_common import (
     DLConstraint,
+    Precedence,
     get_row_column_optional_constraints,
     verify_solution,
 )
@@ -12,6 +13,7 @@ __all__ = [
     "DancingLinks",
     "DancingLinksBounds",
     "Orderer",
+    "Precedence",
     "get_row_column_optional_constraints",
     "verify_solution",
 ]
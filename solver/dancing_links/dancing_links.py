@@ -1,4 +1,4 @@
-from collections.abc import Callable, Hashable, Sequence
+from collections.abc import Callable, Hashable, Iterator, Sequence
 from typing import cast
 
 from .dancing_links_common import (
@@ -6,6 +6,7 @@ from .dancing_links_common import (
     DancingLinksBase,
     DLConstraint,
     DLData,
+    Precedence,
 )
 
 
@@ -21,6 +22,7 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
         optional_constraints: set[str] | None = None,
         check_solution: Callable[[Sequence[Row]], bool] | None = None,
         color: bool = True,
+        precedences: Sequence[Precedence[Row]] = (),
     ):
         """The entry to the Dancing Links code.  Constraints should be a dictionary.
         Each key is the name of the row (something meaningful to the user).
@@ -30,21 +32,28 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
         Typically, they are strings, but feel free to use whatever works best. Also,
         all constraint names must be "comparable" to each other. So strings really do work
         best
+
+        Each of the precedences rules out choosing rows of its two sides that are out of
+        order.
         """
         super().__init__(constraints, row_printer=row_printer,
                          optional_constraints=optional_constraints,
-                         check_solution=check_solution, color=color)
+                         check_solution=check_solution, color=color,
+                         precedences=precedences)
 
-    def inner_solve(self) -> tuple[int, int]:
+    def inner_solve(self) -> Iterator[list[Row]]:
         left, right, lengths, up, down, top, colors = (
             self.data.left, self.data.right, self.data.lengths,
             self.data.up, self.data.down, self.data.top, self.data.colors,
         )
         constraint_names = self.data.constraint_names
         visible_rows = len(self.data.row_names)
+        propagator = self._precedence_propagator()
+        # The nodes pruned by the precedences, for each row in the partial solution.
+        pruned: list[list[int]] = []
 
-        def search_iterative() -> tuple[int, int]:
-            steps = solutions = 0
+        def search_iterative() -> Iterator[list[Row]]:
+            steps = 0
             stack: list[list[int]] = [[1, 0, 0, 0]]
 
             while stack:
@@ -53,6 +62,8 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
                     # r is the row before the one I want to scan.  If r == min_constraint,
                     # then this is the first row, and I don't have a row to uncover
                     if r != chosen_item:
+                        if propagator:
+                            propagator.restore(pruned.pop())
                         uncover_row(r)
 
                     r = down[r]
@@ -62,6 +73,8 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
                         continue
 
                     cover_row(r)
+                    if propagator:
+                        pruned.append(propagator.prune(r))
 
                     frame[1], frame[3] = r, index + 1  # reuse previous frame.
                     stack.append(frame)
@@ -81,9 +94,10 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
                         self._print_solution(depth)
                     # There can't be any frames with r == 0.
                     solution = [s[1] for s in stack if s[1] != s[2]]
-                    if self.check_solution(solution):
-                        solutions += 1
-                        self.row_printer([self.get_name(r) for r in solution])
+                    named = [self.get_name(r) for r in solution]
+                    if self.check_solution(named):
+                        self.steps = steps
+                        yield named
                     continue
 
                 chosen_item, feasible = choose_column()
@@ -95,7 +109,7 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
 
                 cover_item(chosen_item)
                 stack.append([depth, chosen_item, chosen_item, 1])
-            return steps, solutions
+            self.steps = steps
 
         def cover_row(r: int) -> None:
             """Called when we're adding row r to the solution set"""
@@ -223,7 +237,7 @@ class DancingLinks[Row: Hashable](DancingLinksBase[Row]):
                 c = right[c]
             return (preferred, True) if preferred != -1 else (best, True)
 
-        return search_iterative()
+        yield from search_iterative()
 
     def create_data_structure(self) -> DLData:
         return self._build_dl_data(
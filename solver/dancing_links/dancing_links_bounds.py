@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Hashable, Sequence
+from collections.abc import Callable, Hashable, Iterator, Sequence
 
 from .dancing_links_common import (
     PURIFIED,
     DancingLinksBase,
     DLConstraint,
     DLData,
+    Precedence,
 )
 
 
@@ -25,6 +26,11 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
 
     Multiplicity bounds for primary items are given via the `bounds` constructor
     argument: bounds={"item_name": (lo, hi)}.  Items not in `bounds` default to (1, 1).
+
+    Orderings between rows are given via the `precedences` constructor argument.  They
+    can't be combined with an upper bound above 1: such an item lets the same row be
+    chosen twice, and the second choice hides rows that are already hidden, which
+    corrupts the links that the precedences unlink and relink.
     """
 
     bounds: dict[str, tuple[int, int]]
@@ -40,13 +46,17 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
         check_solution: Callable[[Sequence[Row]], bool] | None = None,
         color: bool = True,
         bounds: dict[str, tuple[int, int]] | None = None,
+        precedences: Sequence[Precedence[Row]] = (),
     ):
         super().__init__(constraints, row_printer=row_printer,
                          optional_constraints=optional_constraints,
-                         check_solution=check_solution, color=color)
+                         check_solution=check_solution, color=color,
+                         precedences=precedences)
         self.bounds = bounds or {}
+        if precedences and any(hi > 1 for _, hi in self.bounds.values()):
+            raise ValueError("Precedences require every upper bound to be at most 1")
 
-    def inner_solve(self) -> tuple[int, int]:
+    def inner_solve(self) -> Iterator[list[Row]]:
         # Unpack all arrays into locals for speed — avoids attribute lookups in the
         # hot inner loop.
         left, right, lengths, up, down, top, bound, slack, colors = (
@@ -65,8 +75,11 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
         # visible_rows tracks the number of rows not currently hidden; used only for
         # debug output.
         visible_rows = len(self.data.row_names)
+        propagator = self._precedence_propagator()
+        # The nodes pruned by the precedences, for each row in the partial solution.
+        pruned: list[list[int]] = []
 
-        def search_iterative() -> tuple[int, int]:
+        def search_iterative() -> Iterator[list[Row]]:
             # Each stack frame is [depth, r, chosen_item, ft, index].
             #   depth:        recursion depth, used for debug indentation.
             #   r:            data node currently being tried, or chosen_item (sentinel)
@@ -79,7 +92,7 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
             #                 <0  null-move sentinel: ft_orig = -ft is the original ft.
             #   index:        1-based count of options tried so far (for debug output).
             # Bootstrap frame [1, 0, 0, 0, 0]: r=0 skips the backdown/advance block.
-            steps = solutions = 0
+            steps = 0
             stack: list[list[int]] = [[1, 0, 0, 0, 0]]
 
             while stack:
@@ -117,6 +130,8 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
 
                     # Undo the previous option if one was tried.
                     if r != chosen_item:
+                        if propagator:
+                            propagator.restore(pruned.pop())
                         if ft == 0:
                             # Full-cover: restore r back into chosen_item's column.
                             uncover_row(r, chosen_item)
@@ -194,6 +209,8 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
                             frame[4] = index + 1
                             stack.append(frame)
                             continue
+                        if propagator:
+                            pruned.append(propagator.prune(r))
                         frame[1], frame[4] = r, index + 1
                         stack.append(frame)
                         if depth <= self.max_debugging_depth:
@@ -230,8 +247,8 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
                     solution = [s[1] for s in stack if s[1] > total_length + 1]
                     named = [self.get_name(node) for node in solution]
                     if self.check_solution(named):
-                        solutions += 1
-                        self.row_printer(named)
+                        self.steps = steps
+                        yield named
                     continue
 
                 chosen_item, feasible = choose_item()
@@ -254,7 +271,7 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
                         cover_full(chosen_item)
                 stack.append([depth, chosen_item, chosen_item, ft, 1])
 
-            return steps, solutions
+            self.steps = steps
 
         def cover_row(r: int, chosen_item: int) -> None:
             """Add row r to the current partial solution.
@@ -529,7 +546,7 @@ class DancingLinksBounds[Row: Hashable](DancingLinksBase[Row]):
                 return preferred, preferred_theta > 0
             return best, best_theta > 0
 
-        return search_iterative()
+        yield from search_iterative()
 
     def create_data_structure(self) -> DLData:
         """Build the DLX data structure, extending the base structure with bound/slack.
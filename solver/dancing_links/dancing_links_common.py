@@ -1,20 +1,17 @@
 from __future__ import annotations
 
+import bisect
 import copy
 import os
 from abc import ABC, abstractmethod
 from collections import Counter, defaultdict
-from collections.abc import Callable, Hashable, Iterable, Sequence
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from functools import cache
 from itertools import chain, count
 from typing import Final, cast
 
-from rich import print as rprint
-from rich.markup import escape
-from rich.table import Table
-
 RUNNING_PYTEST = "PYTEST_CURRENT_TEST" in os.environ
 
 
@@ -27,6 +24,20 @@ PURIFIED: Final = _Purified()
 type DLConstraint = str | tuple[str, str]
 
 
+@dataclass(frozen=True)
+class Precedence[Row: Hashable]:
+    """If a row of "before" and a row of "after" are both chosen, the position of the
+    first must be less than the position of the second (or equal to it, unless strict).
+
+    This is the native replacement for the Orderer.LT and Orderer.LE codes.  Rather than
+    adding secondary items to every row, the solver prunes the rows of the other side
+    that a chosen row rules out.  Rows that aren't in the matrix are ignored.
+    """
+    before: Mapping[Row, int]
+    after: Mapping[Row, int]
+    strict: bool = True
+
+
 @dataclass
 class DLData:
     """Unified DLX data structure shared by both solver classes.
@@ -77,27 +88,95 @@ class DLData:
     slack: list[int] = field(default_factory=list)
 
 
+class _PrecedencePropagator:
+    """Removes the rows that the precedences rule out, when a row is chosen.
+
+    prune() unlinks every node of those rows that is still linked into its column, and
+    returns the nodes it unlinked.  restore() relinks them, and must be called, in
+    last-in first-out order, before the chosen row itself is uncovered.
+    """
+
+    def __init__(self, data: DLData, precedences: Sequence[Precedence]) -> None:
+        self._up, self._down, self._top, self._lengths = (
+            data.up, data.down, data.top, data.lengths)
+        spacers = {row: spacer for spacer, row in data.row_names.items()}
+        # For each row's spacer, the slices of spacers of the rows it rules out.
+        self._ruled_out: defaultdict[int, list[tuple[list[int], int, int]]] = defaultdict(list)
+        for precedence in precedences:
+            before = sorted((position, spacers[row]) for row, position in precedence.before.items()
+                            if row in spacers)
+            after = sorted((position, spacers[row]) for row, position in precedence.after.items()
+                           if row in spacers)
+            before_positions, before_spacers = [x for x, _ in before], [y for _, y in before]
+            after_positions, after_spacers = [x for x, _ in after], [y for _, y in after]
+            strict = precedence.strict
+            for position, spacer in before:
+                # The "after" rows that aren't after this one.
+                end = (bisect.bisect_right if strict else bisect.bisect_left)(
+                    after_positions, position)
+                if end:
+                    self._ruled_out[spacer].append((after_spacers, 0, end))
+            for position, spacer in after:
+                # The "before" rows that aren't before this one.
+                start = (bisect.bisect_left if strict else bisect.bisect_right)(
+                    before_positions, position)
+                if start < len(before_spacers):
+                    self._ruled_out[spacer].append((before_spacers, start, len(before_spacers)))
+
+    def prune(self, node: int) -> list[int]:
+        """Remove the rows ruled out by the row containing node."""
+        up, down, top, lengths = self._up, self._down, self._top, self._lengths
+        spacer = node - 1
+        while top[spacer] > 0:
+            spacer -= 1
+        removed: list[int] = []
+        for spacers, start, end in self._ruled_out.get(spacer, ()):
+            for index in range(start, end):
+                j = spacers[index] + 1
+                while (tt := top[j]) > 0:
+                    # A node that isn't linked in has been removed along with its row,
+                    # and will be put back by whoever removed it.
+                    uu, dd = up[j], down[j]
+                    if down[uu] == j:
+                        up[dd], down[uu] = uu, dd
+                        lengths[tt] -= 1
+                        removed.append(j)
+                    j += 1
+        return removed
+
+    def restore(self, removed: list[int]) -> None:
+        up, down, top, lengths = self._up, self._down, self._top, self._lengths
+        for j in reversed(removed):
+            lengths[top[j]] += 1
+            down[up[j]] = up[down[j]] = j
+
+
 class DancingLinksBase[Row: Hashable](ABC):
     """Shared helpers inherited by both solver classes.
 
     Provides display/debug utilities, the core DLX data-structure builder, and
     solution verification.  Subclasses supply the concrete "data" attribute and
     the "inner_solve()" / "create_data_structure()" methods.
+
+    inner_solve() is a generator yielding each accepted solution (as row names) and
+    keeping "steps" up to date; the search is suspended between yields.
     """
 
     data: DLData
     constraints: dict[Row, list[DLConstraint]]
     optional_constraints: set[str]
+    precedences: Sequence[Precedence[Row]]
     row_printer: Callable[[Sequence[Row]], None]
     check_solution: Callable[[Sequence[Row]], bool]
     debug: bool
     color: bool
+    steps: int
 
     @abstractmethod
     def create_data_structure(self) -> DLData: ...
 
     @abstractmethod
-    def inner_solve(self) -> tuple[int, int]: ...
+    def inner_solve(self) -> Iterator[list[Row]]: ...
 
     def __init__(
         self,
@@ -107,27 +186,50 @@ class DancingLinksBase[Row: Hashable](ABC):
         optional_constraints: set[str] | None = None,
         check_solution: Callable[[Sequence[Row]], bool] | None = None,
         color: bool = False,
+        precedences: Sequence[Precedence[Row]] = (),
     ) -> None:
         self.constraints = constraints
         self.optional_constraints = optional_constraints or set()
+        self.precedences = precedences
         self.row_printer = row_printer or self._default_row_printer
         self.check_solution = check_solution or (lambda _: True)
         self.max_debugging_depth = -1
         self.debug = False
         self.color = color
+        self.steps = 0
 
     def solve(self, debug: bool = False, max_debug_depth: int | None = None) -> None:
         time1 = datetime.now()
+        solutions = 0
+        for solution in self.iter_solutions(debug=debug, max_debug_depth=max_debug_depth):
+            solutions += 1
+            self.row_printer(solution)
+        self._print_solve_summary(self.steps, solutions, datetime.now() - time1)
+
+    def iter_solutions(
+            self, debug: bool = False, max_debug_depth: int | None = None
+    ) -> Iterator[list[Row]]:
+        """Yield each solution, as a list of row names, as soon as it is found.
+
+        The search is suspended between yields, so the caller controls the pace and
+        can stop early (e.g. with itertools.islice) without enumerating every
+        solution.  The row_printer is not called.  A new call rebuilds the matrix,
+        so an abandoned iterator does not affect later searches.
+        """
         self.debug = debug
         self.max_debugging_depth = -1 if not debug else (max_debug_depth or 1000)
+        self.steps = 0
 
         self.data = self.create_data_structure()
         saved_copy = copy.deepcopy(self.data) if RUNNING_PYTEST else None
-        steps, solutions = self.inner_solve()
+        yield from self.inner_solve()
         if saved_copy is not None:
             assert saved_copy == self.data, "Data structure changed during solve"
 
-        self._print_solve_summary(steps, solutions, datetime.now() - time1)
+    def _precedence_propagator(self) -> _PrecedencePropagator | None:
+        if not self.precedences:
+            return None
+        return _PrecedencePropagator(self.data, self.precedences)
 
     # ------------------------------------------------------------------
     # Data-structure construction
@@ -244,6 +346,9 @@ class DancingLinksBase[Row: Hashable](ABC):
         top[current_index:] = colors[current_index:] = []
 
         if debug:
+            from rich import print as rprint
+            from rich.table import Table
+
             dropped_0 = sum(1 for x in optional_constraints if all_constraints[x] == 0)
             dropped_1 = sum(1 for x in optional_constraints if all_constraints[x] == 1)
             table = Table(show_header=False, highlight=True)
@@ -291,6 +396,7 @@ class DancingLinksBase[Row: Hashable](ABC):
 
     def _print_solution(self, depth: int) -> None:
         if self.color:
+            from rich import print as rprint
             rprint(f"{self._indent(depth)}[green]✓ SOLUTION[/green]")
         else:
             print(f"{self._indent(depth)}✓ SOLUTION")
@@ -298,6 +404,8 @@ class DancingLinksBase[Row: Hashable](ABC):
     def _print_infeasible(self, depth: int, chosen_item: int) -> None:
         name = self.data.constraint_names[chosen_item]
         if self.color:
+            from rich import print as rprint
+            from rich.markup import escape
             rprint(f"{self._indent(depth)}[red]✕ {escape(name)}[/red]")
         else:
             print(f"{self._indent(depth)}✕ {name}")
@@ -312,6 +420,8 @@ class DancingLinksBase[Row: Hashable](ABC):
         row = self.get_name(r)
         prefix = "• " if n_rows == 1 else f"{index}/{n_rows} "
         if self.color:
+            from rich import print as rprint
+            from rich.markup import escape
             bounds = f"[cyan]⟨{lo}…{hi}⟩[/cyan]" if not (lo == 1 and hi == 1) else ""
             rprint(f"{indent}{prefix}[yellow]{escape(name)}[/yellow]{bounds}: "
                    f"Row {escape(str(row))} ({visible_rows})")
@@ -328,6 +438,8 @@ class DancingLinksBase[Row: Hashable](ABC):
         name = self.data.constraint_names[chosen_item]
         prefix = "• " if n_rows == 1 else f"{index}/{n_rows} "
         if self.color:
+            from rich import print as rprint
+            from rich.markup import escape
             bounds = f"[cyan]⟨{lo}…{hi}⟩[/cyan]" if not (lo == 1 and hi == 1) else ""
             rprint(f"{indent}{prefix}[yellow][strike]{escape(name)}[/strike][/yellow]{bounds}: ε ({visible_rows})")
         else:
@@ -335,6 +447,10 @@ class DancingLinksBase[Row: Hashable](ABC):
             print(f"{indent}{prefix}{name}{bounds}: ε ({visible_rows})")
 
     def _print_solve_summary(self, steps: int, solutions: int, elapsed) -> None:
+        # rich is only imported when there is something to print.
+        from rich import print as rprint
+        from rich.table import Table
+
         table = Table(show_header=False, highlight=self.color)
         table.add_column(style="bold")
         table.add_column()
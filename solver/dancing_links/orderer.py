@@ -1,5 +1,4 @@
 from collections.abc import Hashable
-from functools import cache
 from typing import overload
 
 
@@ -20,37 +19,58 @@ class _OrdererLtLe[T: Hashable]:
             count = len(count_or_items)
         self._count = count
         self._real_count = count + int(is_lt)
+        # Each code is created once, and shared by every item that uses it.
+        self._codes = [f'{prefix}:{t}' for t in range(self._real_count)]
 
-    @cache
     def left(self, i: T) -> set[str]:
-        if self._mapping:
-            i = self._mapping[i]
-        else:
-            if not (0 <= i < self._count):
-                raise ValueError(f"index {i} out of range [0, {self._count})")
-        t = int(i) + int(self._is_lt)
+        t = self._index(i) + int(self._is_lt)
         result = set()
         while t > 0:
-            result.add(f'{self._prefix}:{t}')
+            result.add(self._codes[t])
             t &= t - 1
         return result
 
-    @cache
     def right(self, i: T) -> set[str]:
-        if self._mapping:
-            i = self._mapping[i]
-        else:
-            if not (0 <= i < self._count):
-                raise ValueError(f"index {i} out of range [0, {self._count})")
-        t = i + 1
+        t = self._index(i) + 1
         result = set()
         while t < self._real_count:
-            result.add(f'{self._prefix}:{t}')
+            result.add(self._codes[t])
             t += (t & -t)
         return result
 
+    def left_table(self) -> dict[T, tuple[str, ...]]:
+        """left() for every item at once, as tuples."""
+        # The codes for t are t's own, and then those for t with its lowest bit cleared.
+        codes = self._codes
+        table: list[tuple[str, ...]] = [()] * self._real_count
+        for t in range(1, self._real_count):
+            table[t] = (codes[t], *table[t & (t - 1)])
+        return self._by_item(table[int(self._is_lt):])
+
+    def right_table(self) -> dict[T, tuple[str, ...]]:
+        """right() for every item at once, as tuples."""
+        # The codes for t are t's own, and then those for t with its lowest bit added.
+        codes, real_count = self._codes, self._real_count
+        table: list[tuple[str, ...]] = [()] * (real_count + 1)
+        for t in range(real_count - 1, 0, -1):
+            following = t + (t & -t)
+            table[t] = (codes[t], *(table[following] if following < real_count else ()))
+        return self._by_item(table[1:])
+
     def all_codes(self) -> set[str]:
-        return {f'{self._prefix}:{t}' for t in range(1, self._real_count)}
+        return set(self._codes[1:])
+
+    def _index(self, i: T) -> int:
+        if self._mapping:
+            return self._mapping[i]
+        if not (0 <= i < self._count):
+            raise ValueError(f"index {i} out of range [0, {self._count})")
+        return int(i)
+
+    def _by_item(self, table: list[tuple[str, ...]]) -> dict[T, tuple[str, ...]]:
+        if self._mapping:
+            return {item: table[i] for item, i in self._mapping.items()}
+        return dict(enumerate(table[:self._count]))
 
 
 class OrdererLessEqual[T: Hashable](_OrdererLtLe):
@@ -100,6 +120,14 @@ class OrdererEqual[T: Hashable]:
     def right(self, i: int | T) -> set[tuple[str, str]]:
         return self.left(i)
 
+    def left_table(self) -> dict[T, tuple[tuple[str, str], ...]]:
+        """left() for every item at once, as tuples."""
+        items = self._mapping or range(self._count)
+        return {item: ((self.code, str(i)),) for i, item in enumerate(items)}
+
+    def right_table(self) -> dict[T, tuple[tuple[str, str], ...]]:
+        return self.left_table()
+
     def all_codes(self) -> set[str]:
         return {self.code}
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Hashable, Sequence
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterator, Sequence
 from typing import Any
 
 from .base_solver import KnownClueDict
@@ -8,6 +9,7 @@ from .clue import Clue
 from .clue_types import ClueValue
 from .dancing_links import DancingLinks, DancingLinksBounds, DLConstraint
 from .generator_based_solver import GeneratorBasedSolver
+from .render import rendering
 
 
 class DancingLinksSolver(GeneratorBasedSolver):
@@ -22,12 +24,20 @@ class DancingLinksSolver(GeneratorBasedSolver):
     colored secondary columns: two clues sharing the same value would color the
     same column with different colors, which Algorithm X treats as a conflict.
 
+    Two-clue constraints are pushed down into the matrix when the number of value
+    pairs to test is at most PUSHDOWN_LIMIT, so Algorithm X prunes incompatible
+    values during the search.  Larger ones, and constraints on three or more clues,
+    are checked against each complete solution instead.
+
     Override update_constraints() to inject additional rows or columns into the
     DL matrix before solving.  Solution rows with non-Clue keys are ignored when
     assembling the KnownClueDict passed to check_solution/show_solution.
     """
 
+    PUSHDOWN_LIMIT = 250_000
+
     _multi_constraints: list[tuple[tuple[Clue, ...], Callable[..., bool]]]
+    _post_filter_constraints: list[tuple[tuple[Clue, ...], Callable[..., bool]]]
     _solution_count: int
 
     def __init__(self, clue_list: Sequence[Clue], **kwargs: Any) -> None:
@@ -51,9 +61,38 @@ class DancingLinksSolver(GeneratorBasedSolver):
         """
 
     def solve(self, *, show_time: bool = True, debug: bool = False,
-              max_debug_depth: int | None = None) -> int:
+              max_debug_depth: int | None = None, render: bool | None = None) -> int:
         self._solution_count = 0
 
+        def on_solution(rows: Sequence[Hashable]) -> None:
+            known_clues = self._rows_to_known_clues(rows)
+            if known_clues is not None:
+                self._solution_count += 1
+                self.show_solution(known_clues)
+
+        dl = self._make_dancing_links(on_solution)
+        with rendering(render):
+            dl.solve(debug=debug, max_debug_depth=max_debug_depth)
+        return self._solution_count
+
+    def iter_solutions(self, *, debug: bool = False,
+                       max_debug_depth: int | None = None) -> Iterator[KnownClueDict]:
+        """Yield each solution as soon as it is found.
+
+        The underlying search is suspended between yields, so the caller can stop
+        early without enumerating every solution.  show_solution is not called.
+        """
+        self._solution_count = 0
+        dl = self._make_dancing_links(None)
+        for rows in dl.iter_solutions(debug=debug, max_debug_depth=max_debug_depth):
+            known_clues = self._rows_to_known_clues(rows)
+            if known_clues is not None:
+                self._solution_count += 1
+                yield known_clues
+
+    def _make_dancing_links(
+            self, row_printer: Callable[[Sequence[Hashable]], None] | None
+    ) -> DancingLinks | DancingLinksBounds:
         # Secondary column per grid cell, colored with the digit placed there —
         # the color mechanism makes Algorithm X enforce intersection consistency.
         optional_constraints: set[str] = {
@@ -74,31 +113,92 @@ class DancingLinksSolver(GeneratorBasedSolver):
 
         bounds: dict = {}
         self.update_constraints(constraints, optional_constraints, bounds)
-
-        def on_solution(rows: Sequence[Hashable]) -> None:
-            if not self.check_raw_solution(rows):
-                return
-            known_clues: KnownClueDict = {
-                row[0]: row[1] for row in rows
-                if isinstance(row, tuple) and len(row) == 2 and isinstance(row[0], Clue)
-            }
-            for clues, predicate in self._multi_constraints:
-                if not predicate(*(known_clues[c] for c in clues)):
-                    return
-            if not self.check_solution(known_clues):
-                return
-            self._solution_count += 1
-            self.show_solution(known_clues)
+        self._post_filter_constraints = self._push_down_constraints(
+            constraints, optional_constraints)
 
         if bounds:
-            dl = DancingLinksBounds(constraints, row_printer=on_solution,
-                                    optional_constraints=optional_constraints,
-                                    bounds=bounds)
+            return DancingLinksBounds(constraints, row_printer=row_printer,
+                                      optional_constraints=optional_constraints,
+                                      bounds=bounds)
         else:
-            dl = DancingLinks(constraints, row_printer=on_solution,
-                              optional_constraints=optional_constraints)
-        dl.solve(debug=debug, max_debug_depth=max_debug_depth)
-        return self._solution_count
+            return DancingLinks(constraints, row_printer=row_printer,
+                                optional_constraints=optional_constraints)
+
+    def _push_down_constraints(
+            self, constraints: dict[Hashable, list[DLConstraint]],
+            optional_constraints: set[str]
+    ) -> list[tuple[tuple[Clue, ...], Callable[..., bool]]]:
+        """Encode small two-clue constraints into the matrix.
+
+        For a predicate on clues X and Y, each value w of Y gets an uncolored secondary
+        item that is placed in the row (Y, w) and in every row (X, v) for which the
+        predicate rejects (v, w).  Selecting both rows would cover the item twice.
+        Rows without any compatible partner are removed.
+
+        Returns the constraints that must still be checked on complete solutions.
+        """
+        values_by_clue: dict[Clue, list[ClueValue]] = defaultdict(list)
+        for key in constraints:
+            if isinstance(key, tuple) and len(key) == 2 and isinstance(key[0], Clue):
+                values_by_clue[key[0]].append(key[1])
+
+        post_filter = []
+        for index, (clues, predicate) in enumerate(self._multi_constraints):
+            if len(clues) != 2 or clues[0] == clues[1]:
+                post_filter.append((clues, predicate))
+                continue
+            clue1, clue2 = clues
+            values1, values2 = values_by_clue[clue1], values_by_clue[clue2]
+            if not values1 or not values2 or len(values1) * len(values2) > self.PUSHDOWN_LIMIT:
+                post_filter.append((clues, predicate))
+                continue
+            # Give the per-value items to the clue with fewer values.
+            swap = len(values2) > len(values1)
+            if swap:
+                x_clue, x_values, y_clue, y_values = clue2, values2, clue1, values1
+            else:
+                x_clue, x_values, y_clue, y_values = clue1, values1, clue2, values2
+
+            y_used: set[ClueValue] = set()
+            x_kept: list[ClueValue] = []
+            for v in x_values:
+                incompatible = []
+                for w in y_values:
+                    if predicate(w, v) if swap else predicate(v, w):
+                        y_used.add(w)
+                    else:
+                        incompatible.append(w)
+                if len(incompatible) == len(y_values):
+                    del constraints[x_clue, v]
+                    continue
+                x_kept.append(v)
+                constraints[x_clue, v].extend(f"pred{index}:{w}" for w in incompatible)
+            y_kept = []
+            for w in y_values:
+                if w not in y_used:
+                    del constraints[y_clue, w]
+                    continue
+                y_kept.append(w)
+                item = f"pred{index}:{w}"
+                optional_constraints.add(item)
+                constraints[y_clue, w].append(item)
+            values_by_clue[x_clue], values_by_clue[y_clue] = x_kept, y_kept
+        return post_filter
+
+    def _rows_to_known_clues(self, rows: Sequence[Hashable]) -> KnownClueDict | None:
+        """Convert a DL solution into a KnownClueDict, or None if it is rejected."""
+        if not self.check_raw_solution(rows):
+            return None
+        known_clues: KnownClueDict = {
+            row[0]: row[1] for row in rows
+            if isinstance(row, tuple) and len(row) == 2 and isinstance(row[0], Clue)
+        }
+        for clues, predicate in self._post_filter_constraints:
+            if not predicate(*(known_clues[c] for c in clues)):
+                return None
+        if not self.check_solution(known_clues):
+            return None
+        return known_clues
 
     def get_clue_rc_constraints(self, clue: Clue, value: ClueValue) -> Sequence[DLConstraint]:
         """Return the row/column constraints for a clue/value pair.
@@ -0,0 +1,126 @@
+"""Numbers whose digits meet constraints, found without trying the numbers that don't.
+
+A DigitDP chooses the digits of a number from the most significant down.  After each
+digit, all it needs to know about the number so far is a small state: the digit sum, the
+digit product, the digits used, and the remainder.  It counts how many ways each state can
+be completed, caching the counts, and only ever follows a digit if the count is nonzero.
+So enumerating the numbers takes time proportional to how many there are, and count()
+never has to enumerate them at all.
+
+A palindrome is chosen by its first half, with each digit counting twice.
+"""
+
+import functools
+import string
+from collections.abc import Iterator, Sequence
+
+
+class DigitDP:
+    """
+    The numbers of a given length such that:
+        each digit is in digits, or in digits[i] for the i-th digit, if it's a sequence;
+        the digits add up to digit_sum, and multiply to digit_product;
+        no digit is repeated, if distinct is set;
+        the number is a multiple of divisor;
+        the number is a palindrome, if palindrome is set.
+    Any constraint left as None is ignored.  The first digit is never 0.
+    """
+    _length: int
+    _base: int
+    # For each digit that is chosen: the digits allowed, how many times the digit appears in
+    # the number, its place value, and that place value modulo the divisor.
+    _allowed: list[list[int]]
+    _repeats: list[int]
+    _places: list[int]
+    _weights: list[int]
+    _digit_sum: int | None
+    _digit_product: int | None
+    _distinct: bool
+    _divisor: int | None
+
+    def __init__(self, length: int, *, digits: str | Sequence[str] = string.digits,
+                 digit_sum: int | None = None, digit_product: int | None = None,
+                 distinct: bool = False, divisor: int | None = None,
+                 palindrome: bool = False, base: int = 10) -> None:
+        self._length, self._base = length, base
+        self._digit_sum, self._digit_product = digit_sum, digit_product
+        self._distinct, self._divisor = distinct, divisor
+        if isinstance(digits, str):
+            digits = [digits] * length
+        assert len(digits) == length
+        allowed = [{int(digit, 36) for digit in position} for position in digits]
+        allowed[0].discard(0)
+        if digit_product:
+            for position in allowed:
+                position.discard(0)
+        powers = [base ** (length - 1 - i) for i in range(length)]
+        chosen = (length + 1) // 2 if palindrome else length
+        self._allowed, self._repeats, self._places = [], [], []
+        for i in range(chosen):
+            mirror = length - 1 - i
+            if palindrome and mirror != i:
+                self._allowed.append(sorted(allowed[i] & allowed[mirror]))
+                self._repeats.append(2)
+                self._places.append(powers[i] + powers[mirror])
+            else:
+                self._allowed.append(sorted(allowed[i]))
+                self._repeats.append(1)
+                self._places.append(powers[i])
+        self._weights = [place % divisor if divisor else 0 for place in self._places]
+        self._completions = functools.cache(self._completions)
+
+    def count(self) -> int:
+        """The number of numbers, without enumerating them."""
+        return self._completions(0, 0, 1, 0, 0)
+
+    def __iter__(self) -> Iterator[int]:
+        """The numbers, in increasing order."""
+        if self.count():
+            yield from self._enumerate(0, 0, 1, 0, 0, 0)
+
+    def _enumerate(self, i: int, total: int, product: int, used: int, remainder: int,
+                   value: int) -> Iterator[int]:
+        if i == len(self._allowed):
+            yield value
+            return
+        place = self._places[i]
+        for digit in self._allowed[i]:
+            state = self._next_state(i, digit, total, product, used, remainder)
+            if state is not None and self._completions(i + 1, *state):
+                yield from self._enumerate(i + 1, *state, value + digit * place)
+
+    def _completions(self, i: int, total: int, product: int, used: int, remainder: int
+                     ) -> int:
+        """How many ways can the digits from the i-th on be chosen, given the state?"""
+        if i == len(self._allowed):
+            return int((self._digit_sum is None or total == self._digit_sum)
+                       and (self._digit_product is None or product == self._digit_product)
+                       and remainder == 0)
+        return sum(self._completions(i + 1, *state)
+                   for digit in self._allowed[i]
+                   if (state := self._next_state(i, digit, total, product, used, remainder))
+                   is not None)
+
+    def _next_state(self, i: int, digit: int, total: int, product: int, used: int,
+                    remainder: int) -> tuple[int, int, int, int] | None:
+        """The state after choosing digit as the i-th digit, or None if it's ruled out."""
+        repeats = self._repeats[i]
+        if self._distinct:
+            if used >> digit & 1 or repeats > 1:
+                return None
+            used |= 1 << digit
+        if self._digit_sum is not None:
+            total += digit * repeats
+            if total > self._digit_sum:
+                return None
+        if self._digit_product is not None:
+            if self._digit_product == 0:
+                # All that matters is whether there's a zero yet.
+                product = product if digit else 0
+            else:
+                product *= digit ** repeats
+                if self._digit_product % product:
+                    return None
+        if self._divisor:
+            remainder = (remainder + digit * self._weights[i]) % self._divisor
+        return total, product, used, remainder
@@ -5,14 +5,13 @@ from collections.abc import Callable, Sequence
 from itertools import product
 from typing import TypedDict, Unpack
 
-from matplotlib import patches
-from matplotlib import pyplot as plt
-from matplotlib.axes import Axes
-
 from .clue_types import ClueValue, Letter, Location
+from .render import render_headless, render_mode
 
 if typing.TYPE_CHECKING:
     from clue import Clue
+    from matplotlib import pyplot as plt
+    from matplotlib.axes import Axes
 
 
 class DrawGridKwargs(TypedDict, total=False):
@@ -55,6 +54,18 @@ def draw_grid(*, max_row: int, max_column: int,
               grid_drawer: Callable[[plt, Axes], None] | None = None,
               extra: Callable[[plt, Axes], None] | None = None,
               **args: Unpack[DrawGridKwargs]) -> None:
+    mode = render_mode()
+    if mode != 'graphics':
+        render_headless(mode, max_row=max_row, max_column=max_column,
+                        clued_locations=clued_locations,
+                        location_to_entry=location_to_entry,
+                        clue_values=args.get('clue_values'),
+                        subtext=subtext, blacken_unused=blacken_unused)
+        return
+
+    # Imported here so that headless runs never pay for importing matplotlib.
+    from matplotlib import patches
+    from matplotlib import pyplot as plt
 
     axes = args.get('axes')
     if not axes:
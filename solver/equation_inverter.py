@@ -0,0 +1,228 @@
+"""Solve an evaluator's expression for a single letter, given the value of the clue.
+
+If the letter appears exactly once in the expression, every operation between the
+root and the letter can be undone: for "A + B*C = 47" with A and B known, C must be
+(47 - A) / B.  An Inverter does this with exact fractions, starting from each clue
+value that matches the current pattern, and so turns a loop over every possible
+value of the letter into a handful of arithmetic operations.
+
+The results are only candidates.  The solver still evaluates the expression forwards
+for each of them, so an inverter never has to be exact, only complete.
+"""
+
+import functools
+import itertools
+import math
+import re
+from collections.abc import Callable, Iterable, Sequence
+from fractions import Fraction
+from typing import NamedTuple
+
+from .clue_types import Letter
+from .evaluator import Evaluator
+from .expression_optimizer import to_python
+
+type _Tree = object
+type Rational = int | Fraction
+
+# Function names used for operators, as in Parse.PARSE_BINOPS and Parse.PARSE_UNOPS.
+_BINARY_FUNCTIONS = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div', '**': 'pow'}
+_UNARY_FUNCTIONS = {'+': 'pos', '-': 'neg'}
+
+# One position of a pattern: a character class, "\d", ".", or a digit.
+_PATTERN_ATOM = re.compile(r'\[\^?\]?[^]]*\]|\\d|[.0-9]')
+
+
+class _InverseStep(NamedTuple):
+    op: str
+    # The index of the operand containing the letter, in a binary operation.
+    index: int
+    # Computes the value of the other operand from the known letters.
+    other: Callable[[dict[Letter, int]], object] | None
+
+
+class Inverter:
+    def __init__(self, letter: Letter, steps: Sequence[_InverseStep]) -> None:
+        self.letter = letter
+        self._steps = steps
+
+    def solve(self, known_letters: dict[Letter, int], targets: Iterable[int]
+              ) -> set[int] | None:
+        """Return the values of the letter for which the expression may be one of the targets.
+
+        Returns None if the answer can't be determined, for example because the
+        letter is multiplied by zero.
+        """
+        try:
+            others = [step.other and step.other(known_letters) for step in self._steps]
+        except ArithmeticError:
+            # The expression fails whatever the value of the letter.
+            return set()
+        except (TypeError, ValueError):
+            return None
+        # A float, such as the result of a division, isn't exact, and inverting with it
+        # would lose values.
+        if not all(other is None or isinstance(other, int | Fraction) for other in others):
+            return None
+        # integral[i] is true if the operand solved for in step i must be an integer,
+        # as no division or fraction is involved in computing it from the letter.
+        integral = [True] * len(self._steps)
+        for i in range(len(self._steps) - 1, 0, -1):
+            integral[i - 1] = integral[i] and self._steps[i].op != '/' and (
+                    others[i] is None or isinstance(others[i], int))
+        values: set[Rational] = set(targets)
+        for step, other, is_integral in zip(self._steps, others, integral, strict=True):
+            next_values: set[Rational] = set()
+            for value in values:
+                inverse = _invert(step.op, step.index, value, other, is_integral)
+                if inverse is None:
+                    return None
+                next_values.update(inverse)
+            values = next_values
+        return {int(value) for value in values if value.denominator == 1}
+
+
+def make_inverter(evaluator: Evaluator, letter: Letter) -> Inverter | None:
+    """Return an inverter solving the evaluator's expression for letter, if there is one."""
+    if evaluator.wrapper is not Evaluator.standard_wrapper or evaluator.parse.expression is None:
+        return None
+    functions = evaluator.compiled_code.__globals__
+    steps: list[_InverseStep] = []
+    tree = evaluator.parse.expression
+    if _count(tree, letter) != 1:
+        return None
+    while tree != letter:
+        match tree:
+            case (op, left, right) if op in _BINARY_FUNCTIONS:
+                if _BINARY_FUNCTIONS[op] in functions:
+                    return None
+                index, other = (0, right) if _count(left, letter) else (1, left)
+                if op == '**' and index == 1:
+                    return None
+                steps.append(_InverseStep(op, index, _make_function(other, functions)))
+                tree = (left, right)[index]
+            case ('-' | '+' as op, operand) if _UNARY_FUNCTIONS[op] not in functions:
+                steps.append(_InverseStep(op, 0, None))
+                tree = operand
+            case ('√', operand) if functions.get('sqrt') is Evaluator.sqrt:
+                steps.append(_InverseStep('√', 0, None))
+                tree = operand
+            case _:
+                return None
+    return Inverter(letter, steps)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def pattern_values(pattern: str, length: int, limit: int) -> tuple[int, ...] | None:
+    """Return the positive integers whose decimal form fully matches pattern.
+
+    Returns None if pattern_digits() doesn't understand the pattern, or if there are
+    more than limit values.
+    """
+    digits = pattern_digits(pattern)
+    if digits is None or len(digits) != length:
+        return None
+    if math.prod(len(choices) for choices in digits) > limit:
+        return None
+    return tuple(int(''.join(value)) for value in itertools.product(*digits)
+                 if value[0] != '0')
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def pattern_digits(pattern: str) -> tuple[tuple[str, ...], ...] | None:
+    """The digits allowed at each position of pattern.
+
+    Only patterns made of one digit, ".", "\\d", or character class per position, as
+    made by Intersection.make_pattern_generator(), are understood.  Returns None for any
+    other pattern.
+    """
+    atoms = _PATTERN_ATOM.findall(pattern)
+    if ''.join(atoms) != pattern:
+        return None
+    try:
+        return tuple(_atom_digits(atom) for atom in atoms)
+    except re.error:
+        return None
+
+
+@functools.cache
+def _atom_digits(atom: str) -> tuple[str, ...]:
+    return tuple(digit for digit in '0123456789' if re.fullmatch(atom, digit))
+
+
+def _count(tree: _Tree, letter: Letter) -> int:
+    match tree:
+        case str():
+            return tree == letter
+        case ('function' | 'getitem', _, args):
+            return sum(_count(arg, letter) for arg in args)
+        case (_, *operands):
+            return sum(_count(operand, letter) for operand in operands)
+    return 0
+
+
+def _make_function(tree: _Tree, functions: dict[str, object]
+                   ) -> Callable[[dict[Letter, int]], object]:
+    from .equation_parser import Parse
+    variables = sorted(Parse(tree).vars())
+    source = to_python(tree, set(functions))
+    function = eval(f"lambda {', '.join(variables)}: {source}", functions)
+    return lambda known_letters: function(*(known_letters[x] for x in variables))
+
+
+def _divide(numerator: Rational, denominator: Rational, integral: bool) -> tuple[Rational, ...]:
+    # Stay with integers, which are much faster than fractions, whenever possible.
+    if isinstance(numerator, int) and isinstance(denominator, int):
+        quotient, remainder = divmod(numerator, denominator)
+        if remainder == 0:
+            return quotient,
+        if integral:
+            return ()
+    return Fraction(numerator) / denominator,
+
+
+def _invert(op: str, index: int, value: Rational, other: Rational | None, integral: bool
+            ) -> Iterable[Rational] | None:
+    """Return the values x such that (x op other), or (other op x), or (op x), is value.
+
+    If integral is true, only integer values of x are of interest.
+    """
+    if other is None:
+        match op:
+            case '+':
+                return value,
+            case '-':
+                return -value,
+            case '√':
+                return (value * value,) if value.denominator == 1 and value >= 0 else ()
+        return None
+    match op, index:
+        case '+', _:
+            return value - other,
+        case '-', 0:
+            return value + other,
+        case '-', 1:
+            return other - value,
+        case '*', _:
+            return None if other == 0 else _divide(value, other, integral)
+        case '/', 0:
+            return () if other == 0 else (value * other,)
+        case '/', 1:
+            return None if value == 0 else _divide(other, value, integral)
+        case '**', 0 if other.denominator == 1 and other > 0:
+            return _roots(value, int(other))
+    return None
+
+
+def _roots(value: Rational, exponent: int) -> Iterable[int] | None:
+    if value.denominator != 1 or value.numerator.bit_length() > 1000:
+        return None
+    magnitude = abs(value.numerator)
+    root = math.isqrt(magnitude) if exponent == 2 else round(magnitude ** (1 / exponent))
+    root = next((r for r in (root - 1, root, root + 1) if r >= 0 and r ** exponent == magnitude),
+                None)
+    if root is None:
+        return ()
+    if exponent % 2 == 0:
+        return () if value < 0 else (root, -root)
+    return root if value > 0 else -root,
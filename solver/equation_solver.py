@@ -1,21 +1,29 @@
 import itertools
-import multiprocessing
 import pickle
 import re
 from collections import Counter
-from collections.abc import Callable, Iterable, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from datetime import datetime
 from operator import itemgetter
 from typing import Any, NamedTuple
 
 from .base_solver import BaseSolver, KnownClueDict
 from .clue import Clue
-from .clue_types import Letter, Location
+from .clue_types import ClueValue, Letter, Location
+from .equation_inverter import Inverter, make_inverter, pattern_digits, pattern_values
 from .evaluator import Evaluator
+from .expression_bounds import BoundsFunction, can_have_length, make_bounds_function
 from .intersection import Intersection
+from .partial_evaluator import PartialEvaluator, make_partial_evaluator
+from .render import rendering
 
 type KnownLetterDict = dict[Letter, int]
 
+# The most clue values to solve for a letter when there are no items to compare with.
+_TARGET_LIMIT = 100
+# Only check the length of a later clue if at most this many of its letters are still unknown.
+_LOOKAHEAD_UNKNOWN_LETTERS = 1
+
 
 class ClueInfo(NamedTuple):
     clue: Clue
@@ -39,7 +47,12 @@ class EquationSolver(BaseSolver):
     _known_letters: KnownLetterDict
     _known_clues: KnownClueDict
     _solving_order: Sequence[SolvingStep]
+    _inverters: Sequence[Inverter | None]  # parallel to _solving_order
+    _partial_evaluators: Sequence[PartialEvaluator | None]  # likewise
+    _length_checks: Sequence[Sequence[Sequence[tuple[BoundsFunction, int]]]]  # likewise
+    _item_bounds: tuple[int, int]
     _items: Sequence[int]
+    _item_index: dict[int, int]  # each item's position in _items
     _all_constraints: list[tuple[tuple[Clue, ...], Callable[[], bool]]]
     _debug: bool
     _max_debug_depth: int
@@ -47,6 +60,7 @@ class EquationSolver(BaseSolver):
     def __init__(self, clue_list: Sequence[Clue], *, items: Iterable[int] = (), **args: Any) -> None:
         super().__init__(clue_list, **args)
         self._items = tuple(items)
+        self._item_index = {item: index for index, item in enumerate(self._items)}
         self._all_constraints = []
         Clue.set_pickle_solver(self)
 
@@ -69,7 +83,8 @@ class EquationSolver(BaseSolver):
         self._all_constraints.append((actual_clues, check_relationship))
 
     def solve(self, *, show_time: bool = True, debug: bool = False,
-              max_debug_depth: int = 1000, multiprocessing: bool = False):
+              max_debug_depth: int = 1000, multiprocessing: bool = False,
+              render: bool | None = None):
         self._step_count = 0
         self._solutions = []
         self._known_letters = {}
@@ -77,12 +92,13 @@ class EquationSolver(BaseSolver):
         self._debug = debug
         self._max_debug_depth = -1 if not debug else max_debug_depth
         time1 = datetime.now()
-        self._solving_order = self._get_solving_order()
+        self._prepare_solving_order()
         time2 = datetime.now()
-        if multiprocessing:
-            self._solve_mp(0)
-        else:
-            self._solve(0)
+        with rendering(render):
+            if multiprocessing:
+                self._solve_mp(0)
+            else:
+                self._solve(0)
         time3 = datetime.now()
         if show_time:
             print(f'Solutions {len(self._solutions)}; steps: {self._step_count}; '
@@ -95,17 +111,18 @@ class EquationSolver(BaseSolver):
                 self.show_solution(self._known_clues, self._known_letters)
                 self._solutions.append((self._known_clues.copy(), self._known_letters.copy()))
             return
-        clue, evaluator, clue_letters, pattern_maker, constraints = self._solving_order[current_index]
+        clue, _, clue_letters, pattern_maker, constraints = self._solving_order[current_index]
         twin_value = self._known_clues.get(clue, None)  # None if not a twin, twin's value if it is.
         pattern = pattern_maker(self._known_clues)
+        evaluate = self._bind_evaluator(current_index)
         if current_index < self._max_debug_depth:
             print(f'{" | " * current_index} {clue.name} letters={clue_letters} pattern="{pattern.pattern}"')
         try:
-            for next_letter_values in self.get_letter_values(self._known_letters, clue_letters):
+            for next_letter_values in self._candidate_letter_values(current_index, pattern, twin_value):
                 self._step_count += 1
                 for letter, value in zip(clue_letters, next_letter_values, strict=True):
                     self._known_letters[letter] = value
-                clue_values = evaluator(self._known_letters)
+                clue_values = evaluate(next_letter_values)
                 if twin_value:
                     if twin_value not in clue_values:
                         continue
@@ -136,17 +153,18 @@ class EquationSolver(BaseSolver):
 
     def _solve_mp(self, current_index: int) -> None:
         assert current_index < len(self._solving_order)
-        clue, evaluator, clue_letters, pattern_maker, constraints = self._solving_order[current_index]
+        clue, _, clue_letters, pattern_maker, constraints = self._solving_order[current_index]
         twin_value = self._known_clues.get(clue, None)  # None if not a twin, twin's value if it is.
         assert twin_value is None
         pattern = pattern_maker(self._known_clues)
+        evaluate = self._bind_evaluator(current_index)
         if current_index < self._max_debug_depth:
             print(f'{" | " * current_index} {clue.name} letters={clue_letters} pattern="{pattern.pattern}"')
 
         items = []
-        for next_letter_values in self.get_letter_values(self._known_letters, clue_letters):
+        for next_letter_values in self._candidate_letter_values(current_index, pattern, None):
             self._known_letters.update(zip(clue_letters, next_letter_values, strict=True))
-            clue_values = evaluator(self._known_letters)
+            clue_values = evaluate(next_letter_values)
             for clue_value in clue_values:
                 if not (clue_value and pattern.fullmatch(str(clue_value))):
                     continue
@@ -174,6 +192,7 @@ class EquationSolver(BaseSolver):
             seen = {id for id, *_ in args}
             print(f'There are {len(args)} processes')
             max_id = 0
+            import multiprocessing  # Deferred, as only this code path needs it.
             with multiprocessing.Pool() as pool:
                 results = pool.imap_unordered(self._mp_bridge, args)
                 for (id, solutions) in results:
@@ -204,13 +223,148 @@ class EquationSolver(BaseSolver):
         self._known_clues = known_clues
         self._debug = False
         self._max_debug_depth = -1
-        self._solving_order = self._get_solving_order()
+        self._prepare_solving_order()
         for i in range(current_index + 1):
             clue, *_ = self._solving_order[i]
             assert clue in self._known_clues
         self._solve(current_index + 1)
         return id, list(self._solutions)
 
+    def _prepare_solving_order(self) -> None:
+        self._solving_order = self._get_solving_order()
+        self._inverters = tuple(make_inverter(step.evaluator, step.letters[0])
+                                if len(step.letters) == 1 else None
+                                for step in self._solving_order)
+        self._partial_evaluators = self._make_partial_evaluators()
+        self._length_checks = self._make_length_checks()
+
+    def _make_partial_evaluators(self) -> Sequence[PartialEvaluator | None]:
+        """For each step that assigns letters, a partial evaluator fixing the letters of earlier steps."""
+        result = []
+        known_letters: set[Letter] = set()
+        for step in self._solving_order:
+            result.append(make_partial_evaluator(step.evaluator, known_letters, step.letters)
+                          if step.letters else None)
+            known_letters.update(step.letters)
+        return tuple(result)
+
+    def _bind_evaluator(self, current_index: int) -> Callable[[Sequence[int]], Iterable[ClueValue]]:
+        """
+        Returns a function that evaluates the step's clue, given the values of the step's letters.  The letters of
+        earlier steps must not change while it is in use, so a new one is needed each time the step is reached.
+        """
+        if (partial_evaluator := self._partial_evaluators[current_index]) is not None:
+            return partial_evaluator.bind(self._known_letters)
+        evaluator = self._solving_order[current_index].evaluator
+        known_letters = self._known_letters
+        return lambda _values: evaluator(known_letters)
+
+    def _make_length_checks(self) -> Sequence[Sequence[Sequence[tuple[BoundsFunction, int]]]]:
+        """
+        For each step, and each letter it assigns, the clues whose length is worth checking as soon as
+        that letter has a value.  A clue is checked if all but a few of its letters are then known.
+
+        This relies on every letter having a value in _items, and on every square of a clue holding one
+        digit, so is only done if get_letter_values() and make_pattern_generator() aren't overridden.
+        """
+        if (type(self).get_letter_values is not EquationSolver.get_letter_values
+                or type(self).make_pattern_generator is not EquationSolver.make_pattern_generator
+                or not self._items or not all(isinstance(item, int) for item in self._items)):
+            return tuple(((),) * len(step.letters) for step in self._solving_order)
+        self._item_bounds = min(self._items), max(self._items)
+
+        def has_one_digit_per_square(clue: Clue) -> bool:
+            return all((digits := pattern_digits(self.get_allowed_regexp(location))) is not None
+                       and len(digits) == 1 for location in clue.locations)
+
+        bounds = {step.evaluator: make_bounds_function(step.evaluator)
+                  if has_one_digit_per_square(step.clue) else None
+                  for step in self._solving_order}
+        result = []
+        known_letters: set[Letter] = set()
+        for index, step in enumerate(self._solving_order):
+            known_letters.update(step.letters)
+            step_checks = []
+            for position, letter in enumerate(step.letters):
+                checks = []
+                for later_step in self._solving_order[index:]:
+                    function = bounds[later_step.evaluator]
+                    if function is None or letter not in later_step.evaluator.vars:
+                        continue
+                    if later_step is step:
+                        if position == len(step.letters) - 1:
+                            continue  # The clue is about to be evaluated anyway.
+                    elif len(set(later_step.evaluator.vars) - known_letters) > _LOOKAHEAD_UNKNOWN_LETTERS:
+                        continue
+                    checks.append((function, later_step.clue.length))
+                step_checks.append(tuple(checks))
+            result.append(tuple(step_checks))
+        return tuple(result)
+
+    def _letter_values(self, current_index: int) -> Iterable[Sequence[int]]:
+        """
+        Returns get_letter_values() for the step, but without the assignments that leave some clue unable to have the
+        right number of digits.  The check is made after each letter, so whole sets of permutations are skipped at once.
+        """
+        clue_letters = self._solving_order[current_index].letters
+        checks = self._length_checks[current_index]
+        if not any(checks):
+            return self.get_letter_values(self._known_letters, clue_letters)
+
+        known_letters = dict(self._known_letters)
+        used = set(known_letters.values())
+        unused_values = [i for i in self._items if i not in used]
+        taken = [False] * len(unused_values)
+        values: list[int] = []
+        item_bounds = self._item_bounds
+
+        def extend(position: int) -> Iterator[tuple[int, ...]]:
+            letter = clue_letters[position]
+            for i, value in enumerate(unused_values):
+                if taken[i]:
+                    continue
+                known_letters[letter] = value
+                if all(can_have_length(bounds(known_letters, item_bounds), length)
+                       for bounds, length in checks[position]):
+                    taken[i] = True
+                    values.append(value)
+                    if position + 1 == len(clue_letters):
+                        yield tuple(values)
+                    else:
+                        yield from extend(position + 1)
+                    values.pop()
+                    taken[i] = False
+            del known_letters[letter]
+
+        return extend(0)
+
+    def _candidate_letter_values(self, current_index: int, pattern: re.Pattern[str],
+                                 twin_value: str | None) -> Iterable[Sequence[int]]:
+        """
+        The values of the step's letters worth evaluating.  If the step assigns a single letter that
+        can be solved for, only the values that can give a clue value matching the pattern are returned.
+        Otherwise, this is _letter_values().
+        """
+        clue = self._solving_order[current_index].clue
+        letter_values = self._letter_values(current_index)
+        if (inverter := self._inverters[current_index]) is None:
+            return letter_values
+        if twin_value:
+            targets = [int(twin_value)] if twin_value.isdigit() else None
+        else:
+            # Solving is only worth it if there are fewer targets than letter values.
+            limit = len(self._items) - len(self._known_letters) if self._items else _TARGET_LIMIT
+            targets = pattern_values(pattern.pattern, clue.length, limit)
+        if targets is None or (candidates := inverter.solve(self._known_letters, targets)) is None:
+            return letter_values
+        if type(self).get_letter_values is EquationSolver.get_letter_values:
+            # There are usually far fewer candidates than items.
+            used = set(self._known_letters.values())
+            values = [value for value in candidates if value in self._item_index and value not in used]
+            values.sort(key=self._item_index.__getitem__)
+            return [(value,) for value in values]
+        return [values for values in letter_values if values[0] in candidates]
+
     def _get_solving_order(self) -> Sequence[SolvingStep]:
         """Figures out the best order to solve the various clues."""
         result: list[SolvingStep] = []
@@ -251,9 +405,13 @@ class EquationSolver(BaseSolver):
             done_constraints = [checker for checker, clues in constraints if not clues]
             constraints = [(checker, clues) for checker, clues in constraints if clues]
             result.append(SolvingStep(clue, evaluator, tuple(sorted(unknown_letters)), pattern, done_constraints))
+            # Only these clues, and other evaluators of the same clue, can have new intersections.
+            crossing_clues = {clue, *self.crossing_clues(clue)}
             for other_clue, _, other_unknown_letters, other_intersections, other_locations in not_yet_ordered.values():
                 # Update the remaining not_yet_ordered clues, indicating more known letters and updated intersections
                 other_unknown_letters.difference_update(unknown_letters)
+                if other_clue not in crossing_clues:
+                    continue
                 # What intersections does clue create with this new clue?
                 new_intersections = Intersection.get_intersections(other_clue, clue)
                 other_intersections += new_intersections
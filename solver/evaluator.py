@@ -1,13 +1,32 @@
+import functools
+import hashlib
+import marshal
 import math
+import os
+import sys
 from collections.abc import Callable, Iterable, Mapping, Sequence
 from dataclasses import dataclass
-from typing import ClassVar, cast
+from pathlib import Path
+from types import CodeType
+from typing import TYPE_CHECKING, ClassVar, cast
 
 from .clue_types import ClueValue, Letter
-from .equation_parser import EquationParser
+from .expression_optimizer import optimize, to_python
+
+if TYPE_CHECKING:
+    from .equation_parser import EquationParser, Parse
 
 type WrapperType[C, W] = Callable[[Evaluator[C, W], dict[Letter, int]], Iterable[W]]
 
+# (expression, sorted names of the mapping's functions)
+type _CacheKey = tuple[str, tuple[str, ...]]
+# (Parse.expression, variables, Python source, code that evaluates to the lambda)
+type _CacheEntry = tuple[object, tuple[Letter, ...], str, CodeType]
+
+EXPRESSION_CACHE_ENVIRONMENT_VARIABLE = 'PUZZLE_SOLVER_EXPRESSION_CACHE'
+# Changes to these files change the generated code, and so invalidate the disk cache.
+_CACHE_SOURCES = ('equation_parser.py', 'evaluator.py', 'expression_optimizer.py')
+
 
 @dataclass
 class Evaluator[C, W]:
@@ -15,7 +34,10 @@ class Evaluator[C, W]:
     _compiled_code: Callable[[dict[Letter, int]], C]
     _expression: str
     _vars: Sequence[Letter]
+    _tree: object = None
     _equation_parser: ClassVar[EquationParser | None] = None
+    _compilation_cache: ClassVar[dict[_CacheKey, list[_CacheEntry]]] = {}
+    _disk_cache_directory: ClassVar[Path | None] = None
 
     @classmethod
     def create_evaluator(cls, expression: str,
@@ -30,23 +52,68 @@ class Evaluator[C, W]:
                           mapping: Mapping[str, Callable] | None = None,
                           wrapper: WrapperType | None = None,
                           ) -> Sequence[Evaluator]:
-        if cls._equation_parser is None:
-            cls._equation_parser = EquationParser()
         if mapping is None:
             mapping = {}
         wrapper = wrapper or cls.standard_wrapper
 
-        parses = cls._equation_parser.parse(expression)
+        entries = cls._get_compiled_expression(expression, frozenset(mapping))
         my_globals = {'fact': cls.factorial, 'sqrt': cls.sqrt, 'math': math, **mapping}
-        mapping_vars = set(mapping.keys())
-        evaluators = []
-        for parse in parses:
-            variables = cast(Sequence[Letter], sorted(parse.vars()))
-            expression = parse.to_string(mapping_vars, False)
-            code = f"lambda {', '.join(variables)}: {expression}"
-            compiled_code = eval(code, my_globals, {})
-            evaluators.append(Evaluator(wrapper, compiled_code, expression, variables))
-        return evaluators
+        return [Evaluator(wrapper, eval(code, my_globals, {}), source, list(variables), tree)
+                for tree, variables, source, code in entries]
+
+    @classmethod
+    def set_disk_cache(cls, directory: Path | str | None) -> None:
+        """Persist compiled expressions in directory.
+
+        None reverts to the PUZZLE_SOLVER_EXPRESSION_CACHE environment variable, and
+        to no disk cache if that isn't set.  Since worker processes inherit the
+        environment, setting the variable lets them skip parsing entirely.
+        """
+        Evaluator._disk_cache_directory = None if directory is None else Path(directory)
+
+    @classmethod
+    def _get_compiled_expression(cls, expression: str, mapping_vars: frozenset[str]
+                                 ) -> list[_CacheEntry]:
+        """Parse and compile expression, or fetch the result from the cache.
+
+        The wrapper and the mapping's values don't affect the generated code, so only
+        the names of the mapping's functions are part of the key.
+        """
+        key = expression, tuple(sorted(mapping_vars))
+        cache = Evaluator._compilation_cache
+        if (entries := cache.get(key)) is None:
+            path = cls._disk_cache_path(key)
+            entries = _read_cache_file(path) if path else None
+            if entries is None:
+                entries = cls._compile_expression(expression, mapping_vars)
+                if path:
+                    _write_cache_file(path, entries)
+            cache[key] = entries
+        return entries
+
+    @classmethod
+    def _compile_expression(cls, expression: str, mapping_vars: frozenset[str]
+                            ) -> list[_CacheEntry]:
+        if cls._equation_parser is None:
+            # The parser pulls in the large prebuilt Lark module; load it on first use.
+            from .equation_parser import EquationParser
+            cls._equation_parser = EquationParser()
+        entries = []
+        for parse in cls._equation_parser.parse(expression):
+            variables = cast(tuple[Letter, ...], tuple(sorted(parse.vars())))
+            source = to_python(optimize(parse.expression, mapping_vars), mapping_vars)
+            code = compile(f"lambda {', '.join(variables)}: {source}", '<expression>', 'eval')
+            entries.append((parse.expression, variables, source, code))
+        return entries
+
+    @staticmethod
+    def _disk_cache_path(key: _CacheKey) -> Path | None:
+        directory = (Evaluator._disk_cache_directory
+                     or os.environ.get(EXPRESSION_CACHE_ENVIRONMENT_VARIABLE))
+        if not directory:
+            return None
+        digest = hashlib.sha256(repr((_cache_salt(), key)).encode()).hexdigest()
+        return Path(directory) / f'{digest}.marshal'
 
     @staticmethod
     def factorial(i):
@@ -66,6 +133,16 @@ class Evaluator[C, W]:
     def vars(self) -> Sequence[Letter]:
         return self._vars
 
+    @property
+    def wrapper(self) -> WrapperType[C, W]:
+        return self._wrapper
+
+    @property
+    def parse(self) -> Parse:
+        """The parse tree this evaluator was compiled from."""
+        from .equation_parser import Parse
+        return Parse(self._tree)
+
     @property
     def compiled_code(self) -> Callable[[dict[Letter, int]], C]:
         return self._compiled_code
@@ -98,3 +175,30 @@ class Evaluator[C, W]:
     __hash__ = object.__hash__
 
     __eq__ = object.__eq__
+
+
+@functools.cache
+def _cache_salt() -> str:
+    """Identifies the interpreter and the code generator, for the disk cache."""
+    digest = hashlib.sha256(sys.implementation.cache_tag.encode())
+    for name in _CACHE_SOURCES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def _read_cache_file(path: Path) -> list[_CacheEntry] | None:
+    try:
+        return list(marshal.loads(path.read_bytes()))
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache_file(path: Path, entries: list[_CacheEntry]) -> None:
+    # Write to a temporary file first, so concurrent readers never see a partial file.
+    temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary.write_bytes(marshal.dumps(tuple(entries)))
+        temporary.replace(path)
+    except OSError:
+        temporary.unlink(missing_ok=True)
@@ -0,0 +1,209 @@
+"""Interval arithmetic over expression trees.
+
+make_bounds_function() turns an evaluator's expression into a function that, given the
+letters known so far and a range for all the other letters, returns a range containing
+every value the expression can take.  EquationSolver uses it to abandon an assignment of
+letters as soon as some clue can no longer have the right number of digits.
+
+A bounds function returns None when it can't bound the expression, for example because
+it calls a function, or divides by a range containing zero.  It returns an empty range
+(low > high) when evaluating the expression is certain to fail.
+"""
+
+import math
+from collections.abc import Callable, Mapping
+
+from .clue_types import Letter
+from .evaluator import Evaluator
+
+type Interval = tuple[int, int]
+type BoundsFunction = Callable[[Mapping[Letter, int], Interval], Interval | None]
+
+EMPTY: Interval = (1, 0)
+
+# Function names used for operators, as in Parse.PARSE_BINOPS and Parse.PARSE_UNOPS.
+_BINARY_FUNCTIONS = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div', '**': 'pow'}
+_UNARY_FUNCTIONS = {'+': 'pos', '-': 'neg', '!': 'fact', '√': 'sqrt'}
+# The functions the evaluator itself provides for operators.
+_BUILTIN_FUNCTIONS = {'!': Evaluator.factorial, '√': Evaluator.sqrt}
+
+# Powers and factorials bigger than this aren't worth bounding.
+_MAX_BITS = 4096
+_MAX_FACTORIAL = 1000
+
+
+def make_bounds_function(evaluator: Evaluator) -> BoundsFunction | None:
+    """Return a function bounding the value of evaluator, or None if it can't be bounded."""
+    if evaluator.wrapper is not Evaluator.standard_wrapper or evaluator.parse.expression is None:
+        return None
+    return _Compiler(evaluator.compiled_code.__globals__).compile(evaluator.parse.expression)
+
+
+def can_have_length(interval: Interval | None, length: int) -> bool:
+    """Can an expression whose value is in interval have a positive value of length digits?"""
+    if interval is None:
+        return True
+    low, high = interval
+    return low <= high and high >= 10 ** (length - 1) and low < 10 ** length
+
+
+class _Unbounded(Exception):
+    pass
+
+
+class _Empty(Exception):
+    pass
+
+
+class _Compiler:
+    """Generates a bounds function as straight-line Python code, which is much faster
+    than walking the tree."""
+
+    def __init__(self, functions: Mapping[str, object]) -> None:
+        self.functions = functions
+        self.lines: list[str] = []
+        self.letters: dict[Letter, str] = {}
+        self.count = 0
+
+    def compile(self, tree: object) -> BoundsFunction | None:
+        try:
+            low, high = self.emit(tree)
+        except _Unbounded:
+            return None
+        letters = [f'    {name} = known.get({letter!r})\n'
+                   f'    {name}_low, {name}_high = default if {name} is None else ({name}, {name})'
+                   for letter, name in self.letters.items()]
+        source = '\n'.join([
+            'def bounds(known, default):',
+            *letters,
+            '    try:',
+            *(f'        {line}' for line in self.lines or ['pass']),
+            '    except _Unbounded:',
+            '        return None',
+            '    except _Empty:',
+            '        return EMPTY',
+            f'    return {low}, {high}',
+        ])
+        namespace = {'_Unbounded': _Unbounded, '_Empty': _Empty, 'EMPTY': EMPTY,
+                     **{function.__name__: function for function in _HELPERS}}
+        exec(source, namespace)
+        return namespace['bounds']
+
+    def emit(self, tree: object) -> tuple[str, str]:
+        """Emit code computing the bounds of tree, and return the expressions for them."""
+        match tree:
+            case int():
+                return str(tree), str(tree)
+            case str():
+                name = self.letters.setdefault(tree, f'v{len(self.letters)}')
+                return f'{name}_low', f'{name}_high'
+            case (op, left, right) if op in _BINARY_HELPERS:
+                if _BINARY_FUNCTIONS[op] in self.functions:
+                    raise _Unbounded
+                (a_low, a_high), (b_low, b_high) = self.emit(left), self.emit(right)
+                low, high = self.new_names()
+                match op:
+                    # The common cases are inlined.
+                    case '+':
+                        self.lines.append(f'{low}, {high} = {a_low} + {b_low}, {a_high} + {b_high}')
+                    case '-':
+                        self.lines.append(f'{low}, {high} = {a_low} - {b_high}, {a_high} - {b_low}')
+                    case '*':
+                        self.lines += [
+                            f'if {a_low} >= 0 and {b_low} >= 0:',
+                            f'    {low}, {high} = {a_low} * {b_low}, {a_high} * {b_high}',
+                            'else:',
+                            f'    {low}, {high} = _multiply({a_low}, {a_high}, {b_low}, {b_high})']
+                    case '/':
+                        self.lines += [
+                            f'if {a_low} >= 0 and {b_low} > 0:',
+                            f'    {low}, {high} = {a_low} // {b_high}, -(-{a_high} // {b_low})',
+                            'else:',
+                            f'    {low}, {high} = _divide({a_low}, {a_high}, {b_low}, {b_high})']
+                    case _:
+                        helper = _BINARY_HELPERS[op].__name__
+                        self.lines.append(
+                            f'{low}, {high} = {helper}({a_low}, {a_high}, {b_low}, {b_high})')
+                return low, high
+            case (op, operand) if op in _UNARY_HELPERS:
+                if self.functions.get(_UNARY_FUNCTIONS[op]) is not _BUILTIN_FUNCTIONS.get(op):
+                    raise _Unbounded
+                a_low, a_high = self.emit(operand)
+                if op == '+':
+                    return a_low, a_high
+                low, high = self.new_names()
+                if op == '-':
+                    self.lines.append(f'{low}, {high} = -{a_high}, -{a_low}')
+                else:
+                    helper = _UNARY_HELPERS[op].__name__
+                    self.lines.append(f'{low}, {high} = {helper}({a_low}, {a_high})')
+                return low, high
+        raise _Unbounded
+
+    def new_names(self) -> tuple[str, str]:
+        self.count += 1
+        return f'i{self.count}_low', f'i{self.count}_high'
+
+
+# The helpers are called by the generated code.  Each returns an interval, or raises
+# _Unbounded or _Empty.
+
+def _multiply(a_low: int, a_high: int, b_low: int, b_high: int
+              ) -> Interval:
+    products = (a_low * b_low, a_low * b_high, a_high * b_low, a_high * b_high)
+    return min(products), max(products)
+
+
+def _divide(a_low: int, a_high: int, b_low: int, b_high: int) -> Interval:
+    if b_low <= 0 <= b_high:
+        raise _Empty if b_low == b_high == 0 else _Unbounded
+    # Round outwards, so that the bounds stay integers.
+    floors = [x // y for x in (a_low, a_high) for y in (b_low, b_high)]
+    ceilings = [-(-x // y) for x in (a_low, a_high) for y in (b_low, b_high)]
+    return min(floors), max(ceilings)
+
+
+def _power(low: int, high: int, exponent_low: int, exponent_high: int
+           ) -> Interval:
+    if max(abs(low), abs(high)).bit_length() * exponent_high > _MAX_BITS:
+        raise _Unbounded
+    if exponent_low == exponent_high and exponent_low >= 0:
+        n = exponent_low
+        if low >= 0 or n % 2 == 1:
+            return low ** n, high ** n
+        if high <= 0:
+            return high ** n, low ** n
+        return 0, max(low ** n, high ** n)
+    if low >= 1 and exponent_low >= 0:
+        # Both increasing in the base and in the exponent.
+        return low ** exponent_low, high ** exponent_high
+    raise _Unbounded
+
+
+def _square_root(low: int, high: int) -> Interval:
+    # Evaluator.sqrt fails for negative numbers and non-squares, and returns an integer.
+    if high < 0:
+        raise _Empty
+    low = max(low, 0)
+    root = math.isqrt(low)
+    if root * root < low:
+        root += 1
+    result = root, math.isqrt(high)
+    if result[0] > result[1]:
+        raise _Empty
+    return result
+
+
+def _factorial(low: int, high: int) -> Interval:
+    # Evaluator.factorial fails for negative numbers and non-integers.
+    low = max(low, 0)
+    if high < low:
+        raise _Empty
+    if high > _MAX_FACTORIAL:
+        raise _Unbounded
+    return math.factorial(low), math.factorial(high)
+
+
+_BINARY_HELPERS = {'+': None, '-': None, '*': _multiply, '/': _divide, '**': _power}
+_UNARY_HELPERS = {'+': None, '-': None, '√': _square_root, '!': _factorial}
+_HELPERS = (_multiply, _divide, _power, _square_root, _factorial)
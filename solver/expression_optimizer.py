@@ -0,0 +1,355 @@
+"""Optimization of Parse trees before they are compiled into evaluators.
+
+optimize() rewrites a Parse expression tree:
+  - constants are folded;
+  - sums and products of exact (integer-valued) operands are flattened and put into a
+    canonical order, so that equal subexpressions end up as identical subtrees;
+  - small integer powers are reduced to multiplications (x**2 -> x*x);
+  - in a sum or product, operands containing a sqrt or factorial, which raise
+    ArithmeticError for values outside their domain, are evaluated first, the
+    cheapest first;
+  - a sqrt or factorial of a constant outside its domain, such as √10, fails whatever
+    the letters are, and replaces the exact operations around it.
+
+to_python() then emits the tree as Python source, computing each repeated
+subexpression only once by way of an assignment expression.
+
+Only exact subtrees are reordered: letters, integer constants, +, -, *, non-negative
+integer powers, and the evaluator's own sqrt and factorial.  Division, function calls
+and any operator overridden by the caller's functions are left exactly as written.
+
+optimize() can also be told which letters are fixed, meaning that they get their values
+before all the others.  Operands depending only on fixed letters then come first in
+sums and products, so that together they form a single subtree, which a
+PartialEvaluator computes just once for all the values of the other letters.
+"""
+
+import math
+from collections import Counter
+from collections.abc import Set
+from itertools import count
+
+# The expression trees produced by EquationParser are nested tuples of str and int.
+type Tree = object
+
+# Function names used for operators, as in Parse.PARSE_BINOPS and Parse.PARSE_UNOPS.
+_BINARY_FUNCTIONS = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div', '**': 'pow'}
+_UNARY_FUNCTIONS = {'+': 'pos', '-': 'neg', '!': 'fact', '√': 'sqrt', "'": 'prime'}
+
+# Folding bigger constants than this costs more than it saves.
+_MAX_FOLDED_BITS = 4096
+_MAX_FOLDED_FACTORIAL = 100
+_MAX_REDUCED_POWER = 3
+
+# The rough cost of evaluating each operator, for ordering guards.
+_OPERATOR_COSTS = {'+': 1, '-': 1, '*': 2, '/': 2, '**': 4, '√': 4, '!': 8, "'": 8}
+_CALL_COST = 8
+
+_TEMPORARY_PREFIX = '_cse'
+
+
+def optimize(tree: Tree, functions: Set[str] = frozenset(), fixed: Set[str] = frozenset()
+             ) -> Tree:
+    """Return an optimized tree computing the same value as tree.
+
+    functions are the names the caller provides as functions; an operator whose
+    function name (e.g. "div" or "sqrt") is among them is left untouched.  fixed are
+    letters whose operands should be grouped together, as described above.
+    """
+    return _Optimizer(functions, fixed).optimize(tree)
+
+
+def free_letters(tree: Tree) -> frozenset[str]:
+    """The letters that tree uses."""
+    match tree:
+        case str():
+            return frozenset((tree,))
+        case ('function' | 'getitem', _, args):
+            return frozenset().union(*map(free_letters, args))
+        case (_, *operands):
+            return frozenset().union(*map(free_letters, operands))
+    return frozenset()
+
+
+def to_python(tree: Tree, functions: Set[str] = frozenset()) -> str:
+    """Return Python source computing tree, evaluating repeated subtrees only once.
+
+    The result uses the functions fact, sqrt and prime for those operators, and any
+    operator whose function name is in functions is also emitted as a call.
+    """
+    return _Emitter(tree, functions | {'fact', 'sqrt', 'prime'}).emit()
+
+
+class _Optimizer:
+    def __init__(self, functions: Set[str], fixed: Set[str]) -> None:
+        self.functions = functions
+        self.fixed = fixed
+
+    def is_overridden(self, op: str, arity: int) -> bool:
+        table = _BINARY_FUNCTIONS if arity == 2 else _UNARY_FUNCTIONS
+        return table[op] in self.functions
+
+    def optimize(self, tree: Tree) -> Tree:
+        match tree:
+            case str() | int():
+                return tree
+            case ('function' | 'getitem' as kind, name, args):
+                return kind, name, tuple(self.optimize(arg) for arg in args)
+            case (op, left, right):
+                left, right = self.optimize(left), self.optimize(right)
+                if self.is_overridden(op, 2):
+                    return op, left, right
+                # The left operand is evaluated first; the right one raises first only
+                # when the left one can't fail in some other way.
+                if self.always_fails(left):
+                    return left
+                if self.always_fails(right) and self.is_exact(left):
+                    return right
+                if op in ('+', '-', '*') and self.is_exact(left) and self.is_exact(right):
+                    return self.make_sum((op, left, right)) if op != '*' else \
+                        self.make_product((op, left, right))
+                if op == '**':
+                    return self.optimize_power(left, right)
+                return op, left, right
+            case (op, operand):
+                operand = self.optimize(operand)
+                if self.is_overridden(op, 1):
+                    return op, operand
+                return self.optimize_unary(op, operand)
+            case _:
+                raise ValueError(f"Cannot optimize {tree!r}")
+
+    def is_exact(self, tree: Tree) -> bool:
+        """Is tree known to compute an exact integer (or at least an exact rational)?"""
+        match tree:
+            case str() | int():
+                return True
+            case ('function' | 'getitem', _, _):
+                return False
+            case ('**', left, right):
+                return (not self.is_overridden('**', 2) and self.is_exact(left)
+                        and isinstance(right, int) and right >= 0)
+            case ('+' | '-' | '*' as op, left, right):
+                return (not self.is_overridden(op, 2)
+                        and self.is_exact(left) and self.is_exact(right))
+            case ('+' | '-' | '!' | '√' as op, operand):
+                return not self.is_overridden(op, 1) and self.is_exact(operand)
+            case _:
+                return False
+
+    def always_fails(self, tree: Tree) -> bool:
+        """Is tree a sqrt or factorial of a constant that always raises ArithmeticError?"""
+        match tree:
+            case ('√', int() as operand) if not self.is_overridden('√', 1):
+                return operand < 0 or math.isqrt(operand) ** 2 != operand
+            case ('!', int() as operand) if not self.is_overridden('!', 1):
+                return operand < 0
+        return False
+
+    def optimize_unary(self, op: str, operand: Tree) -> Tree:
+        if self.always_fails(operand):
+            return operand
+        match op, operand:
+            case '-', int():
+                return -operand
+            case '-', ('-', inner) if self.is_exact(inner):
+                return inner
+            case '-', _ if self.is_exact(operand):
+                return self.make_sum(('-', operand))
+            case '+', _ if self.is_exact(operand):
+                return operand
+            case '!', int() if 0 <= operand <= _MAX_FOLDED_FACTORIAL:
+                return math.factorial(operand)
+            case '√', int() if operand >= 0 and math.isqrt(operand) ** 2 == operand:
+                return math.isqrt(operand)
+        return op, operand
+
+    def optimize_power(self, base: Tree, exponent: Tree) -> Tree:
+        if (isinstance(base, int) and isinstance(exponent, int) and exponent >= 0
+                and exponent * abs(base).bit_length() <= _MAX_FOLDED_BITS):
+            return base ** exponent
+        if isinstance(exponent, int) and self.is_exact(base):
+            if exponent == 1:
+                return base
+            if 2 <= exponent <= _MAX_REDUCED_POWER:
+                product = base
+                for _ in range(exponent - 1):
+                    product = '*', product, base
+                return self.make_product(product)
+        return '**', base, exponent
+
+    # ------------------------------------------------------------------ sums
+
+    def make_sum(self, tree: Tree) -> Tree:
+        constant = 0
+        terms: list[tuple[bool, Tree]] = []   # (negated, term)
+
+        def collect(node: Tree, negated: bool) -> None:
+            nonlocal constant
+            match node:
+                case int():
+                    constant += -node if negated else node
+                case ('+', left, right) if self.is_exact(node):
+                    collect(left, negated)
+                    collect(right, negated)
+                case ('-', left, right) if self.is_exact(node):
+                    collect(left, negated)
+                    collect(right, not negated)
+                case ('-', operand) if self.is_exact(node):
+                    collect(operand, not negated)
+                case _:
+                    terms.append((negated, node))
+
+        collect(tree, False)
+        # Within each group, added terms come before subtracted ones.
+        terms.sort(key=lambda term: (self.sort_key(term[1])[:2], term[0], self.sort_key(term[1])))
+        result: Tree | None = None
+        if terms and terms[0][0] and constant > 0:
+            result, constant = constant, 0
+        for negated, term in terms:
+            if result is None:
+                result = ('-', term) if negated else term
+            else:
+                result = ('-' if negated else '+'), result, term
+        if result is None:
+            return constant
+        if constant:
+            result = ('+' if constant > 0 else '-'), result, abs(constant)
+        return result
+
+    # ------------------------------------------------------------------ products
+
+    def make_product(self, tree: Tree) -> Tree:
+        constant = 1
+        factors: list[Tree] = []
+
+        def collect(node: Tree) -> None:
+            nonlocal constant
+            match node:
+                case int():
+                    constant *= node
+                case ('*', left, right) if self.is_exact(node):
+                    collect(left)
+                    collect(right)
+                case ('-', operand) if self.is_exact(node):
+                    constant = -constant
+                    collect(operand)
+                case ('**', base, int() as exponent) if (
+                        self.is_exact(node) and 2 <= exponent <= _MAX_REDUCED_POWER):
+                    for _ in range(exponent):
+                        collect(base)
+                case _:
+                    factors.append(node)
+
+        collect(tree)
+        if not factors:
+            return constant
+        # The constant goes last, so that products of the same letters form a common
+        # prefix: 2ab(c+d) - ab computes a*b once.
+        factors.sort(key=self.sort_key)
+        result = factors[0]
+        for factor in factors[1:]:
+            result = '*', result, factor
+        if constant == -1:
+            return self.make_sum(('-', result))
+        if constant != 1:
+            result = '*', result, constant
+        return result
+
+    def sort_key(self, tree: Tree) -> tuple[int, int, int, int, str]:
+        # Operands using only fixed letters first.  Then guards, cheapest first, so that
+        # failures happen before any other work.  Then letters before compound
+        # expressions, and otherwise a canonical order.
+        guarded = _has_guard(tree)
+        return (0 if self.fixed and free_letters(tree) <= self.fixed else 1,
+                0 if guarded else 1,
+                _cost(tree) if guarded else 0,
+                0 if isinstance(tree, str) else 1,
+                repr(tree))
+
+
+def _has_guard(tree: Tree) -> bool:
+    """Does tree contain an operation that may raise ArithmeticError?"""
+    match tree:
+        case str() | int():
+            return False
+        case ('function' | 'getitem', _, args):
+            return any(_has_guard(arg) for arg in args)
+        case ('!' | '√', _):
+            return True
+        case (_, *operands):
+            return any(_has_guard(operand) for operand in operands)
+    return False
+
+
+def _cost(tree: Tree) -> int:
+    """A rough estimate of the work of evaluating tree."""
+    match tree:
+        case str() | int():
+            return 0
+        case ('function' | 'getitem', _, args):
+            return _CALL_COST + sum(map(_cost, args))
+        case (op, *operands):
+            return _OPERATOR_COSTS[op] + sum(map(_cost, operands))
+    return 0
+
+
+class _Emitter:
+    def __init__(self, tree: Tree, functions: Set[str]) -> None:
+        self.tree = tree
+        self.functions = functions
+        self.uses = Counter[Tree]()
+        self.temporaries: dict[Tree, str] = {}
+        self.names = (f'{_TEMPORARY_PREFIX}{i}' for i in count())
+
+    def emit(self) -> str:
+        self.count_uses(self.tree)
+        return self.emit_tree(self.tree)
+
+    def count_uses(self, tree: Tree) -> None:
+        if isinstance(tree, str | int):
+            return
+        self.uses[tree] += 1
+        if self.uses[tree] > 1:
+            # Its own subtrees are only computed the first time.
+            return
+        match tree:
+            case ('function' | 'getitem', _, args):
+                for arg in args:
+                    self.count_uses(arg)
+            case (_, *operands):
+                for operand in operands:
+                    self.count_uses(operand)
+
+    def emit_tree(self, tree: Tree) -> str:
+        if (name := self.temporaries.get(tree)) is not None:
+            return name
+        match tree:
+            case str():
+                return tree
+            case int():
+                return f'({tree})' if tree < 0 else str(tree)
+            case _:
+                source = self.emit_compound(tree)
+        if self.uses[tree] > 1:
+            name = self.temporaries[tree] = next(self.names)
+            return f'({name} := {source})'
+        return source
+
+    def emit_compound(self, tree: Tree) -> str:
+        match tree:
+            case ('function', name, args):
+                return f'{name}({", ".join(self.emit_tree(arg) for arg in args)})'
+            case ('getitem', name, args):
+                return f'{name}[{", ".join(self.emit_tree(arg) for arg in args)}]'
+            case (op, left, right):
+                left, right = self.emit_tree(left), self.emit_tree(right)
+                if (function := _BINARY_FUNCTIONS[op]) in self.functions:
+                    return f'{function}({left}, {right})'
+                return f'({left} {op} {right})'
+            case (op, operand):
+                operand = self.emit_tree(operand)
+                if (function := _UNARY_FUNCTIONS[op]) in self.functions:
+                    return f'{function}({operand})'
+                return f'({op}{operand})'
+        raise ValueError(f"Cannot emit {tree!r}")
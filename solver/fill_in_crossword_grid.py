@@ -6,7 +6,7 @@ from enum import Enum, IntEnum, auto
 from functools import cache
 from itertools import combinations, pairwise, starmap
 
-from solver import Clue, DancingLinks, DLConstraint, EquationSolver, Orderer
+from solver import Clue, DancingLinks, DLConstraint, EquationSolver, Orderer, Precedence
 
 """
 Crossword Grid Constraint Solver using Dancing Links
@@ -55,9 +55,18 @@ class FillInCrosswordGridAbstract(ABC):
     encoding: dict[str, tuple[tuple[int], tuple[int]]]
     constraints: dict[Hashable, list[DLConstraint]]
     optional_constraints: set[str]
+    precedences: list[Precedence]
+    # The constraints and optional constraints built by get_grid_constraints and
+    # handle_numbering, which every square type shares.
+    _base: tuple[dict[Hashable, list[DLConstraint]], set[str]] | None = None
+    # While sweeping: the square types, the debug level, and the index of each clue by id.
+    _sweep: tuple[Sequence[SquareType | Callable[[Square], SquareType]], int, dict[int, int]]
     finder: dict[tuple[int, Direction], dict[Square, list[list[DLConstraint]]]]
 
     ACROSS_DOWN_NUMBERED_SEPARATELY = False
+    # Order clues with different numbers using the solver's precedences.  Set this to
+    # False to use Orderer codes instead.
+    NUMBERING_BY_PRECEDENCE = True
 
     def __init__(
         self,
@@ -76,10 +85,10 @@ class FillInCrosswordGridAbstract(ABC):
             raise ValueError("Both width and height, or size, must be specified")
 
     def run(
-        self, *, debug: int = 0, square_type: SquareType = SquareType.FILLED
+        self, *, debug: int = 0,
+        square_type: SquareType | Callable[[Square], SquareType] = SquareType.FILLED,
     ) -> Sequence[Sequence[Clue]]:
         time1 = datetime.now()
-        self._reset_state()
         try:
             self._build_constraints(square_type)
             return self._solve(debug)
@@ -87,8 +96,43 @@ class FillInCrosswordGridAbstract(ABC):
             time2 = datetime.now()
             print(time2 - time1)
 
+    def run_sweep(
+        self,
+        square_types: Sequence[SquareType | Callable[[Square], SquareType]],
+        *, workers: int = 1, debug: int = 0,
+    ) -> list[Sequence[Sequence[Clue]]]:
+        """
+        Run once for each of the square types, returning the results in the same order.
+        The grid constraints and the numbering are only built once.  With more than one
+        worker, the square types are solved in parallel, in forked processes.
+        """
+        import multiprocessing  # Deferred, as only this code path needs it.
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            return [self.run(debug=debug, square_type=square_type)
+                    for square_type in square_types]
+        self._build_base()
+        # The workers send back each clue as its index in this list.
+        clues = list({id(clue): clue for row in self._base[0] if isinstance(row, Sequence)
+                      for clue in row if isinstance(clue, Clue)}.values())
+        global _forked_filler
+        _forked_filler = self
+        self._sweep = square_types, debug, {id(clue): i for i, clue in enumerate(clues)}
+        try:
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                return [[[clues[i] for i in result] for result in results]
+                        for results in pool.imap(_run_sweep_variant, range(len(square_types)))]
+        finally:
+            _forked_filler = None
+            del self._sweep
+
+    def _run_sweep_variant(self, index: int) -> list[list[int]]:
+        square_types, debug, clue_indices = self._sweep
+        results = self.run(debug=debug, square_type=square_types[index])
+        return [[clue_indices[id(clue)] for clue in result] for result in results]
+
     def _reset_state(self) -> None:
         self.constraints = {}
+        self.precedences = []
         self.finder = defaultdict(lambda: defaultdict(list))
         self.optional_constraints = {
             f"r{r}c{c}"
@@ -96,13 +140,28 @@ class FillInCrosswordGridAbstract(ABC):
             for c in range(1, self.width + 1)
         }
 
-    def _build_constraints(self, square_type: SquareType) -> None:
+    def _build_base(self) -> None:
+        """Build the constraints that don't depend on the square type, if not yet built."""
+        if self._base is not None:
+            return
+        self._reset_state()
         self.get_grid_constraints()
         self.handle_numbering()
+        self.finder.clear()  # big, and not needed anymore
+        self._base = self.constraints, self.optional_constraints
+
+    def _build_constraints(
+        self, square_type: SquareType | Callable[[Square], SquareType]
+    ) -> None:
+        self._build_base()
+        # handle_square_filling only adds rows and optional constraints, so it can work
+        # on shallow copies of the base.
+        constraints, optional_constraints = self._base
+        self.constraints = dict(constraints)
+        self.optional_constraints = set(optional_constraints)
         self.handle_square_filling(square_type)
         if not self.verify():
             raise RuntimeError("Error setting up the constraints")
-        self.finder.clear()  # big, and not needed anymore
 
     def _solve(self, debug: int) -> list[Sequence[DLConstraint]]:
         results: list[list[Clue]] = []
@@ -123,6 +182,7 @@ class FillInCrosswordGridAbstract(ABC):
             self.constraints,
             optional_constraints=self.optional_constraints,
             row_printer=print_me,
+            precedences=self.precedences,
         )
 
         solver.solve(debug=debug)
@@ -162,6 +222,9 @@ class FillInCrosswordGridAbstract(ABC):
         If self.ACROSS_DOWN_NUMBERED_SEPARATELY, then the order of the across clues is
         separate from the ordering of the down clues, and they should be numbered
         separately.
+
+        If self.NUMBERING_BY_PRECEDENCE, clues that aren't equal are ordered by a
+        Precedence on the location of the clue, rather than by Orderer codes.
         """
 
         finder = self.finder
@@ -175,20 +238,32 @@ class FillInCrosswordGridAbstract(ABC):
                 (across if clue[1].is_across else down).append(clue)
             clue_lists = [across, down]
 
+        if self.NUMBERING_BY_PRECEDENCE:
+            row_names = {id(items): row for row, items in self.constraints.items()}
+
+            def positions(clue: tuple[int, Direction]) -> dict[Hashable, int]:
+                return {row_names[id(items)]: (row - 1) * self.width + column
+                        for (row, column), values in finder[clue].items()
+                        for items in values}
+
         for clues in clue_lists:
             for clue1, clue2 in pairwise(clues):
                 (number1, direction1), (number2, direction2) = clue1, clue2
-                locations = finder[clue1].keys() | finder[clue2].keys()
                 assert number1 <= number2
+                if self.NUMBERING_BY_PRECEDENCE and number1 < number2:
+                    self.precedences.append(Precedence(positions(clue1), positions(clue2)))
+                    continue
+                locations = finder[clue1].keys() | finder[clue2].keys()
                 orderer_type, ch = (
                     (Orderer.LT, "<") if number1 < number2 else (Orderer.EQ, "=")
                 )
                 prefix = f"{number1}{direction1.letter}{ch}{number2}{direction2.letter}"
                 orderer = orderer_type(prefix, locations)
                 self.optional_constraints.update(orderer.all_codes())
-                for clue, ordering in ((clue1, orderer.left), (clue2, orderer.right)):
+                for clue, table in ((clue1, orderer.left_table()),
+                                    (clue2, orderer.right_table())):
                     for location, values in finder[clue].items():
-                        ordering_constraints = ordering(location)
+                        ordering_constraints = table[location]
                         for value in values:
                             value.extend(ordering_constraints)
 
@@ -353,6 +428,14 @@ class FillInCrosswordGridAbstract(ABC):
         return entry if isinstance(entry, int) else len(entry)
 
 
+# The filler whose sweep a forked worker process runs.
+_forked_filler: FillInCrosswordGridAbstract | None = None
+
+
+def _run_sweep_variant(index: int) -> list[list[int]]:
+    return _forked_filler._run_sweep_variant(index)
+
+
 class FillInCrosswordGrid(FillInCrosswordGridAbstract):
     acrosses: Sequence[tuple[int, Entry]]
     downs: Sequence[tuple[int, Entry]]
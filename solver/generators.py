@@ -1,12 +1,12 @@
 import itertools
 import math
 import string
-from collections import defaultdict
 from collections.abc import Callable, Iterable, Iterator, Sequence
-
-from more_itertools import sieve
+from typing import Any
 
 from .clue import Clue
+from .digit_dp import DigitDP
+from .primes import composites_between, primes_between
 
 """A collection of generators to use in various other puzzles."""
 BASE = 10
@@ -72,21 +72,12 @@ def nth_power(n: int) -> Callable[[Clue], Iterable[int]]:
 
 def prime(clue: Clue) -> Iterator[int]:
     """Returns primes"""
-    min_value, max_value = get_min_max(clue)
-    return itertools.dropwhile(lambda x: x < min_value, sieve(max_value))
+    return primes_between(*get_min_max(clue))
 
 
 def not_prime(clue: Clue) -> Iterator[int]:
     """Returns composites"""
-    min_value, max_value = get_min_max(clue)
-    primes = sieve(max_value)
-    while (next_prime := next(primes, max_value)) <= min_value:
-        pass
-    for i in range(min_value, max_value):
-        if i == next_prime:
-            next_prime = next(primes, max_value)
-        else:
-            yield i
+    return composites_between(*get_min_max(clue))
 
 
 def known[T: (int, str)](*values: T) -> Callable[[Clue], Iterable[T]]:
@@ -104,6 +95,17 @@ def permutation(alphabet: str = string.digits) -> Callable[[Clue], Iterator[str]
     return result
 
 
+def digit_constrained(**constraints: Any) -> Callable[[Clue], Iterator[int]]:
+    """
+    Returns the numbers whose digits meet the constraints, without trying the rest.
+    See DigitDP for the constraints.
+    """
+    def result(clue: Clue) -> Iterator[int]:
+        return iter(DigitDP(clue.length, base=BASE, **constraints))
+
+    return result
+
+
 def triangular(clue: Clue) -> Iterator[int]:
     """Returns triangular numbers"""
     return within_clue_limits(clue, (i * (i + 1) // 2 for i in itertools.count(1)))
@@ -170,21 +172,11 @@ def get_min_max(clue: Clue) -> tuple[int, int]:
     return min_value, max_value
 
 
-def prime_generator(max_value: int, primes: bool = True):
-    max_witness = math.isqrt(max_value)
-    composite_witnesses = defaultdict(list)
-    yield 2
-    for i in range(3, max_value, 2):
-        if i not in composite_witnesses:
-            if primes:
-                yield i
-            if i <= max_witness:
-                composite_witnesses[i * i].append(i)
-        else:
-            if not primes:
-                yield i
-            for witness in composite_witnesses.pop(i):
-                composite_witnesses[i + 2 * witness].append(witness)
+def prime_generator(max_value: int, primes: bool = True) -> Iterator[int]:
+    """Returns 2, and then the odd primes, or the odd composites, below max_value"""
+    if primes:
+        return primes_between(2, max_value)
+    return itertools.chain([2], (x for x in composites_between(3, max_value) if x & 1))
 
 
 def __fibonacci_like(start_i: int, start_j: int) -> Iterator[int]:
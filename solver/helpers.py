@@ -1,6 +1,7 @@
 import math
 
 from solver import ClueValue
+from solver.primes import is_prime as is_prime
 
 
 def is_square(n: int) -> bool:
@@ -0,0 +1,100 @@
+"""Evaluate an expression for many values of some of its letters, with the rest fixed.
+
+When EquationSolver reaches a step, the letters assigned by earlier steps already have
+their values, and only the step's own letters vary.  A PartialEvaluator splits the
+evaluator's expression into the largest subtrees that use only the fixed letters, and
+the rest.  bind() computes those subtrees once, when the step is reached, and returns a
+function that computes only the rest for each value of the step's letters.
+
+Nothing is cached beyond the function bind() returns, so when the solver backtracks and
+changes a fixed letter, it simply calls bind() again.
+"""
+
+import functools
+from collections.abc import Callable, Collection, Iterable, Sequence
+
+from .clue_types import ClueValue, Letter
+from .evaluator import Evaluator
+from .expression_optimizer import Tree, free_letters, optimize, to_python
+
+# The functions every evaluator gets.  Any others were provided by the caller.
+_EVALUATOR_GLOBALS = {'fact': Evaluator.factorial, 'sqrt': Evaluator.sqrt}
+
+_FIXED_PREFIX = '_fixed'
+
+
+class PartialEvaluator:
+    def __init__(self, fixed_letters: Sequence[Letter],
+                 prelude: Callable[..., tuple[object, ...]], body: Callable[..., object]) -> None:
+        self._fixed_letters = fixed_letters
+        self._prelude = prelude
+        self._body = body
+
+    def bind(self, known_letters: dict[Letter, int]) -> Callable[[Sequence[int]], Iterable[ClueValue]]:
+        """Return a function taking the values of the varying letters, and returning what
+        the evaluator would return.
+
+        The result is only valid while the fixed letters keep their values in known_letters.
+        """
+        try:
+            constants = self._prelude(*(known_letters[x] for x in self._fixed_letters))
+        except ArithmeticError:
+            # Every value of the varying letters fails.
+            return _no_values
+        body = functools.partial(self._body, *constants)
+
+        # As Evaluator.standard_wrapper()
+        def evaluate(values: Sequence[int]) -> Iterable[ClueValue]:
+            try:
+                result = body(*values)
+                int_result = int(result)
+                if result == int_result > 0:
+                    return str(int_result),
+                return ()
+            except ArithmeticError:
+                return ()
+
+        return evaluate
+
+
+def make_partial_evaluator(evaluator: Evaluator, fixed: Collection[Letter],
+                           letters: Sequence[Letter]) -> PartialEvaluator | None:
+    """Return a partial evaluator for evaluator, whose variables are the fixed letters and
+    letters, or None if there isn't one.
+
+    The function returned by bind() takes the values of letters, in that order.
+    """
+    if evaluator.wrapper is not Evaluator.standard_wrapper or evaluator.parse.expression is None:
+        return None
+    if not set(evaluator.vars) <= set(fixed) | set(letters):
+        return None
+    functions = evaluator.compiled_code.__globals__
+    overridden = {name for name, value in functions.items()
+                  if name not in ('math', '__builtins__') and _EVALUATOR_GLOBALS.get(name) is not value}
+    fixed = frozenset(fixed)
+    tree = optimize(evaluator.parse.expression, overridden, fixed)
+
+    subtrees: dict[Tree, str] = {}
+
+    def replace_fixed(node: Tree) -> Tree:
+        if not isinstance(node, int) and free_letters(node) <= fixed:
+            return subtrees.setdefault(node, f'{_FIXED_PREFIX}{len(subtrees)}')
+        match node:
+            case ('function' | 'getitem' as kind, name, args):
+                return kind, name, tuple(replace_fixed(arg) for arg in args)
+            case (op, *operands):
+                return op, *(replace_fixed(operand) for operand in operands)
+        return node
+
+    body_tree = replace_fixed(tree)
+    fixed_letters = sorted(frozenset().union(*map(free_letters, subtrees)))
+    # Each subtree's temporaries are assigned before they are used, so they can share names.
+    prelude_source = ''.join(f'{to_python(subtree, overridden)}, ' for subtree in subtrees)
+    prelude = eval(f"lambda {', '.join(fixed_letters)}: ({prelude_source})", functions)
+    body = eval(f"lambda {', '.join([*subtrees.values(), *letters])}: "
+                f"{to_python(body_tree, overridden)}", functions)
+    return PartialEvaluator(fixed_letters, prelude, body)
+
+
+def _no_values(_values: Sequence[int]) -> Iterable[ClueValue]:
+    return ()
@@ -1,11 +1,13 @@
 from .playfair import PlayfairSolver
 from .playfair_constraints import ConstraintRow, ConstraintsGenerator
+from .playfair_scanner import PlayfairScanner
 from .playfair_word_solver import PlayfairEncoder, Template
 
 __all__ = [
     "ConstraintRow",
     "ConstraintsGenerator",
     "PlayfairEncoder",
+    "PlayfairScanner",
     "PlayfairSolver",
     "Template",
 ]
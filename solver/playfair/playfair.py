@@ -1,12 +1,29 @@
-from collections.abc import Mapping, Sequence
+from collections.abc import Sequence
+from typing import Literal
 
-from .playfair_constraints import ConstraintRow, ConstraintsGenerator
+import numpy as np
+
+from solver.dancing_links import DancingLinks, DLConstraint
+
+from .playfair_constraints import LETTERS, ConstraintRow, ConstraintsGenerator
+
+_BITS = np.arange(25)
+_ANY_PAIR = 25 * 25
+
+# The hand-written search, or an exact cover solved by DancingLinks.
+type PlayfairBackend = Literal['search', 'dancing_links']
 
 
 class PlayfairSolver:
     results: list[ConstraintRow]
     debug: bool
     count: int
+    # The constraints' names, in sorted order; every row of every constraint; and, for
+    # each row, the number of its constraint and its (letter, square) pairs.
+    names: list[str]
+    rows: list[ConstraintRow]
+    row_constraint: np.ndarray
+    row_pairs: np.ndarray
 
     @staticmethod
     def test(*, debug: bool = False) -> None:
@@ -26,7 +43,8 @@ class PlayfairSolver:
         self.tail_length = tail
         self.constraints_generator = ConstraintsGenerator(plain_text, cipher_text)
 
-    def solve(self, *, debug: bool = False) -> Sequence[ConstraintRow]:
+    def solve(self, *, debug: bool = False, backend: PlayfairBackend = 'search'
+              ) -> Sequence[ConstraintRow]:
 
         def fill_in_tail(row: ConstraintRow) -> ConstraintRow | None:
             return row.fill_in_tail(self.tail_length)
@@ -34,30 +52,57 @@ class PlayfairSolver:
         constraints = self.constraints_generator.generate_all_constraints()
         constraints = {name: list(filter(None, map(fill_in_tail, constraint_rows)))
                        for name, constraint_rows in constraints.items()}
+        self.results = []
+        if backend == 'dancing_links':
+            return self.__solve_with_dancing_links(constraints, debug=debug)
+        # All the rows go in one table, grouped by constraint.  A constraint's number is
+        # its place in sorted order, so that ties between constraints are broken by name.
+        self.names = sorted(constraints)
+        self.rows = [row for name in self.names for row in constraints[name]]
+        self.row_constraint = np.repeat(np.arange(len(self.names)),
+                                        [len(constraints[name]) for name in self.names])
+        # The (letter, square) pairs of each row, as 25 * letter + square, padded with
+        # _ANY_PAIR, which is always allowed.
+        row_items = [[25 * letter + position for letter, position in row.items()]
+                     for row in self.rows]
+        width = max(map(len, row_items), default=0)
+        self.row_pairs = np.array([items + [_ANY_PAIR] * (width - len(items))
+                                   for items in row_items], dtype=np.int16).reshape(-1, width)
         self.count = 0
         self.debug = debug
-        self.__solve(0, constraints, ConstraintRow.empty())
+        self.__solve(0, np.arange(len(self.rows)), np.ones(len(self.names), dtype=bool),
+                     ConstraintRow.empty())
         return self.results
 
-    def __solve(self, depth: int,
-                pending_constraints: Mapping[str, Sequence[ConstraintRow]],
+    def __solve(self, depth: int, pending_rows: np.ndarray, pending_constraints: np.ndarray,
                 rows_so_far: ConstraintRow) -> None:
+        """
+        pending_rows are the indices of the rows, of the constraints still to be met, that
+        are consistent with rows_so_far.  pending_constraints flags those constraints.
+        """
         self.count += 1
         indent = " | " * depth if self.debug else None
-        if not pending_constraints:
+        if not pending_constraints.any():
             if self.debug:
                 print(f"{indent}✓ SOLUTION = {rows_so_far}")
             self.results.append(rows_so_far)
             return
         # Determine which constraint has the fewest rows in it
-        min_constraint_name, min_constraint = min(pending_constraints.items(), key=lambda x: (len(x[1]), x[0]))
-        min_count = len(min_constraint)
+        counts = np.bincount(self.row_constraint[pending_rows], minlength=len(self.names))
+        min_constraint = int(np.argmin(np.where(pending_constraints, counts, len(self.rows) + 1)))
+        min_constraint_name, min_count = self.names[min_constraint], int(counts[min_constraint])
         if min_count == 0:
             if self.debug:
                 print(f"{indent}✕ {min_constraint_name}")
             return
 
-        for i, current_row in enumerate(min_constraint):
+        next_pending_constraints = pending_constraints.copy()
+        next_pending_constraints[min_constraint] = False
+        # The rows of the other constraints, which are all that the recursive call needs.
+        other_rows = pending_rows[self.row_constraint[pending_rows] != min_constraint]
+        other_pairs = self.row_pairs[other_rows]
+        min_rows = pending_rows[self.row_constraint[pending_rows] == min_constraint]
+        for i, current_row in enumerate(self.rows[j] for j in min_rows):
             next_rows_so_far_direct = rows_so_far + current_row
             next_rows_so_far = next_rows_so_far_direct.fill_in_tail(self.tail_length)
             if not next_rows_so_far:
@@ -65,14 +110,12 @@ class PlayfairSolver:
                     print(f"{indent}{i + 1}/{min_count}✕ \"{min_constraint_name}\" {current_row} -> {next_rows_so_far_direct}:")
                 continue
             # For the recursive call, only keep those rows that are consistent with what we have built up so far.
-            # We also remove the current constraint from the table.
-            next_pending_constraints = {name: [row for row in constraint if row.is_consistent_with(next_rows_so_far)]
-                                        for name, constraint in pending_constraints.items()
-                                        if name != min_constraint_name}
+            next_pending_rows = other_rows[_allowed_pairs(next_rows_so_far)[other_pairs].all(axis=1)]
             if self.debug:
-                sizes = [f"{name}: {len(pending_constraints[name])}->{len(next_pending_constraints[name])}"
-                         for name in sorted(next_pending_constraints.keys())
-                         if len(pending_constraints[name]) != len(next_pending_constraints[name])]
+                next_counts = np.bincount(self.row_constraint[next_pending_rows], minlength=len(self.names))
+                sizes = [f"{self.names[j]}: {counts[j]}->{next_counts[j]}"
+                         for j in np.flatnonzero(next_pending_constraints)
+                         if counts[j] != next_counts[j]]
                 if next_rows_so_far_direct != next_rows_so_far:
                     temp = f"{next_rows_so_far} -> {next_rows_so_far_direct}"
                 else:
@@ -83,7 +126,74 @@ class PlayfairSolver:
                 else:
                     print(f"{indent}{i + 1}/{min_count} \"{min_constraint_name}\" {current_row} -> {temp} : {sizes}")
 
-            self.__solve(depth + 1 if min_count > 1 else depth, next_pending_constraints, next_rows_so_far)
+            self.__solve(depth + 1 if min_count > 1 else depth, next_pending_rows,
+                         next_pending_constraints, next_rows_so_far)
+
+    def __solve_with_dancing_links(self, constraints: dict[str, list[ConstraintRow]], *,
+                                   debug: bool) -> Sequence[ConstraintRow]:
+        """
+        Each constraint is a primary item, and each of its rows commits to its letters
+        with colored secondary items, so that DancingLinks only chooses rows that are
+        consistent with each other.  The items can't see the letters left over for the
+        gaps in the tail, so each solution's rows are still combined and filled in.
+        """
+        dl_constraints: dict[tuple[str, int], list[DLConstraint]] = {}
+        optional_constraints: set[str] = set()
+        for name, rows in constraints.items():
+            for i, row in enumerate(rows):
+                items = _row_items(row, self.tail_length)
+                optional_constraints.update(item for item, _ in items)
+                dl_constraints[name, i] = [name, *items]
+        solver = DancingLinks(dl_constraints, optional_constraints=optional_constraints)
+        for solution in solver.iter_solutions(debug=debug):
+            combined = ConstraintRow.empty()
+            for name, i in solution:
+                combined += constraints[name][i]
+            if (result := combined.fill_in_tail(self.tail_length)) is not None:
+                self.results.append(result)
+        self.count = solver.steps
+        return self.results
+
+
+def _row_items(row: ConstraintRow, tail_length: int) -> list[tuple[str, str]]:
+    """
+    The colored items for a row: each letter is colored with its square, and each square
+    with its letter.
+
+    In the sorted tail, the letters increase by at least one per square, so a letter's
+    index in LETTERS, less its index in the tail, can never decrease along the tail.  If
+    a row has that difference d at tail index i, then it is at least d at every later
+    tail index k, which the row records by coloring "k>=d" yes; and it is less than v for
+    every v > d at i itself, which the row records by coloring "i>=v" no.  Two rows that
+    put letters out of order, or too close together, then give one item both colors.
+    """
+    items = [(LETTERS[letter], str(position)) for letter, position in row.items()]
+    items += [(f'r{position // 5 + 1}c{position % 5 + 1}', LETTERS[letter])
+              for letter, position in row.items()]
+    start = 25 - tail_length
+    for letter, position in row.items():
+        if position >= start:
+            index = position - start
+            difference = letter - index
+            if difference:
+                items += [(f'tail{k}>={difference}', 'yes')
+                          for k in range(index + 1, tail_length)]
+            items += [(f'tail{index}>={v}', 'no') for v in range(difference + 1, start + 1)]
+    return list(dict.fromkeys(items))
+
+
+def _allowed_pairs(row: ConstraintRow) -> np.ndarray:
+    """
+    Which (letter, square) pairs, and _ANY_PAIR, a consistent row can have: a letter can
+    go in a square if that is where row has it, or if row has neither.
+    """
+    letters, positions = row.letter_mask(), row.position_mask()
+    free_letters = (letters >> _BITS & 1) == 0
+    free_positions = (positions >> _BITS & 1) == 0
+    allowed = np.ones(_ANY_PAIR + 1, dtype=bool)
+    allowed[:_ANY_PAIR] = np.outer(free_letters, free_positions).ravel()
+    allowed[[25 * letter + position for letter, position in row.items()]] = True
+    return allowed
 
 
 if __name__ == '__main__':
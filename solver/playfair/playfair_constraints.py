@@ -1,5 +1,5 @@
 import itertools
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from typing import Any
 
 
@@ -80,18 +80,46 @@ class ConstraintsGenerator:
         return result
 
 
+# The letters of a Playfair square, in order.  Letter i is stored as i + 1 in a cell.
+LETTERS = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
+_LETTER_INDEX = {letter: i for i, letter in enumerate(LETTERS)}
+_ALL = (1 << 25) - 1
+_SLOT_BASES = sum(1 << (5 * i) for i in range(25))
+
+
 class ConstraintRow:
-    _locations: frozenset[tuple[int, int]]
-    _letter_to_location: dict[str, tuple[int, int]]
-    _flat: str
+    """
+    A partial Playfair square.  _cells packs the 25 squares, in reading order, into
+    five-bit slots; a slot holds 0 if its square is empty, and 1 + the index of its
+    letter in LETTERS otherwise.  _letters and _positions are bitmasks of the letters
+    placed and of the squares filled, and _slots has all five bits of each filled slot
+    set.
+    """
+    __slots__ = ('_cells', '_letters', '_positions', '_slots')
+    _cells: int
+    _letters: int
+    _positions: int
+    _slots: int
 
     def __init__(self, location_dict: dict[str, tuple[int, int]]):
-        self._letter_to_location = location_dict
-        self._locations = frozenset(location_dict.values())
-        array = ['.'] * 25
+        cells = letters = positions = 0
         for letter, (row, column) in location_dict.items():
-            array[5 * row + column] = letter
-        self._flat = ''.join(array)
+            index, position = _LETTER_INDEX[letter], 5 * row + column
+            cells |= (index + 1) << (5 * position)
+            letters |= 1 << index
+            positions |= 1 << position
+        self._set(cells, letters, positions)
+
+    @classmethod
+    def _from_bits(cls, cells: int, letters: int, positions: int) -> ConstraintRow:
+        result = cls.__new__(cls)
+        result._set(cells, letters, positions)
+        return result
+
+    def _set(self, cells: int, letters: int, positions: int) -> None:
+        self._cells, self._letters, self._positions = cells, letters, positions
+        # The lowest bit of each nonempty slot, times 31, fills in each of those slots.
+        self._slots = ((cells | cells >> 1 | cells >> 2 | cells >> 3 | cells >> 4) & _SLOT_BASES) * 31
 
     @staticmethod
     def empty() -> ConstraintRow:
@@ -103,12 +131,29 @@ class ConstraintRow:
         location_dict = {letter: location for letter, location in all_positions if letter != '.'}
         return ConstraintRow(location_dict)
 
+    def letter_mask(self) -> int:
+        """Bit i is set if the letter LETTERS[i] has been placed."""
+        return self._letters
+
+    def position_mask(self) -> int:
+        """Bit 5 * row + column is set if that square is filled."""
+        return self._positions
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        """The index in LETTERS, and the position (5 * row + column), of each letter."""
+        positions = self._positions
+        while positions:
+            low = positions & -positions
+            position = low.bit_length() - 1
+            yield (self._cells >> (5 * position) & 31) - 1, position
+            positions ^= low
+
     def __repr__(self) -> str:
         array = ['.'] * 29
         for i in range(5, len(array), 6):
             array[i] = '|'
-        for letter, (row, column) in self._letter_to_location.items():
-            array[6 * row + column] = letter
+        for letter, position in self.items():
+            array[position + position // 5] = LETTERS[letter]
         return ''.join(array)
 
     def is_consistent_with(self, other: ConstraintRow) -> bool:
@@ -117,71 +162,76 @@ class ConstraintRow:
         If both have any letters in common, they are both in the same location.  If both have any locations in
         common, they both have the same letter.
         """
-        for letter, location in self._letter_to_location.items():
-            other_location = other._letter_to_location.get(letter, None)
-            if not other_location:
-                if location in other._locations:
-                    return False
-            else:
-                if location != other_location:
-                    return False
-        return True
+        # Where both have a letter, it must be the same letter.  Then the union is a
+        # consistent square if and only if it has as many letters as filled squares.
+        return (not (self._cells ^ other._cells) & self._slots & other._slots
+                and (self._letters | other._letters).bit_count()
+                == (self._positions | other._positions).bit_count())
 
     # noinspection SpellCheckingInspection
-    ALL_LETTERS = frozenset("ABCDEFGHIKLMNOPQRSTUVWXYZ")
+    ALL_LETTERS = frozenset(LETTERS)
 
     def missing_letters(self) -> set[str]:
-        return set(self.ALL_LETTERS).difference(list(self._letter_to_location.keys()))
+        return {letter for i, letter in enumerate(LETTERS) if not self._letters >> i & 1}
 
     def fill_in_tail(self, sorted_tail_length: int) -> ConstraintRow | None:
-        string = list(self._flat)
-        unused_letters = self.missing_letters()
+        cells, letters, positions = self._cells, self._letters, self._positions
+        unused = _ALL ^ letters
 
-        # We start off by pretending that the spot just before the tail is filled with a character smaller than 'A'
-        last_filled_index = len(string) - sorted_tail_length - 1
-        last_filled_value = chr(ord('A') - 1)
+        # We start off by pretending that the spot just before the tail is filled with a letter before 'A'.
+        last_filled_index = 25 - sorted_tail_length - 1
+        last_filled_value = -1
 
-        while last_filled_index < len(string):
+        while last_filled_index < 25:
             # Look for the next filled spot.  If there is none, create a fake one just beyond the end of the string
-            next_filled_index = next(
-                (i for i in range(last_filled_index + 1, len(string)) if string[i] != '.'),
-                len(string))
-            next_filled_value = string[next_filled_index] if next_filled_index < len(string) else chr(ord('Z') + 1)
-            # The next character should always be greater than the current one.  Otherwise, this has failed.
+            next_filled_index = last_filled_index + 1
+            while next_filled_index < 25 and not positions >> next_filled_index & 1:
+                next_filled_index += 1
+            next_filled_value = ((cells >> (5 * next_filled_index) & 31) - 1
+                                 if next_filled_index < 25 else 25)
+            # The next letter should always be greater than the current one.  Otherwise, this has failed.
             if next_filled_value <= last_filled_value:
                 return None
-            # Are there spots between the last filled character and this one?  If so, try to fill them.
+            # Are there spots between the last filled letter and this one?  If so, try to fill them.
             unfilled_spots = next_filled_index - last_filled_index - 1
             if unfilled_spots != 0:
-                candidates = [x for x in unused_letters if last_filled_value < x < next_filled_value]
-                if len(candidates) < unfilled_spots:
+                candidates = unused & ((1 << next_filled_value) - (1 << (last_filled_value + 1)))
+                count = candidates.bit_count()
+                if count < unfilled_spots:
                     return None
-                if len(candidates) == unfilled_spots:
+                if count == unfilled_spots:
                     # We have exactly the right number of candidates for the unfilled spots.  Fill them in
-                    string[last_filled_index + 1:next_filled_index] = sorted(candidates)
-                    unused_letters.difference_update(candidates)
+                    letters |= candidates
+                    unused ^= candidates
+                    for index in range(last_filled_index + 1, next_filled_index):
+                        low = candidates & -candidates
+                        cells |= low.bit_length() << (5 * index)
+                        positions |= 1 << index
+                        candidates ^= low
             last_filled_index = next_filled_index
             last_filled_value = next_filled_value
-        if len(unused_letters) == 1:
+        if unused.bit_count() == 1:
             # If we have exactly one unused letter left, there must be an unfilled spot in the string for it.
-            string[string.index('.')] = unused_letters.pop()
-        return ConstraintRow.from_string(string)
+            index = (~positions & (positions + 1)).bit_length() - 1
+            cells |= unused.bit_length() << (5 * index)
+            letters |= unused
+            positions |= 1 << index
+        return ConstraintRow._from_bits(cells, letters, positions)
 
     def __hash__(self) -> int:
-        return hash(self._flat)
+        return hash(self._cells)
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, ConstraintRow):
             return NotImplemented
-        return self._flat == other._flat
+        return self._cells == other._cells
 
     def __ne__(self, other: Any) -> bool:
         if not isinstance(other, ConstraintRow):
             return NotImplemented
-        return self._flat != other._flat
+        return self._cells != other._cells
 
     def __add__(self, other: ConstraintRow) -> ConstraintRow:
-        letter_to_location = {}
-        letter_to_location.update(self._letter_to_location)
-        letter_to_location.update(other._letter_to_location)
-        return ConstraintRow(letter_to_location)
+        """The union of two consistent rows."""
+        return ConstraintRow._from_bits(self._cells | other._cells, self._letters | other._letters,
+                                        self._positions | other._positions)
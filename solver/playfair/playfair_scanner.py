@@ -0,0 +1,163 @@
+"""Try a Playfair ciphertext against many keywords at once.
+
+The key squares of a batch of keywords are built together, as an array with one row per
+keyword, giving the index (in LETTERS) of the letter in each square.  Decoding a digraph
+only depends on the squares of its two letters, so a table of the 25 x 25 pairs of
+squares gives the squares of the decoded pair, and every keyword decodes every digraph
+with a few gathers.  The decodings are scored by the log-probabilities of their
+trigrams, looked up in a 25 x 25 x 25 array.
+"""
+
+import heapq
+from collections.abc import Sequence
+
+import numpy as np
+
+from .playfair_constraints import LETTERS
+
+
+def _decoding_table() -> np.ndarray:
+    """For each pair of squares, the squares of the letters that the pair decodes to."""
+    table = np.empty((25, 25, 2), dtype=np.intp)
+    for square1 in range(25):
+        for square2 in range(25):
+            (r1, c1), (r2, c2) = divmod(square1, 5), divmod(square2, 5)
+            if r1 == r2:
+                if c1 != c2:
+                    c1, c2 = (c1 - 1) % 5, (c2 - 1) % 5
+            elif c1 == c2:
+                r1, r2 = (r1 - 1) % 5, (r2 - 1) % 5
+            else:
+                c1, c2 = c2, c1
+            table[square1, square2] = 5 * r1 + c1, 5 * r2 + c2
+    return table
+
+
+def _byte_index() -> np.ndarray:
+    """For each byte, the index in LETTERS of its letter, with J read as I, or else -1."""
+    table = np.full(256, -1, dtype=np.intp)
+    for i, letter in enumerate(LETTERS):
+        table[ord(letter)] = table[ord(letter.lower())] = i
+    table[ord('J')] = table[ord('j')] = LETTERS.index('I')
+    return table
+
+
+_DECODING_TABLE = _decoding_table()
+_BYTE_INDEX = _byte_index()
+
+
+def to_indices(text: str | Sequence[str]) -> np.ndarray:
+    """The indices in LETTERS of the letters of text, with J read as I, skipping the rest."""
+    indices = _BYTE_INDEX[np.frombuffer(''.join(text).encode('latin-1', 'replace'), np.uint8)]
+    return indices[indices >= 0]
+
+
+def key_squares(keys: Sequence[str]) -> np.ndarray:
+    """
+    The key square of each keyword, as an array of shape (len(keys), 25).  A keyword's
+    letters come first, skipping any repeats, followed by the rest of the alphabet.
+    """
+    lengths = np.fromiter(map(len, keys), dtype=np.intp, count=len(keys))
+    letters = _BYTE_INDEX[np.frombuffer(''.join(keys).encode('latin-1', 'replace'), np.uint8)]
+    if (letters < 0).any():
+        raise ValueError('Keywords can only contain letters')
+    # The keyword and column of each letter.
+    rows = np.repeat(np.arange(len(keys)), lengths)
+    columns = np.arange(len(letters)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    # A letter's rank is the place it first appears in the keyword, or else 25 plus its
+    # place in the alphabet.  Sorting by rank gives the square.
+    ranks = np.tile(25 + np.arange(25), (len(keys), 1))
+    np.minimum.at(ranks, (rows, letters), columns)
+    return np.argsort(ranks, axis=1, kind='stable')
+
+
+def trigram_log_probabilities(text: str | Sequence[str]) -> np.ndarray:
+    """
+    The natural log of the frequency of each trigram of letters in text, as an array of
+    shape (25, 25, 25).  Every trigram is counted at least once, so that one unseen
+    trigram doesn't rule out a decoding.
+    """
+    indices = to_indices(text)
+    counts = np.ones((25, 25, 25))
+    np.add.at(counts, (indices[:-2], indices[1:-1], indices[2:]), 1)
+    return np.log(counts / counts.sum())
+
+
+class PlayfairScanner:
+    """Scores the decodings of a ciphertext under each of many keywords."""
+    _first: np.ndarray
+    _second: np.ndarray
+    _log_probabilities: np.ndarray
+
+    def __init__(self, cipher_text: str, log_probabilities: np.ndarray):
+        """The ciphertext's letters (J is read as I) are taken in pairs; others are ignored."""
+        indices = to_indices(cipher_text)
+        if len(indices) % 2:
+            raise ValueError('The cipher text must have an even number of letters')
+        self._first, self._second = indices[0::2], indices[1::2]
+        self._log_probabilities = log_probabilities
+
+    def decode(self, squares: np.ndarray) -> np.ndarray:
+        """
+        The decoding of the ciphertext under each key square, as an array of shape
+        (len(squares), len(cipher_text)) of indices in LETTERS.
+        """
+        rows = np.arange(len(squares))[:, None]
+        # Where each letter is in each square.
+        positions = np.empty_like(squares)
+        positions[rows, squares] = np.arange(25)
+        decoded = _DECODING_TABLE[positions[:, self._first], positions[:, self._second]]
+        return np.take_along_axis(squares, decoded.reshape(len(squares), -1), axis=1)
+
+    def score(self, squares: np.ndarray) -> np.ndarray:
+        """The log-probability of the trigrams of the decoding under each key square."""
+        plain = self.decode(squares)
+        return self._log_probabilities[plain[:, :-2], plain[:, 1:-1], plain[:, 2:]].sum(axis=1)
+
+    def scan(self, keys: Sequence[str], *, top: int = 10, workers: int = 1,
+             chunk_size: int = 4096) -> list[tuple[float, str, str]]:
+        """
+        The best top keywords, as (score, keyword, plain text) with the best first, and
+        ties going to the keyword that sorts last.  The keywords are scored in chunks,
+        which are shared among workers processes.
+        """
+        import multiprocessing  # Deferred, as only this code path needs it.
+        starts = range(0, len(keys), chunk_size)
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            chunks = [self._scan_chunk(keys, start, chunk_size, top) for start in starts]
+        else:
+            global _forked_scan
+            _forked_scan = self, keys, chunk_size, top
+            try:
+                with multiprocessing.get_context('fork').Pool(workers) as pool:
+                    chunks = pool.map(_scan_forked_chunk, starts)
+            finally:
+                _forked_scan = None
+        best = heapq.nlargest(top, (item for chunk in chunks for item in chunk))
+        squares = key_squares([key for _, key in best])
+        plain = self.decode(squares) if best else ()
+        return [(score, key, ''.join(LETTERS[i] for i in text))
+                for (score, key), text in zip(best, plain, strict=True)]
+
+    def _scan_chunk(self, keys: Sequence[str], start: int, chunk_size: int, top: int
+                    ) -> list[tuple[float, str]]:
+        """
+        The best top of the keywords in the chunk that starts at start, along with any
+        that tie with the last of them, so that scan() breaks ties the same way however
+        the keywords are split into chunks.
+        """
+        chunk = keys[start:start + chunk_size]
+        scores = self.score(key_squares(chunk))
+        if len(chunk) > top:
+            indices = np.flatnonzero(scores >= np.partition(scores, -top)[-top])
+        else:
+            indices = np.arange(len(chunk))
+        return [(float(scores[i]), chunk[i]) for i in indices]
+
+
+_forked_scan: tuple[PlayfairScanner, Sequence[str], int, int] | None = None
+
+
+def _scan_forked_chunk(start: int) -> list[tuple[float, str]]:
+    scanner, keys, chunk_size, top = _forked_scan
+    return scanner._scan_chunk(keys, start, chunk_size, top)
@@ -1,11 +1,15 @@
 import contextlib
 import math
+import os
 import pathlib
-import re
 from collections import Counter
 from collections.abc import Sequence
 from itertools import pairwise
 
+from solver.word_index import WordIndex
+
+from .playfair_scanner import PlayfairScanner, trigram_log_probabilities
+
 
 class PlayfairEncoder:
     def __init__(self, key: str):
@@ -44,28 +48,21 @@ class PlayfairEncoder:
         return f"<Playfair '{self.key}'>"
 
 
-def get_word_list():
+def get_word_list() -> WordIndex:
     filename = pathlib.Path(__file__).parent / "../../misc/words2.txt"
     print(filename)
-    with pathlib.Path(filename).open() as file:
-        words = set(file.read().split())
-    words = {x.upper().replace('-', '').replace("'", '').replace('J', 'I') for x in words}
-    words = {x for x in words if re.fullmatch(r'[A-Z]*', x)}
-    all_words = words
-    words = {x for x in words if x.isalpha() and len(set(x)) == len(x)}
-    return words, all_words
+    return WordIndex.from_file(filename, fold={'J': 'I'})
 
 
 def main1():
     global result
     _phrase = "maysamenbufo".upper()
-    _words, all_words = get_word_list()
+    words = get_word_list()
     encoder = PlayfairEncoder("SHOCKUMENTARY")
-    for word in sorted(all_words):
-        if len(word) != 4:
-            continue
+    targets = set(words.match('.AYS'))
+    for word in words.words(4):
         result = encoder.encode(word)
-        if re.fullmatch(r'.AYS', result) and result in all_words:
+        if result in targets:
             print(word, result)
 
 
@@ -98,24 +95,18 @@ def main2():
     #
     file = "/users/fy/Desktop/text_fic.txt"
     with pathlib.Path(file).open() as f:
-        result = f.read().upper().replace("J", "I")
+        result = f.read()
 
-    result = [x for x in result if x.isalpha()]
-    english = Template(result)
-    print(english.length, english @ english)
     phrase = "IBTH GYRK LQBY CKBX QOIL MCIE YTEM MIBI MVMG GOMH GYIE PAFA COEY".replace(" ", "")
+    scanner = PlayfairScanner(phrase, trigram_log_probabilities(result))
     words = get_word_list()
-    words = {x for x in words if len(x) == 9}
-    results = []
-    for word in sorted(words):
-        decode = PlayfairEncoder(word).decode(phrase)
-        delta = Template(decode) @ english
-        results.append((delta, word, decode))
-    results.sort(reverse=True)
+    # A keyword can't repeat a letter.
+    keys = list(words.match('.' * 9, distinct=True))
+    results = scanner.scan(keys, top=1000, workers=os.cpu_count() or 1)
     with pathlib.Path("/tmp/stuff.txt").open("w") as f:
         with contextlib.redirect_stdout(f):
-            for delta, word, decode in results:
-                print(word, decode, delta)
+            for score, word, decode in results:
+                print(word, decode, score)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+"""Prime numbers, for generators and helpers.
+
+primes_between() sieves the numbers in fixed-size segments.  Each segment is sieved
+by the primes up to its square root, which come from the earlier segments.  A sieved
+segment is kept as one bit per odd number, 64KB for each 2**20 numbers, and the 1024
+most recently used segments are kept for the rest of the process.  That is every
+number below 2**30, so generating the 9-digit primes never needs a sieve of all the
+numbers below them, and a second clue of the same length reuses the first one's work.
+
+is_prime() is a deterministic Miller-Rabin test, for single numbers too big for a
+segment to be worth sieving.
+"""
+
+import functools
+import itertools
+import math
+from collections.abc import Iterator
+
+# Segment i is the numbers in [i * SPAN, (i + 1) * SPAN).
+_SEGMENT_SPAN = 1 << 20
+_SEGMENT_ODDS = _SEGMENT_SPAN // 2
+# Between a segment's flags, one byte each, and the binary digits of its packed bits.
+_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_FROM_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# The bases needed for Miller-Rabin to be exact below each limit.  Above the last
+# limit, "prime" means a strong probable prime to all thirteen bases.
+_WITNESSES = ((3_474_749_660_383, _SMALL_PRIMES[:6]),
+              (341_550_071_728_321, _SMALL_PRIMES[:7]),
+              (3_317_044_064_679_887_385_961_981, _SMALL_PRIMES))
+
+
+def is_prime(n: int) -> bool:
+    if n < _SEGMENT_SPAN:
+        if n < 3:
+            return n == 2
+        return n & 1 == 1 and _segment(0)[n >> 4] >> (n >> 1 & 7) & 1 == 1
+    if any(n % p == 0 for p in _SMALL_PRIMES):
+        return False
+    d, s = n - 1, 0
+    while d & 1 == 0:
+        d, s = d >> 1, s + 1
+    witnesses = next((bases for limit, bases in _WITNESSES if n < limit), _SMALL_PRIMES)
+    for a in witnesses:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def primes_between(low: int, high: int) -> Iterator[int]:
+    """Yields the primes p with low <= p < high, in order."""
+    if low <= 2 < high:
+        yield 2
+    for index in range(max(low, 0) // _SEGMENT_SPAN, (high - 1) // _SEGMENT_SPAN + 1):
+        start = index * _SEGMENT_SPAN
+        # The flags for the odd numbers in [low, high) in this segment.
+        first = max(low - start, 0) >> 1
+        last = min(high - start, _SEGMENT_SPAN) >> 1
+        yield from itertools.compress(range(start + 2 * first + 1, start + 2 * last, 2),
+                                      _flags(index)[first:last])
+
+
+def composites_between(low: int, high: int) -> Iterator[int]:
+    """Yields the numbers n with low <= n < high that aren't prime, in order."""
+    next_prime, primes = low - 1, primes_between(low, high)
+    for value in range(low, high):
+        if value > next_prime:
+            next_prime = next(primes, high)
+        if value != next_prime:
+            yield value
+
+
+# Enough for every number below 2**30, so all of a 9-digit range.
+@functools.lru_cache(maxsize=1024)
+def _segment(index: int) -> bytes:
+    """
+    Which odd numbers in [index * SPAN, (index + 1) * SPAN) are prime.  Bit j of byte k
+    is set when index * SPAN + 2 * (8k + j) + 1 is prime.
+    """
+    start = index * _SEGMENT_SPAN
+    end = start + _SEGMENT_SPAN
+    # The flag at i is for start + 2i + 1.
+    flags = bytearray(b'\x01') * _SEGMENT_ODDS
+    if index == 0:
+        flags[0] = 0  # 1 isn't prime
+        primes: Iterator[int] = (p for p in range(3, math.isqrt(end) + 1, 2) if flags[p >> 1])
+    else:
+        primes = primes_between(3, math.isqrt(end - 1) + 1)
+    for p in primes:
+        # The first odd multiple of p that is in the segment, and isn't p itself.
+        multiple = max(p * p, -(-start // p) * p)
+        if multiple & 1 == 0:
+            multiple += p
+        first = (multiple - start) >> 1
+        if first < _SEGMENT_ODDS:
+            flags[first::p] = bytes(len(range(first, _SEGMENT_ODDS, p)))
+    # The bits, most significant first, are the flags in reverse.
+    return int(flags.translate(_TO_DIGITS)[::-1], 2).to_bytes(_SEGMENT_ODDS // 8, 'little')
+
+
+def _flags(index: int) -> bytes:
+    """The flags of _segment(index), one byte for each odd number."""
+    bits = int.from_bytes(_segment(index), 'little')
+    return format(bits, f'0{_SEGMENT_ODDS}b').encode()[::-1].translate(_FROM_DIGITS)
@@ -0,0 +1,131 @@
+"""Headless rendering of solved grids.
+
+The render mode is one of:
+  - "graphics": draw the grid with matplotlib (the default)
+  - "text":     print the grid as plain text
+  - "json":     print the grid and clue values as a line of JSON
+  - "none":     don't show anything
+
+It is taken from the PUZZLE_SOLVER_HEADLESS environment variable ("1"/"true"/"text",
+"json", or "none"), unless overridden by set_render_mode() or by solve(render=...).
+Nothing in this module imports matplotlib.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from .clue import Clue
+    from .clue_types import ClueValue, Location
+
+type RenderMode = Literal['graphics', 'text', 'json', 'none']
+
+HEADLESS_ENVIRONMENT_VARIABLE = 'PUZZLE_SOLVER_HEADLESS'
+
+_mode_override: RenderMode | None = None
+
+
+def render_mode() -> RenderMode:
+    """Return the current render mode."""
+    if _mode_override is not None:
+        return _mode_override
+    value = os.environ.get(HEADLESS_ENVIRONMENT_VARIABLE, '').strip().lower()
+    if value in ('', '0', 'false', 'no'):
+        return 'graphics'
+    if value == 'json':
+        return 'json'
+    if value == 'none':
+        return 'none'
+    return 'text'
+
+
+def set_render_mode(mode: RenderMode | None) -> None:
+    """Set the process-wide render mode.  None reverts to the environment variable."""
+    global _mode_override
+    _mode_override = mode
+
+
+@contextmanager
+def rendering(render: bool | None) -> Generator[None]:
+    """Temporarily force graphics on (True) or off (False).  None changes nothing.
+
+    When graphics are turned off, an explicit "json" or "none" mode is kept;
+    otherwise solutions are printed as text.  The mode is also put into the
+    environment, so that worker processes started meanwhile inherit it.
+    """
+    if render is None:
+        yield
+        return
+    saved_override = _mode_override
+    saved_environment = os.environ.get(HEADLESS_ENVIRONMENT_VARIABLE)
+    if render:
+        new_mode: RenderMode = 'graphics'
+    else:
+        current = render_mode()
+        new_mode = 'text' if current == 'graphics' else current
+    set_render_mode(new_mode)
+    os.environ[HEADLESS_ENVIRONMENT_VARIABLE] = '0' if new_mode == 'graphics' else new_mode
+    try:
+        yield
+    finally:
+        set_render_mode(saved_override)
+        if saved_environment is None:
+            os.environ.pop(HEADLESS_ENVIRONMENT_VARIABLE, None)
+        else:
+            os.environ[HEADLESS_ENVIRONMENT_VARIABLE] = saved_environment
+
+
+def grid_lines(*, max_row: int, max_column: int,
+               clued_locations: set[Location] | None = None,
+               location_to_entry: Mapping[Location, str] | None = None,
+               blacken_unused: bool = True) -> list[str]:
+    """Return the grid, one string per row.
+
+    Unknown squares are shown as ".", and unused squares as "#".  Like draw_grid(),
+    max_row and max_column are one more than the last row and column.
+    """
+    location_to_entry = location_to_entry or {}
+    lines = []
+    for row in range(1, max_row):
+        line = []
+        for column in range(1, max_column):
+            location = row, column
+            if location in location_to_entry:
+                line.append(str(location_to_entry[location]))
+            elif clued_locations is None or location in clued_locations:
+                line.append('.')
+            else:
+                line.append('#' if blacken_unused else ' ')
+        lines.append(' '.join(line))
+    return lines
+
+
+def render_headless(mode: RenderMode, *, max_row: int, max_column: int,
+                    clued_locations: set[Location] | None = None,
+                    location_to_entry: Mapping[Location, str] | None = None,
+                    clue_values: Mapping[Clue, ClueValue] | None = None,
+                    subtext: str | None = None, blacken_unused: bool = True) -> None:
+    """Print a solution in the given non-graphics mode."""
+    if mode == 'none':
+        return
+    lines = grid_lines(max_row=max_row, max_column=max_column,
+                       clued_locations=clued_locations,
+                       location_to_entry=location_to_entry,
+                       blacken_unused=blacken_unused)
+    if mode == 'json':
+        data: dict[str, object] = {'grid': lines}
+        if clue_values:
+            data['clues'] = {clue.name: str(value) for clue, value in clue_values.items()}
+        if subtext is not None:
+            data['subtext'] = subtext
+        print(json.dumps(data))
+    else:
+        print('\n'.join(lines))
+        if subtext is not None:
+            print(subtext)
+        print()
@@ -0,0 +1,285 @@
+"""A word list, compiled into a minimal automaton (a DAWG) for fast lookups.
+
+The words are stored as a trie in which identical subtrees are merged, so that the
+common endings of words (-ING, -ATIONS, ...) are stored once.  Each node is a run of
+consecutive edges, and each edge is packed into one 32-bit integer:
+    bits 0-7    the letter
+    bit 8       set on the last edge of its node
+    bits 9-31   the index of the child's first edge, or 0 if the child has no edges.
+A parallel array gives, for each edge, the lengths of the words that can follow it, as
+a bitmask.  Bit 0 is set when the letters so far are a word, and bit n is set when some
+word continues for another n letters.  Any search for words of a given length, and so
+every pattern and anagram, only follows edges that can lead to a word of that length.
+
+Compiling a large word list takes a few seconds.  WordIndex.from_file saves the compiled
+index in a cache directory, and later runs memory-map it, which takes milliseconds.
+"""
+
+import array
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+
+DEFAULT_DIRECTORY = Path(tempfile.gettempdir()) / 'word_index'
+
+# Words longer than this are dropped, so that the length masks fit in 64 bits.
+MAX_LENGTH = 63
+
+_MAGIC = b'DAWG'
+_VERSION = 1
+# Magic, version, edge count, word count, root, padding, root's length mask.
+_HEADER = struct.Struct('=4sIIIII Q')
+_LETTER_MASK = 0xFF
+_LAST_EDGE = 1 << 8
+_CHILD_SHIFT = 9
+
+
+class WordIndex:
+    """
+    A set of words, with lookups by pattern, by length, and by multiset of letters.
+    Words are normalized to upper case, with hyphens, apostrophes, and spaces removed.
+    Words that then contain anything but the letters A-Z are dropped.  Words, patterns,
+    and letters looked up are normalized the same way, including the fold.
+    """
+    _edges: memoryview
+    _table: dict[int, str | None]
+    _masks: memoryview
+    _root: int
+    _root_mask: int
+    _word_count: int
+
+    def __init__(self, buffer: bytes | mmap.mmap, fold: Mapping[str, str] | None = None
+                 ) -> None:
+        """
+        Use WordIndex.from_words or WordIndex.from_file, rather than this.  fold must be
+        the one the buffer was compiled with.
+        """
+        magic, version, edge_count, word_count, root, _, root_mask = (
+            _HEADER.unpack_from(buffer))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('Not a compiled word index')
+        view = memoryview(buffer)
+        edges_end = _HEADER.size + 4 * _padded(edge_count)
+        self._edges = view[_HEADER.size:edges_end].cast('I')
+        self._masks = view[edges_end:edges_end + 8 * edge_count].cast('Q')
+        self._root, self._root_mask, self._word_count = root, root_mask, word_count
+        self._table = _table(fold)
+
+    @classmethod
+    def from_words(cls, words: Iterable[str], *, fold: Mapping[str, str] | None = None
+                   ) -> WordIndex:
+        """Compile the words, in memory."""
+        return cls(_compile(words, fold), fold)
+
+    @classmethod
+    def from_file(cls, path: str | os.PathLike, *, fold: Mapping[str, str] | None = None,
+                  directory: Path = DEFAULT_DIRECTORY) -> WordIndex:
+        """
+        The words of a file, one or more per line.  The compiled index is kept in
+        directory, and compiled again only if the file changes.  fold maps letters to
+        the letters that replace them, such as {'J': 'I'} for a Playfair square.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = f'{path}|{stat.st_size}|{stat.st_mtime_ns}|{sorted((fold or {}).items())}'
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        cache = directory / f'{path.stem}-{digest}.dawg'
+        if not cache.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            compiled = _compile(path.read_text().split(), fold)
+            # Write to a temporary file first, so that no one maps a half-written index.
+            temporary = cache.with_suffix(f'.{os.getpid()}.tmp')
+            temporary.write_bytes(compiled)
+            temporary.replace(cache)
+        with cache.open('rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), fold)
+
+    def __len__(self) -> int:
+        return self._word_count
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str) or not (word := word.upper().translate(self._table)):
+            return False
+        edges, masks, offset, mask = self._edges, self._masks, self._root, self._root_mask
+        for letter in map(ord, word):
+            while offset:
+                edge = edges[offset]
+                if edge & _LETTER_MASK == letter:
+                    break
+                offset = 0 if edge & _LAST_EDGE else offset + 1
+            else:
+                return False
+            mask, offset = masks[offset], edge >> _CHILD_SHIFT
+        return bool(mask & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        """All the words, in alphabetical order."""
+        return self._search(None, None, None)
+
+    def words(self, length: int) -> Iterator[str]:
+        """The words of the given length, in alphabetical order."""
+        return self._search('.' * length, None, None)
+
+    def match(self, pattern: str, *, distinct: bool = False) -> Iterator[str]:
+        """
+        The words that match the pattern, in alphabetical order.  A "." in the pattern
+        matches any letter.  If distinct, only words with no repeated letter are given.
+        """
+        return self._search(pattern.upper().translate(self._table), None, distinct)
+
+    def anagrams(self, letters: str) -> Iterator[str]:
+        """The words that use exactly the given letters, in alphabetical order."""
+        letters = letters.upper().translate(self._table)
+        return self._search('.' * len(letters), Counter(letters), None)
+
+    def _search(self, pattern: str | None, letters: Counter[str] | None,
+                distinct: bool | None) -> Iterator[str]:
+        """
+        The words that match the pattern (of any length, if None), and use exactly the
+        letters (any letters, if None), and, if distinct, have no repeated letter.
+        """
+        edges, masks = self._edges, self._masks
+        length = len(pattern) if pattern is not None else None
+        if length is not None and not (0 < length <= MAX_LENGTH
+                                       and self._root_mask >> length & 1):
+            return
+        prefix: list[str] = []
+        # Each entry is an edge still to try at depth len(stack) - 1, or 0 if done.
+        stack = [self._root]
+        while stack:
+            offset = stack[-1]
+            if not offset:
+                stack.pop()
+                if prefix:
+                    letter = prefix.pop()
+                    if letters is not None:
+                        letters[letter] += 1
+                continue
+            edge = edges[offset]
+            stack[-1] = 0 if edge & _LAST_EDGE else offset + 1
+            depth = len(stack) - 1
+            letter = chr(edge & _LETTER_MASK)
+            if pattern is not None:
+                expected = pattern[depth]
+                if expected != '.' and expected != letter:
+                    continue
+            if distinct and letter in prefix:
+                continue
+            if letters is not None and not letters[letter]:
+                continue
+            mask = masks[offset]
+            if length is not None:
+                remaining = length - depth - 1
+                if not mask >> remaining & 1:
+                    continue
+                if remaining == 0:
+                    yield ''.join(prefix) + letter
+                    continue
+            elif mask & 1:
+                yield ''.join(prefix) + letter
+            child = edge >> _CHILD_SHIFT
+            if child:
+                if letters is not None:
+                    letters[letter] -= 1
+                prefix.append(letter)
+                stack.append(child)
+
+
+class _Node:
+    __slots__ = ('edges', 'final', 'mask')
+
+    def __init__(self) -> None:
+        self.edges: dict[str, _Node] = {}
+        self.final = False
+        self.mask = 0
+
+
+def _table(fold: Mapping[str, str] | None) -> dict[int, str | None]:
+    """The translation that normalizes upper-cased words."""
+    return str.maketrans({'-': None, "'": None, ' ': None, **(fold or {})})
+
+
+def _normalize(words: Iterable[str], fold: Mapping[str, str] | None) -> list[str]:
+    table = _table(fold)
+    return sorted({normalized for word in words
+                   if (normalized := word.upper().translate(table)).isascii()
+                   and normalized.isalpha() and len(normalized) <= MAX_LENGTH})
+
+
+def _compile(words: Iterable[str], fold: Mapping[str, str] | None) -> bytes:
+    """Build the minimal automaton for the words, with Daciuk's algorithm, and pack it."""
+    sorted_words = _normalize(words, fold)
+    root = _Node()
+    # The equivalence class of each node whose subtree is complete.
+    register: dict[tuple, _Node] = {}
+    # The path to the previous word, as (parent, letter, child) steps.
+    path: list[tuple[_Node, str, _Node]] = []
+
+    def minimize(depth: int) -> None:
+        # Merge the nodes below depth, that no later word can change, into the register.
+        while len(path) > depth:
+            parent, letter, child = path.pop()
+            key = (child.final, *((x, id(node)) for x, node in child.edges.items()))
+            if (existing := register.get(key)) is not None:
+                parent.edges[letter] = existing
+            else:
+                child.mask = int(child.final)
+                for node in child.edges.values():
+                    child.mask |= node.mask << 1
+                register[key] = child
+
+    previous = ''
+    for word in sorted_words:
+        common = 0
+        while common < min(len(word), len(previous)) and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+        node = path[-1][2] if path else root
+        for letter in word[common:]:
+            child = node.edges[letter] = _Node()
+            path.append((node, letter, child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+    root.mask = int(root.final)
+    for node in root.edges.values():
+        root.mask |= node.mask << 1
+
+    # Lay out the nodes, each as a run of edges.  Offset 0 is left unused, so that a
+    # child offset of 0 can mean "no edges".
+    offsets: dict[int, int] = {}
+    order: list[_Node] = []
+    pending = [root]
+    next_offset = 1
+    while pending:
+        node = pending.pop()
+        if id(node) in offsets or not node.edges:
+            continue
+        offsets[id(node)] = next_offset
+        next_offset += len(node.edges)
+        order.append(node)
+        pending.extend(reversed(node.edges.values()))
+    if next_offset >= 1 << (32 - _CHILD_SHIFT):
+        raise ValueError('Too many words for a word index')
+    edges = array.array('I', [0] * _padded(next_offset))
+    masks = array.array('Q', [0] * next_offset)
+    for node in order:
+        offset = offsets[id(node)]
+        for i, (letter, child) in enumerate(sorted(node.edges.items())):
+            edges[offset + i] = (ord(letter) | (_LAST_EDGE if i == len(node.edges) - 1 else 0)
+                                 | offsets.get(id(child), 0) << _CHILD_SHIFT)
+            masks[offset + i] = child.mask
+    header = _HEADER.pack(_MAGIC, _VERSION, next_offset, len(sorted_words),
+                          offsets.get(id(root), 0), 0, root.mask)
+    return header + edges.tobytes() + masks.tobytes()
+
+
+def _padded(edge_count: int) -> int:
+    """The edges take an even number of slots, so that the masks are 8-byte aligned."""
+    return edge_count + (edge_count & 1)
@@ -0,0 +1,30 @@
+"""Tests for the grid indexes kept by BaseSolver."""
+
+from __future__ import annotations
+
+from solver import Clue, ConstraintSolver
+
+
+def make_solver() -> ConstraintSolver:
+    """
+    1a crosses 1d and 2d; 3a crosses only 2d.
+        (1,1)(1,2)(1,3)
+        (2,1)  .  (2,3)(2,4)
+    """
+    return ConstraintSolver([Clue('1a', True, (1, 1), 3), Clue('3a', True, (2, 3), 2),
+                             Clue('1d', False, (1, 1), 2), Clue('2d', False, (1, 3), 2)])
+
+
+def test_clues_at():
+    solver = make_solver()
+    assert [(clue.name, index) for clue, index in solver.clues_at((1, 3))] == [('1a', 2), ('2d', 0)]
+    assert [(clue.name, index) for clue, index in solver.clues_at((2, 4))] == [('3a', 1)]
+    assert solver.clues_at((5, 5)) == ()
+
+
+def test_crossing_clues():
+    solver = make_solver()
+    assert [clue.name for clue in solver.crossing_clues(solver.clue_named('1a'))] == ['1d', '2d']
+    assert [clue.name for clue in solver.crossing_clues(solver.clue_named('3a'))] == ['2d']
+    assert solver.is_intersection((2, 3))
+    assert not solver.is_intersection((1, 2))
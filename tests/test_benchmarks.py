@@ -0,0 +1,42 @@
+"""Tests for the puzzle benchmark harness."""
+
+from __future__ import annotations
+
+from benchmarks.puzzle_corpus import discover, select
+from benchmarks.run_puzzles import PuzzleResult, compare
+
+
+def test_discover_finds_class_and_module_runners():
+    entries = {entry.id: entry for entry in discover(tags_file=None)}
+    # A class with a static run() method, and a module-level run().
+    assert entries['magpie/Magpie255-2024-03::Magpie255'].class_name == 'Magpie255'
+    assert entries['listener/Listener4542'].class_name is None
+    assert all(entry.tags for entry in entries.values())
+
+
+def test_select_by_tag_and_pattern():
+    entries = discover(tags_file=None)
+    listener = select(entries, tags=['listener'])
+    assert listener and all(entry.id.startswith('listener/') for entry in listener)
+    assert not select(entries, tags=['listener'], exclude_tags=['listener'])
+    assert [entry.id for entry in select(entries, pattern='listener4542')] == [
+        'listener/Listener4542']
+
+
+def test_compare_reports_regressions():
+    baseline = {
+        'a': PuzzleResult('ok', 1.0, steps=10, solutions=1),
+        'b': PuzzleResult('ok', 1.0, steps=10, solutions=1),
+        'c': PuzzleResult('ok', 1.0, steps=10, solutions=1),
+        'd': PuzzleResult('ok', 0.01, steps=10, solutions=1),
+        'e': PuzzleResult('timeout', 10.0),
+    }
+    results = {
+        'a': PuzzleResult('ok', 1.1, steps=12, solutions=1),    # within threshold
+        'b': PuzzleResult('ok', 2.0, steps=10, solutions=1),    # slower
+        'c': PuzzleResult('timeout', 10.0),
+        'd': PuzzleResult('ok', 0.03, steps=10, solutions=1),   # too small to matter
+        'e': PuzzleResult('ok', 5.0, steps=10, solutions=1),
+        'f': PuzzleResult('ok', 5.0, steps=10, solutions=1),    # not in the baseline
+    }
+    assert [key for key, _ in compare(results, baseline)] == ['b', 'c']
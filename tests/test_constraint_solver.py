@@ -0,0 +1,204 @@
+"""Tests for ConstraintSolver."""
+
+from __future__ import annotations
+
+from itertools import islice
+
+import pytest
+
+from solver import (
+    BoundedLetterCountHandler,
+    Clue,
+    ConstraintSolver,
+    KnownClueDict,
+    LetterCountHandler,
+)
+
+
+def make_2x2_clues():
+    """
+    2x2 grid — four clues sharing every cell:
+        (1,1)(1,2)
+        (2,1)(2,2)
+    """
+    def gen(*values):
+        return lambda clue: values
+
+    clue_1a = Clue('1a', True,  (1, 1), 2, generator=gen('12', '34', '56', '78'))
+    clue_2a = Clue('2a', True,  (2, 1), 2, generator=gen('12', '34', '56', '78'))
+    clue_1d = Clue('1d', False, (1, 1), 2, generator=gen('13', '24', '57', '68'))
+    clue_2d = Clue('2d', False, (1, 2), 2, generator=gen('13', '24', '57', '68'))
+    return [clue_1a, clue_2a, clue_1d, clue_2d]
+
+
+def as_names(known_clues: KnownClueDict) -> dict[str, str]:
+    return {clue.name: str(value) for clue, value in known_clues.items()}
+
+
+def collect_solutions(solver: ConstraintSolver, **kwargs) -> list[dict[str, str]]:
+    solutions: list[dict[str, str]] = []
+    solver.show_solution = lambda known_clues: solutions.append(as_names(known_clues))
+    assert solver.solve(show_time=False, **kwargs) == len(solutions)
+    return solutions
+
+
+class CountingLetterHandler(LetterCountHandler):
+    def real_checking_value(self, value, info):
+        return True
+
+
+def test_solve_finds_both_solutions():
+    solutions = collect_solutions(ConstraintSolver(make_2x2_clues()))
+    assert sorted(s['1a'] for s in solutions) == ['12', '56']
+
+
+def test_iter_solutions_matches_solve():
+    solver = ConstraintSolver(make_2x2_clues())
+    solutions = [as_names(known_clues) for known_clues in solver.iter_solutions()]
+    assert solutions == collect_solutions(ConstraintSolver(make_2x2_clues()))
+
+
+def test_iter_solutions_yields_copies():
+    solver = ConstraintSolver(make_2x2_clues())
+    solutions = list(solver.iter_solutions())
+    assert len(solutions) == 2
+    assert all(len(solution) == 4 for solution in solutions)
+
+
+def test_iter_solutions_can_be_abandoned():
+    handler = CountingLetterHandler()
+    solver = ConstraintSolver(make_2x2_clues(), letter_handler=handler)
+    iterator = solver.iter_solutions()
+    first = next(iterator)
+    steps = solver._step_count
+    iterator.close()
+    # Closing unwinds the search, leaving the letter handler empty.
+    assert all(x == 0 for x in handler.counter.values())
+    assert solver._step_count == steps
+    assert list(islice(solver.iter_solutions(), 1)) == [first]
+
+
+def make_propagating_clues():
+    """A 2x2 grid in which the shared squares alone determine every clue."""
+    def gen(*values):
+        return lambda clue: values
+
+    return [Clue('1a', True, (1, 1), 2, generator=gen('12', '34', '99')),
+            Clue('2a', True, (2, 1), 2, generator=gen('34', '56')),
+            Clue('1d', False, (1, 1), 2, generator=gen('13', '24')),
+            Clue('2d', False, (1, 2), 2, generator=gen('24', '46'))]
+
+
+def test_supports_are_propagated_before_search():
+    solver = ConstraintSolver(make_propagating_clues())
+    solutions = collect_solutions(solver)
+    assert solutions == [{'1a': '12', '2a': '34', '1d': '13', '2d': '24'}]
+    # Every clue has one value left, so there is no backtracking.
+    assert solver._step_count == 4
+
+
+def test_no_search_when_propagation_fails():
+    def gen(*values):
+        return lambda clue: values
+
+    # No value of 1d starts with the 1 or 3 that 1a needs.
+    clues = [Clue('1a', True, (1, 1), 2, generator=gen('12', '34')),
+             Clue('1d', False, (1, 1), 2, generator=gen('56', '78')),
+             Clue('2a', True, (3, 1), 2, generator=gen('12', '34'))]
+    solver = ConstraintSolver(clues)
+    assert collect_solutions(solver) == []
+    assert solver._step_count == 0
+    assert list(solver.iter_solutions()) == []
+
+
+def test_supports_follow_constraints():
+    solver = ConstraintSolver(make_2x2_clues())
+    # Only 1d = 13 fits 1a = 12, so ruling it out also rules out 1a = 12.
+    solver.add_constraint('2a 1d', lambda a, d: d != '13')
+    solutions = collect_solutions(solver)
+    assert [s['1a'] for s in solutions] == ['56']
+
+
+class LastSquareHandler(LetterCountHandler):
+    """Rejects filling in the last square of a grid that contains a 1."""
+    def real_checking_value(self, value, info):
+        _indices, locations = info
+        return len(self._locations | locations) < 4 or self.counter['1'] == 0
+
+
+def test_parallel_solve_matches_serial():
+    solutions = collect_solutions(ConstraintSolver(make_2x2_clues()))
+    parallel_solutions = collect_solutions(ConstraintSolver(make_2x2_clues()),
+                                           workers=2, split_depth=1)
+    assert len(parallel_solutions) == 2
+    assert sorted(parallel_solutions, key=str) == sorted(solutions, key=str)
+
+
+def test_parallel_solve_replays_letter_handler():
+    # The handler can only reject a grid if the workers know the earlier clues' squares.
+    for workers in (1, 2):
+        solver = ConstraintSolver(make_2x2_clues(), letter_handler=LastSquareHandler())
+        solutions = collect_solutions(solver, workers=workers, split_depth=2)
+        assert [s['1a'] for s in solutions] == ['56']
+
+
+class NoOnesHandler(LetterCountHandler):
+    def real_checking_value(self, value, info):
+        return self.counter['1'] == 0
+
+
+def test_bounded_handler_maximum():
+    solver = ConstraintSolver(make_2x2_clues(), letter_handler=NoOnesHandler())
+    solutions = collect_solutions(solver)
+    bounded_solver = ConstraintSolver(make_2x2_clues(),
+                                      letter_handler=BoundedLetterCountHandler(maximum={'1': 0}))
+    assert collect_solutions(bounded_solver) == solutions
+    assert [s['1a'] for s in solutions] == ['56']
+    assert bounded_solver._step_count == solver._step_count
+
+
+def test_bounded_handler_minimum():
+    handler = BoundedLetterCountHandler('12345678', minimum={'7': 1, '8': 1}, squares=4)
+    solver = ConstraintSolver(make_2x2_clues(), letter_handler=handler)
+    assert [s['1a'] for s in collect_solutions(solver)] == ['56']
+    # After 1a = 12 and 1d = 13, one square is left for both the 7 and the 8.
+    assert solver._step_count == 6
+    with pytest.raises(ValueError):
+        BoundedLetterCountHandler(minimum=1)
+
+
+def test_bounded_handler_counts():
+    class Handler(BoundedLetterCountHandler):
+        def real_checking_value(self, value, info):
+            seen.append((value, self.count('5'), sum(self.counts.values())))
+            return True
+
+    seen: list[tuple[str, int, int]] = []
+    solver = ConstraintSolver(make_2x2_clues(), letter_handler=Handler(maximum=1))
+    collect_solutions(solver, start_clues=('1a', '1d'))
+    # Counts include the value being checked, but only on its new squares.
+    assert ('56', 1, 2) in seen
+    assert ('57', 1, 3) in seen
+
+
+class AtMostOneOneHandler(LetterCountHandler):
+    def real_checking_value(self, value, info):
+        return self.counter['1'] <= 1
+
+
+def test_bounded_handler_prunes_unknown_clues():
+    def make_clues():
+        def gen(*values):
+            return lambda clue: values
+        return [Clue('1a', True, (1, 1), 2, generator=gen('12', '34')),
+                Clue('3a', True, (3, 1), 2, generator=gen('15', '16', '78'))]
+
+    solver = ConstraintSolver(make_clues(), letter_handler=AtMostOneOneHandler())
+    solutions = collect_solutions(solver)
+    bounded_solver = ConstraintSolver(make_clues(),
+                                      letter_handler=BoundedLetterCountHandler(maximum={'1': 1}))
+    assert collect_solutions(bounded_solver) == solutions
+    assert len(solutions) == 4
+    # Once 1a = 12 uses up the 1s, 3a = 15 and 3a = 16 are never tried.
+    assert solver._step_count == 8
+    assert bounded_solver._step_count == 6
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import itertools
+import random
+
 import pytest
 
-from solver.dancing_links import DancingLinks, DancingLinksBounds, DLConstraint
+from solver.dancing_links import DancingLinks, DancingLinksBounds, DLConstraint, Precedence
 
 
 @pytest.fixture(params=[DancingLinks, DancingLinksBounds])
@@ -17,6 +20,7 @@ def collect_solutions(
     constraints: dict[str, list[DLConstraint]],
     *,
     optional_constraints: set[str] | None = None,
+    precedences: list[Precedence[str]] | None = None,
 ) -> list[frozenset[str]]:
     """Run the solver and return a sorted list of solutions."""
     solutions: list[frozenset[str]] = []
@@ -24,6 +28,7 @@ def collect_solutions(
         constraints,
         row_printer=lambda rows: solutions.append(frozenset(rows)),
         optional_constraints=optional_constraints or set(),
+        precedences=precedences or (),
     )
     dl.solve()
     return sorted(solutions)
@@ -183,6 +188,51 @@ def test_duplicate_constraints_in_row_raises(solver_class):
         dl.create_data_structure()
 
 
+# ---------------------------------------------------------------------------
+# iter_solutions() tests
+# ---------------------------------------------------------------------------
+
+_MULTIPLE_SOLUTIONS = {
+    'r_AB': ['A', 'B'],
+    'r_AC': ['A', 'C'],
+    'r_BC': ['B', 'C'],
+    'r_A': ['A'],
+    'r_B': ['B'],
+    'r_C': ['C'],
+}
+
+
+def test_iter_solutions_matches_solve(solver_class):
+    dl = solver_class(_MULTIPLE_SOLUTIONS, row_printer=lambda _: pytest.fail("called"))
+    solutions = sorted(frozenset(rows) for rows in dl.iter_solutions())
+    assert solutions == collect_solutions(solver_class, _MULTIPLE_SOLUTIONS)
+    assert dl.steps > 0
+
+
+def test_iter_solutions_is_lazy(solver_class):
+    """The search is suspended between yields, and can be abandoned and restarted."""
+    dl = solver_class(_MULTIPLE_SOLUTIONS)
+    iterator = dl.iter_solutions()
+    next(iterator)
+    steps = dl.steps
+    next(iterator)
+    assert dl.steps > steps
+    iterator.close()
+    assert len(list(dl.iter_solutions())) == 4
+
+
+def test_check_solution_receives_row_names(solver_class):
+    seen = []
+
+    def check_solution(rows):
+        seen.append(frozenset(rows))
+        return 'r_A' not in rows
+
+    dl = solver_class(_MULTIPLE_SOLUTIONS, check_solution=check_solution)
+    assert len(list(dl.iter_solutions())) == 2
+    assert frozenset({'r_AB', 'r_C'}) in seen
+
+
 # ---------------------------------------------------------------------------
 # show() tests
 # ---------------------------------------------------------------------------
@@ -298,6 +348,47 @@ def test_show_data_node_verbose_no_color(solver_class):
     assert dl.show(10, verbose=True) == "<r2>: B, [C]"
 
 
+def test_precedences_match_filtering(solver_class):
+    """Precedences give exactly the solutions in which the rows are in order."""
+    rng = random.Random(45)
+    for _ in range(40):
+        # Words A, B, C and D are placed on a line of 12 cells, without overlapping.
+        constraints: dict[str, list[DLConstraint]] = {}
+        positions: dict[str, dict[str, int]] = {}
+        for word, length in zip("ABCD", rng.choices((1, 2, 3), k=4), strict=True):
+            starts = rng.sample(range(13 - length), 6)
+            positions[word] = {f"{word}{start}": start for start in starts}
+            for start in starts:
+                constraints[f"{word}{start}"] = [word, *(f"c{start + i}" for i in range(length))]
+        cells = {f"c{i}" for i in range(12)}
+        precedences = [Precedence(positions["A"], positions["B"]),
+                       Precedence(positions["B"], positions["C"], strict=False),
+                       Precedence(positions["D"], positions["A"])]
+        unordered = collect_solutions(solver_class, constraints, optional_constraints=cells)
+        expected = [solution for solution in unordered
+                    if all(before[x] < after[y] if precedence.strict else before[x] <= after[y]
+                           for precedence in precedences
+                           for before, after in [(precedence.before, precedence.after)]
+                           for x, y in itertools.product(solution, repeat=2)
+                           if x in before and y in after)]
+        solutions = collect_solutions(solver_class, constraints, optional_constraints=cells,
+                                      precedences=precedences)
+        assert len(solutions) == len(expected)
+        assert set(solutions) == set(expected)
+
+
+def test_precedence_prunes_before_branching(solver_class):
+    """B can't be before A, so choosing A2 rules out B0 and B1."""
+    constraints: dict[str, list[DLConstraint]] = {
+        "A1": ["A", "X"], "A2": ["A", "Y"], "B0": ["B"], "B1": ["B"], "B3": ["B"],
+        "X": ["X"], "Y": ["Y"],
+    }
+    precedence = Precedence({"A1": 1, "A2": 2}, {"B0": 0, "B1": 1, "B3": 3}, strict=False)
+    solutions = collect_solutions(solver_class, constraints, precedences=[precedence])
+    assert set(solutions) == {frozenset({"A1", "B1", "Y"}), frozenset({"A1", "B3", "Y"}),
+                              frozenset({"A2", "B3", "X"})}
+
+
 def test_show_data_node_verbose_with_color(solver_class):
     """show() verbose on a colored secondary node brackets that item.
 
@@ -1,14 +1,18 @@
 """Tests for DancingLinksBounds (Algorithm M: exact cover with multiplicities and colors)."""
+import itertools
+import random
+
 import pytest
 
-from solver.dancing_links import DancingLinksBounds
+from solver.dancing_links import DancingLinksBounds, Precedence
 
 # ---------------------------------------------------------------------------
 # Helper
 # ---------------------------------------------------------------------------
 
 
-def collect_solutions(constraints, *, optional_constraints=None, bounds=None):
+def collect_solutions(constraints, *, optional_constraints=None, bounds=None,
+                      precedences=None):
     """Run the solver and return a sorted list of frozensets (one per solution)."""
     solutions = []
     dl = DancingLinksBounds(
@@ -16,6 +20,7 @@ def collect_solutions(constraints, *, optional_constraints=None, bounds=None):
         row_printer=lambda rows: solutions.append(frozenset(rows)),
         optional_constraints=optional_constraints or set(),
         bounds=bounds or {},
+        precedences=precedences or (),
     )
     dl.solve()
     assert len(solutions) == len(set(solutions)), "No solutions are produced more than once."
@@ -273,5 +278,89 @@ def test_null_move_lower_bound_respected():
     assert frozenset({'r2', 'r3'}) in solutions
 
 
+# ---------------------------------------------------------------------------
+# Precedences
+# ---------------------------------------------------------------------------
+
+
+def test_precedences_with_optional_items_and_colors():
+    """Rows pruned by a precedence are restored correctly while items are tweaked.
+
+    Up to one A and one B are placed on a line of cells, each of which is colored by
+    the word that fills it.  Every A must be before every B.
+    """
+    rng = random.Random(45)
+    for _ in range(40):
+        constraints = {}
+        positions = {}
+        for word in "AB":
+            positions[word] = {}
+            for start in rng.sample(range(9), 5):
+                length = rng.choice((1, 2))
+                row = f"{word}{start}-{length}"
+                positions[word][row] = start
+                constraints[row] = [word, *((f"c{start + i}", word) for i in range(length))]
+        cells = {f"c{i}" for i in range(10)}
+        bounds = {"A": (0, 1), "B": (1, 1)}
+        precedence = Precedence(positions["A"], positions["B"])
+        unordered = collect_solutions(constraints, optional_constraints=cells, bounds=bounds)
+        expected = {solution for solution in unordered
+                    if all(precedence.before[x] < precedence.after[y]
+                           for x, y in itertools.product(solution, repeat=2)
+                           if x in precedence.before and y in precedence.after)}
+        solutions = collect_solutions(constraints, optional_constraints=cells, bounds=bounds,
+                                      precedences=[precedence])
+        assert set(solutions) == expected
+
+
+def _satisfies(solution, constraints, bounds, secondaries, precedence):
+    """Does the solution meet the bounds, the colors, and the precedence?"""
+    for item, (lo, hi) in bounds.items():
+        if not lo <= sum(item in constraints[row] for row in solution) <= hi:
+            return False
+    for item in secondaries:
+        uses = [c for row in solution for c in constraints[row]
+                if c == item or (isinstance(c, tuple) and c[0] == item)]
+        # An uncolored secondary item can only be used once.
+        if len(uses) > 1 and (item in uses or len(set(uses)) > 1):
+            return False
+    before, after = precedence.before, precedence.after
+    return all(before[x] < after[y] if precedence.strict else before[x] <= after[y]
+               for x in solution if x in before for y in solution if y in after)
+
+
+def test_precedences_match_brute_force():
+    """The "before" and "after" rows share primary items that may be left uncovered."""
+    rng = random.Random(46)
+    primaries, secondaries = ["p0", "p1", "p2"], ["s0", "s1"]
+    for _ in range(300):
+        constraints = {}
+        for i in range(6):
+            items = rng.sample(primaries, rng.randint(1, 3))
+            for item in rng.sample(secondaries, rng.randint(0, 2)):
+                items.append((item, rng.choice("ab")) if rng.random() < 0.7 else item)
+            constraints[f"r{i}"] = items
+        rows = list(constraints)
+        bounds = {item: rng.choice(((0, 1), (1, 1))) for item in primaries
+                  if any(item in items for items in constraints.values())}
+        shuffled = rng.sample(rows, len(rows))
+        precedence = Precedence({row: rng.randrange(5) for row in shuffled[:3]},
+                                {row: rng.randrange(5) for row in shuffled[3:]},
+                                strict=rng.random() < 0.5)
+        expected = {frozenset(solution)
+                    for size in range(len(rows) + 1)
+                    for solution in itertools.combinations(rows, size)
+                    if _satisfies(solution, constraints, bounds, secondaries, precedence)}
+        solutions = collect_solutions(constraints, optional_constraints=set(secondaries),
+                                      bounds=bounds, precedences=[precedence])
+        assert set(solutions) == expected
+
+
+def test_precedences_reject_upper_bounds_above_one():
+    with pytest.raises(ValueError, match='upper bound'):
+        DancingLinksBounds({'r1': ['A']}, bounds={'A': (0, 2)},
+                           precedences=[Precedence({'r1': 1}, {'r1': 2})])
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
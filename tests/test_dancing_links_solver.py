@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from itertools import islice
+
+import pytest
+
 from solver import Clue, DancingLinksSolver, KnownClueDict
 
 
@@ -138,3 +142,46 @@ def test_no_solution():
     solver = DancingLinksSolver([clue_1a, clue_1d], allow_duplicates=False)
     solutions = collect_solutions(solver)
     assert solutions == []
+
+
+def test_iter_solutions():
+    solver = DancingLinksSolver(make_2x2_clues())
+    solver.show_solution = lambda _: pytest.fail("show_solution called")
+    solutions = [{clue.name: v for clue, v in known.items()}
+                 for known in solver.iter_solutions()]
+    assert sorted(s['1a'] for s in solutions) == ['12', '56']
+    first = list(islice(solver.iter_solutions(), 1))
+    assert len(first) == 1
+
+
+def test_two_clue_constraint_pushed_into_matrix():
+    # 1a + 2a == 134 holds only for the '56'/'78' family.
+    checked = []
+
+    def predicate(a, b):
+        checked.append((a, b))
+        return int(a) + int(b) == 134
+
+    solver = DancingLinksSolver(make_2x2_clues(), allow_duplicates=False)
+    solver.add_constraint('1a 2a', predicate)
+    solutions = collect_solutions(solver)
+    assert [s['1a'] for s in solutions] == ['56']
+    # Every pair was tested once while building the matrix, never on solutions.
+    assert len(checked) == 16
+    assert solver._post_filter_constraints == []
+
+
+def test_two_clue_constraint_falls_back_to_post_filter():
+    solver = DancingLinksSolver(make_2x2_clues(), allow_duplicates=False)
+    solver.PUSHDOWN_LIMIT = 0
+    solver.add_constraint('1a 2a', lambda a, b: int(a) + int(b) == 134)
+    solutions = collect_solutions(solver)
+    assert [s['1a'] for s in solutions] == ['56']
+    assert len(solver._post_filter_constraints) == 1
+
+
+def test_three_clue_constraint_is_post_filtered():
+    solver = DancingLinksSolver(make_2x2_clues(), allow_duplicates=False)
+    solver.add_constraint('1a 2a 1d', lambda a, b, c: c == '13')
+    solutions = collect_solutions(solver)
+    assert [s['1a'] for s in solutions] == ['12']
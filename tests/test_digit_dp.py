@@ -0,0 +1,53 @@
+"""Tests for enumerating numbers by constraints on their digits."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from solver import Clue, generators
+from solver.digit_dp import DigitDP
+from solver.helpers import digit_product, digit_sum
+
+CASES = [
+    ({'digit_sum': 10}, lambda x: digit_sum(x) == 10),
+    ({'digit_product': 24}, lambda x: digit_product(x) == 24),
+    ({'digit_product': 0}, lambda x: '0' in str(x)),
+    ({'distinct': True, 'divisor': 7}, lambda x: len(set(str(x))) == len(str(x)) and x % 7 == 0),
+    ({'digits': '1357', 'digit_sum': 12}, lambda x: set(str(x)) <= set('1357')
+                                               and digit_sum(x) == 12),
+    ({'palindrome': True, 'divisor': 11}, lambda x: str(x) == str(x)[::-1] and x % 11 == 0),
+    ({'palindrome': True, 'digit_sum': 14}, lambda x: str(x) == str(x)[::-1]
+                                                 and digit_sum(x) == 14),
+]
+
+
+@pytest.mark.parametrize('length', [1, 2, 3, 4])
+@pytest.mark.parametrize(('constraints', 'predicate'), CASES)
+def test_matches_filtering(length, constraints, predicate):
+    expected = [x for x in range(10 ** (length - 1), 10 ** length) if predicate(x)]
+    numbers = DigitDP(length, **constraints)
+    assert list(numbers) == expected
+    assert numbers.count() == len(expected)
+
+
+def test_digits_per_position():
+    numbers = DigitDP(4, digits=['012', '0123456789', '89', '5'], divisor=3)
+    assert list(numbers) == [x for x in range(1000, 3000)
+                             if str(x)[2] in '89' and str(x)[3] == '5' and x % 3 == 0]
+
+
+def test_count_without_enumerating():
+    # There are far too many to enumerate.  Taking one from the first digit leaves 9 to
+    # share between 30 digits, except that the first digit can't then be 9.
+    assert DigitDP(30, digit_sum=10).count() == math.comb(38, 9) - 1
+    assert DigitDP(40, divisor=7).count() == (10 ** 40 - 1) // 7 - (10 ** 39 - 1) // 7
+    assert DigitDP(11, distinct=True).count() == 0
+
+
+def test_generator():
+    clue = Clue('1a', True, (1, 1), 3)
+    generator = generators.digit_constrained(digit_sum=5, distinct=True)
+    assert list(generator(clue)) == [x for x in range(100, 1000)
+                                     if digit_sum(x) == 5 and len(set(str(x))) == 3]
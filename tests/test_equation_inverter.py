@@ -0,0 +1,106 @@
+"""Tests for solving expressions for a single letter."""
+
+from __future__ import annotations
+
+import pytest
+
+import solver.equation_solver
+from solver import Clue, EquationSolver, Evaluator
+from solver.equation_inverter import make_inverter, pattern_values
+
+
+def invert(expression: str, letter: str, known: dict[str, int], *targets: int):
+    inverter = make_inverter(Evaluator.create_evaluator(expression), letter)
+    return inverter and inverter.solve(known, targets)
+
+
+def test_linear():
+    assert invert('A + B*C', 'C', {'A': 5, 'B': 3}, 47) == {14}
+    assert invert('A + B*C', 'C', {'A': 5, 'B': 3}, 46) == set()
+    assert invert('A - C', 'C', {'A': 50}, 10, 20) == {30, 40}
+    assert invert('-C + A', 'C', {'A': 50}, 10) == {40}
+
+
+def test_division():
+    assert invert('(A + C) / B', 'C', {'A': 5, 'B': 4}, 7) == {23}
+    assert invert('A / C', 'C', {'A': 36}, 4, 5) == {9}
+    assert invert('C / (A - A)', 'C', {'A': 3}, 4) == set()
+
+
+def test_powers_and_roots():
+    assert invert('C^2 + A', 'C', {'A': 1}, 50) == {7, -7}
+    assert invert('C^3', 'C', {}, 27, 28) == {3}
+    assert invert('√C + A', 'C', {'A': 1}, 5) == {16}
+
+
+def test_not_invertible():
+    assert make_inverter(Evaluator.create_evaluator('C*C + A'), 'C') is None
+    assert make_inverter(Evaluator.create_evaluator('A^C'), 'C') is None
+    assert make_inverter(Evaluator.create_evaluator('C! + A'), 'C') is None
+    # Multiplying by zero gives no information.
+    assert invert('A*C + 1', 'C', {'A': 0}, 1) is None
+
+
+def test_pattern_values():
+    assert pattern_values('1[^0]', 2, 100) == (11, 12, 13, 14, 15, 16, 17, 18, 19)
+    assert pattern_values('.5', 2, 100) == (15, 25, 35, 45, 55, 65, 75, 85, 95)
+    assert pattern_values('...', 3, 100) is None
+    assert pattern_values('1[^0]', 3, 100) is None
+    assert pattern_values('(1|2)5', 2, 100) is None
+
+
+class SmallSolver(EquationSolver):
+    def __init__(self, items=range(1, 20)) -> None:
+        clues = [
+            Clue('1a', True, (1, 1), 2, expression='A + BC'),
+            Clue('1d', False, (1, 1), 2, expression='AB'),
+            Clue('2d', False, (1, 2), 2, expression='C + D'),
+        ]
+        super().__init__(clues, items=items)
+
+    def show_solution(self, known_clues, known_letters) -> None:
+        pass
+
+
+def solve(small_solver: SmallSolver) -> list:
+    return [({clue.name: value for clue, value in clues.items()}, letters)
+            for clues, letters in small_solver.solve(show_time=False)]
+
+
+@pytest.mark.parametrize('items', [range(1, 20), range(19, 0, -1)])
+def test_solver_finds_the_same_solutions(monkeypatch, items):
+    # Solutions come out in the same order, which follows the order of the items.
+    small_solver = SmallSolver(items)
+    solutions = solve(small_solver)
+    steps = small_solver._step_count
+
+    monkeypatch.setattr(solver.equation_solver, 'make_inverter', lambda *_: None)
+    small_solver = SmallSolver(items)
+    assert solve(small_solver) == solutions
+    assert small_solver._step_count > steps
+    assert solutions
+
+
+@pytest.mark.parametrize('expression', ['A + BC', 'BC - A', '(BC + A) / 2'])
+def test_inverse_agrees_with_evaluator(expression):
+    evaluator = Evaluator.create_evaluator(expression)
+    inverter = make_inverter(evaluator, 'A')
+    known = {'B': 3, 'C': 7}
+    value, = inverter.solve(known, [23])
+    assert list(evaluator(known | {'A': value})) == ['23']
+
+
+@pytest.mark.parametrize('expression', ['A * (B / 3)', 'A + B / 3', '(A - B / 4) * 2'])
+def test_division_in_the_other_operand(expression):
+    # The other operand is a float, so the inverter must not lose any value of A that
+    # forward evaluation finds.
+    evaluator = Evaluator.create_evaluator(expression)
+    inverter = make_inverter(evaluator, 'A')
+    for b in range(1, 10):
+        for target in range(1, 100):
+            expected = {a for a in range(1, 200)
+                        if list(evaluator({'A': a, 'B': b})) == [str(target)]}
+            candidates = inverter.solve({'B': b}, [target])
+            assert candidates is None or expected <= candidates
+    assert make_inverter(Evaluator.create_evaluator('A * (B / 3)'), 'A').solve({'B': 1}, [10]) \
+        is None
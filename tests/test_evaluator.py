@@ -0,0 +1,62 @@
+"""Tests for Evaluator and its compilation cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from solver import Evaluator
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(Evaluator, '_compilation_cache', {})
+    yield
+    Evaluator.set_disk_cache(None)
+
+
+class FailingParser:
+    def parse(self, text):
+        raise AssertionError(f"unexpected parse of {text!r}")
+
+
+def test_evaluators_share_compiled_code():
+    first, = Evaluator.create_evaluators('A + B')
+    second, = Evaluator.create_evaluators('A + B')
+    assert first is not second
+    assert first.compiled_code.__code__ is second.compiled_code.__code__
+    assert first({'A': 2, 'B': 3}) == ('5',)
+
+
+def test_mapping_values_are_not_cached():
+    double, = Evaluator.create_evaluators('"f"(A)', {'f': lambda x: 2 * x})
+    triple, = Evaluator.create_evaluators('"f"(A)', {'f': lambda x: 3 * x})
+    assert double({'A': 4}) == ('8',)
+    assert triple({'A': 4}) == ('12',)
+
+
+def test_multiple_equations_and_parse():
+    evaluators = Evaluator.create_evaluators('AB = C + D')
+    assert [evaluator.vars for evaluator in evaluators] == [['A', 'B'], ['C', 'D']]
+    assert str(evaluators[1].parse) == 'C + D'
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    Evaluator.set_disk_cache(tmp_path)
+    Evaluator.create_evaluators('A * B - C')
+    assert len(list(tmp_path.glob('*.marshal'))) == 1
+
+    # A fresh process would start with an empty memory cache, and needn't parse.
+    monkeypatch.setattr(Evaluator, '_compilation_cache', {})
+    monkeypatch.setattr(Evaluator, '_equation_parser', FailingParser())
+    evaluator, = Evaluator.create_evaluators('A * B - C')
+    assert evaluator({'A': 3, 'B': 4, 'C': 2}) == ('10',)
+
+
+def test_corrupt_disk_cache_is_ignored(tmp_path):
+    Evaluator.set_disk_cache(tmp_path)
+    Evaluator.create_evaluators('A + 1')
+    path, = tmp_path.glob('*.marshal')
+    path.write_bytes(b'garbage')
+    Evaluator._compilation_cache.clear()
+    evaluator, = Evaluator.create_evaluators('A + 1')
+    assert evaluator({'A': 1}) == ('2',)
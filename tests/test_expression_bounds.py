@@ -0,0 +1,96 @@
+"""Tests for bounding the values of expressions."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+import solver.equation_solver
+from solver import Clue, EquationSolver, Evaluator
+from solver.expression_bounds import EMPTY, can_have_length, make_bounds_function
+
+
+def bounds(expression: str, known: dict[str, int], default: tuple[int, int]):
+    return make_bounds_function(Evaluator.create_evaluator(expression))(known, default)
+
+
+def test_monotone_operators():
+    assert bounds('A + BC', {'A': 5}, (1, 9)) == (6, 86)
+    assert bounds('A - B', {}, (1, 9)) == (-8, 8)
+    assert bounds('-A + 20', {}, (1, 9)) == (11, 19)
+    assert bounds('A^2 + B^3', {'B': 2}, (1, 9)) == (9, 89)
+    assert bounds('AB', {'A': -2}, (-3, 4)) == (-8, 6)
+
+
+def test_division_rounds_outwards():
+    assert bounds('A / B', {'A': 10}, (3, 4)) == (2, 4)
+    assert bounds('A / B', {}, (-3, 4)) is None
+    assert bounds('A / (B - B)', {'B': 1}, (1, 9)) == EMPTY
+
+
+def test_roots_and_factorials():
+    assert bounds('√A', {}, (2, 30)) == (2, 5)
+    assert bounds('√A', {}, (5, 8)) == EMPTY
+    assert bounds('√(-A)', {}, (1, 9)) == EMPTY
+    assert bounds('A!', {}, (3, 5)) == (6, 120)
+
+
+def test_unbounded():
+    assert make_bounds_function(Evaluator.create_evaluator('@f(A)', {'f': abs})) is None
+    evaluator = Evaluator.create_evaluator('A + B', {'add': lambda a, b: a})
+    assert make_bounds_function(evaluator) is None
+
+
+def test_can_have_length():
+    assert can_have_length((50, 150), 3)
+    assert can_have_length((50, 150), 2)
+    assert not can_have_length((50, 150), 1)
+    assert not can_have_length((1000, 2000), 3)
+    assert not can_have_length(EMPTY, 2)
+    assert can_have_length(None, 2)
+
+
+@pytest.mark.parametrize('expression', ['A + BC', 'A - B/(C + 4)', '(A - B)^2 + √C', 'C! - AB'])
+def test_bounds_contain_every_value(expression):
+    evaluator = Evaluator.create_evaluator(expression)
+    function = make_bounds_function(evaluator)
+    values = range(-3, 8)
+    low, high = function({'A': 4}, (values[0], values[-1]))
+    for b, c in itertools.product(values, repeat=2):
+        try:
+            value = evaluator.raw_call({'A': 4, 'B': b, 'C': c})
+        except ArithmeticError:
+            continue
+        assert low <= value <= high
+
+
+class LengthSolver(EquationSolver):
+    def __init__(self) -> None:
+        clues = [
+            Clue('1a', True, (1, 1), 3, expression='ABC'),
+            Clue('1d', False, (1, 1), 2, expression='A + B'),
+            Clue('2d', False, (1, 2), 2, expression='C + D'),
+            Clue('3d', False, (1, 3), 2, expression='D - A'),
+        ]
+        super().__init__(clues, items=range(1, 40))
+
+    def show_solution(self, known_clues, known_letters) -> None:
+        pass
+
+
+def solve(length_solver: LengthSolver) -> list:
+    return [({clue.name: value for clue, value in clues.items()}, letters)
+            for clues, letters in length_solver.solve(show_time=False)]
+
+
+def test_solver_finds_the_same_solutions(monkeypatch):
+    length_solver = LengthSolver()
+    solutions = solve(length_solver)
+    steps = length_solver._step_count
+
+    monkeypatch.setattr(solver.equation_solver, 'make_bounds_function', lambda _: None)
+    length_solver = LengthSolver()
+    assert solve(length_solver) == solutions
+    assert length_solver._step_count > steps
+    assert solutions
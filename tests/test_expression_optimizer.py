@@ -0,0 +1,105 @@
+"""Tests for the optimization of expression trees."""
+
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from solver import EquationParser, Evaluator
+from solver.expression_optimizer import optimize, to_python
+
+EXPRESSIONS = [
+    '2ab(c+d) - ab', 'a^2 + 2ab + b^2', '(a+b)^3 - (a-b)^2', '√(ab) + a!',
+    'a/b + ab', '-a * -b', '√(a^2+b^2) * 2 - (a+b)^2', 'a! / b! - c',
+    '(a-b)(a-b) + √c', '2^10 - a^3', '-(a-b) - -c', 'a - (b - (c - d))',
+    'ab + √10', 'a/√(0-4) - b', '√(a+b) + c! + √c',
+]
+
+
+@pytest.fixture(scope='module')
+def parser() -> EquationParser:
+    return EquationParser()
+
+
+def evaluate(source: str, variables: list[str], values: list[int]) -> object:
+    my_globals = {'fact': Evaluator.factorial, 'sqrt': Evaluator.sqrt, 'math': math}
+    function = eval(f"lambda {', '.join(variables)}: {source}", my_globals)
+    try:
+        return function(*values)
+    except ArithmeticError:
+        return ArithmeticError
+
+
+def optimized_source(parser: EquationParser, expression: str, functions=frozenset()) -> str:
+    parse, = parser.parse(expression)
+    return to_python(optimize(parse.expression, functions), functions)
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_same_values(parser, expression):
+    rng = random.Random(expression)
+    parse, = parser.parse(expression)
+    variables = sorted(parse.vars())
+    before = parse.to_string(set(), False)
+    after = to_python(optimize(parse.expression))
+    for _ in range(200):
+        values = [rng.randint(-5, 30) for _ in variables]
+        expected = evaluate(before, variables, values)
+        result = evaluate(after, variables, values)
+        assert result == expected and type(result) is type(expected)
+
+
+def test_constant_folding(parser):
+    assert optimized_source(parser, '3*4 + a - 5') == '(a + 7)'
+    assert optimized_source(parser, '2^10 - 3!') == '1018'
+
+
+def test_division_is_not_folded(parser):
+    assert optimized_source(parser, '6/3') == '(6 / 3)'
+
+
+def test_common_subexpression(parser):
+    source = optimized_source(parser, '2ab(c+d) - ab')
+    assert source.count('(a * b)') == 1
+    assert source == '((((_cse0 := (a * b)) * (c + d)) * 2) - _cse0)'
+
+
+def test_strength_reduction(parser):
+    assert optimized_source(parser, 'a^2') == '(a * a)'
+    assert optimized_source(parser, '(a+b)^2') == '((_cse0 := (a + b)) * _cse0)'
+    assert optimized_source(parser, 'a^5') == '(a ** 5)'
+
+
+def test_guards_first(parser):
+    assert optimized_source(parser, 'ab + √c') == '(sqrt(c) + (a * b))'
+    assert optimized_source(parser, 'a(b+c)d!') == '((fact(d) * a) * (b + c))'
+
+
+def test_cheapest_guards_first(parser):
+    assert optimized_source(parser, 'a! + √b') == '(sqrt(b) + fact(a))'
+    assert optimized_source(parser, '√(a+b) + c! + √c') == \
+        '((sqrt(c) + sqrt((a + b))) + fact(c))'
+
+
+def test_failing_constant_guards(parser):
+    assert optimized_source(parser, 'ab + √10') == 'sqrt(10)'
+    assert optimized_source(parser, '(a+b)/√10 - c') == 'sqrt(10)'
+    assert optimized_source(parser, '√9 + a') == '(a + 3)'
+    # A call might fail some other way first.
+    tree = ('-', ('function', 'f', ('a',)), ('√', 10))
+    assert optimize(tree) == tree
+
+
+def test_overridden_operators_are_untouched(parser):
+    assert optimized_source(parser, '(2+3)/a', frozenset({'div'})) == 'div(5, a)'
+    assert optimized_source(parser, 'a^2 + 1', frozenset({'pow'})) == '(pow(a, 2) + 1)'
+    assert optimized_source(parser, '3*4 + a', frozenset({'mul'})) == '(mul(3, 4) + a)'
+
+
+def test_evaluator_uses_optimized_code():
+    evaluator = Evaluator.create_evaluator('2ab(c+d) - ab')
+    assert '_cse0' in str(evaluator)
+    assert evaluator.raw_call({'a': 2, 'b': 3, 'c': 4, 'd': 5}) == 2 * 6 * 9 - 6
+    assert list(Evaluator.create_evaluator('√a + b')({'a': 3, 'b': 1})) == []
@@ -0,0 +1,71 @@
+"""Tests for the sieved tables of arithmetic functions."""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+from more_itertools import factor, totient
+
+import misc.factors
+from misc.factor_tables import get_factor_tables
+
+LIMIT = 5000
+
+
+@pytest.fixture(scope='module')
+def tables():
+    return get_factor_tables(LIMIT, directory=None)
+
+
+def test_tables_match_factorization(tables):
+    for n in range(2, LIMIT + 1):
+        primes = list(factor(n))
+        distinct = set(primes)
+        assert tables.smallest_prime_factor[n] == primes[0]
+        assert tables.distinct_prime_count[n] == len(distinct)
+        assert tables.divisor_count[n] == math.prod(primes.count(p) + 1 for p in distinct)
+        assert tables.divisor_sum[n] == math.prod((p ** (primes.count(p) + 1) - 1) // (p - 1)
+                                                  for p in distinct)
+        assert tables.totient[n] == totient(n)
+
+
+def test_tables_are_saved_and_mapped(tmp_path, tables):
+    saved = get_factor_tables(LIMIT, tmp_path)
+    assert len(list(tmp_path.glob('*.npy'))) == 5
+    mapped = get_factor_tables(LIMIT, tmp_path)
+    assert mapped.divisor_sum.filename is not None
+    for table, expected in zip(mapped[1:], tables[1:], strict=True):
+        assert (table == expected).all()
+    assert (saved.totient == tables.totient).all()
+
+
+def test_stale_tables_are_rebuilt(tmp_path, tables):
+    get_factor_tables(LIMIT, tmp_path)
+    totient_path, divisor_sum_path = (next(tmp_path.glob(f'{name}_*.npy'))
+                                      for name in ('totient', 'divisor_sum'))
+    # A truncated table, and one whose values are wrong.
+    totient_path.write_bytes(totient_path.read_bytes()[:1000])
+    saved = np.load(divisor_sum_path)
+    saved[12] += 1
+    np.save(divisor_sum_path, saved)
+    rebuilt = get_factor_tables(LIMIT, tmp_path)
+    assert (rebuilt.totient == tables.totient).all()
+    assert (rebuilt.divisor_sum == tables.divisor_sum).all()
+
+
+def test_factors_beyond_the_table(monkeypatch, tables):
+    monkeypatch.setattr(misc.factors, 'TABLE_LIMIT', LIMIT)
+    monkeypatch.setattr(misc.factors, '_tables', lambda: tables)
+    for function in (misc.factors.prime_factors, misc.factors.divisor_count,
+                     misc.factors.factor_sum, misc.factors.phi, misc.factors.factor_list):
+        function.cache_clear()
+    # The last two are finished by the tables, once their small primes are divided out.
+    for n in (360, LIMIT, LIMIT + 1, 2 ** 10 * 3 ** 5 * 7919, 987654321,
+              2 ** 20 * 4999, 499 * 3 ** 12):
+        primes = list(factor(n))
+        assert misc.factors.prime_factors(n) == [(p, primes.count(p)) for p in sorted(set(primes))]
+        assert misc.factors.divisor_count(n) == len(misc.factors.factor_list(n))
+        assert misc.factors.factor_sum(n) == sum(misc.factors.factor_list(n))
+        assert misc.factors.phi(n) == totient(n)
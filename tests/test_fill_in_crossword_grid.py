@@ -1,5 +1,6 @@
 from collections.abc import Sequence
 
+from solver import Clue, Location
 from solver.fill_in_crossword_grid import (
     Entry,
     FillInCrosswordGrid,
@@ -60,6 +61,68 @@ def test_numeric_8X10_grid() -> None:
         filler.display(result)
 
 
+def test_numbering_by_orderer_codes() -> None:
+    # fmt: off
+    acrosses = [(1, '3541'), (4, '1331'), (8, '2156'), (10, '322'), (12, '324'),
+                (14, '45'), (16, '664'), (17, '6416'), (18, '35245'), (19, '51'),
+                (21, '64'), (23, '63245'), (25, '2153'), (27, '632'), (29, '54'),
+                (30, '314'), (31, '561'), (33, '2512'), (35, '5356'), (36, '3316')]
+    downs = [(1, '3136'), (2, '512656'), (3, '42'), (5, '36445'), (6, '3141'),
+             (7, '16'), (9, '1314631'), (11, '242'), (13, '2653641'), (15, '5625'),
+             (18, '3125'), (20, '143641'), (22, '45325'), (24, '265'), (26, '1463'),
+             (28, '2116'), (32, '35'), (34, '23')]
+    # fmt: on
+
+    class OrdererFiller(FillInCrosswordGrid):
+        NUMBERING_BY_PRECEDENCE = False
+
+    def locations(results: Sequence[Sequence[Clue]]) -> list[set[tuple[str, Location]]]:
+        return [{(clue.name, clue.base_location) for clue in result} for result in results]
+
+    expected = FillInCrosswordGrid(acrosses, downs, width=8, height=10).run()
+    assert len(expected) == 1
+    results = OrdererFiller(acrosses, downs, width=8, height=10).run()
+    assert locations(results) == locations(expected)
+
+
+def test_sweep_builds_the_base_once() -> None:
+    # fmt: off
+    acrosses = [(1, '3541'), (4, '1331'), (8, '2156'), (10, '322'), (12, '324'),
+                (14, '45'), (16, '664'), (17, '6416'), (18, '35245'), (19, '51'),
+                (21, '64'), (23, '63245'), (25, '2153'), (27, '632'), (29, '54'),
+                (30, '314'), (31, '561'), (33, '2512'), (35, '5356'), (36, '3316')]
+    downs = [(1, '3136'), (2, '512656'), (3, '42'), (5, '36445'), (6, '3141'),
+             (7, '16'), (9, '1314631'), (11, '242'), (13, '2653641'), (15, '5625'),
+             (18, '3125'), (20, '143641'), (22, '45325'), (24, '265'), (26, '1463'),
+             (28, '2116'), (32, '35'), (34, '23')]
+    # fmt: on
+    builds = 0
+
+    class CountingFiller(FillInCrosswordGrid):
+        def get_grid_constraints(self) -> None:
+            nonlocal builds
+            builds += 1
+            super().get_grid_constraints()
+
+    def names(results: Sequence[Sequence[Clue]]) -> list[list[str]]:
+        return sorted(sorted(f"{clue.name}@{clue.base_location}" for clue in result)
+                      for result in results)
+
+    # The corners of this grid are filled, so no solution leaves one blank.
+    def corners_blank(location: tuple[int, int]) -> SquareType:
+        return SquareType.BLANK if location in ((1, 1), (10, 8)) else SquareType.FILLED
+
+    square_types = [SquareType.FILLED, corners_blank, SquareType.ANY]
+    filler = CountingFiller(acrosses, downs, width=8, height=10)
+    serial = filler.run_sweep(square_types)
+    assert builds == 1
+    assert [len(results) for results in serial] == [1, 0, 1]
+    parallel = filler.run_sweep(square_types, workers=2)
+    assert builds == 1
+    assert [names(results) for results in parallel] == [names(results) for results in serial]
+    assert names(filler.run()) == names(serial[0])
+
+
 def test_mushed_grid() -> None:
     # fmt: off
     info = (
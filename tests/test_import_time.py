@@ -0,0 +1,23 @@
+"""Check that importing the solver package doesn't load heavy dependencies."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.import_time import SCENARIOS, Scenario, measure
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS, ids=lambda scenario: scenario.name)
+def test_no_unexpected_heavy_imports(scenario: Scenario):
+    _elapsed, loaded = measure(scenario)
+    assert set(loaded) <= scenario.allowed
+
+
+def test_lazy_names_resolve():
+    import solver
+
+    for name in solver.__all__:
+        assert getattr(solver, name) is not None
+    assert set(solver.__all__) <= set(dir(solver))
+    with pytest.raises(AttributeError):
+        _ = solver.NoSuchName
@@ -112,3 +112,21 @@ def test_eq_missing_key():
     orderer = Orderer.EQ("e", {'a', 'b', 'c'})
     with pytest.raises(KeyError):
         orderer.left('z')
+
+@pytest.mark.parametrize('kind', [Orderer.LT, Orderer.LE, Orderer.EQ])
+@pytest.mark.parametrize('count_or_items', [1, 6, 13, {'p', 'q', 'r', 's', 't'}])
+def test_tables_match_left_and_right(kind, count_or_items):
+    orderer = kind("x", count_or_items)
+    items = sorted(count_or_items) if isinstance(count_or_items, set) else range(count_or_items)
+    left_table, right_table = orderer.left_table(), orderer.right_table()
+    assert left_table.keys() == right_table.keys() == set(items)
+    for item in items:
+        assert set(left_table[item]) == orderer.left(item)
+        assert set(right_table[item]) == orderer.right(item)
+
+def test_codes_are_shared():
+    orderer = Orderer.LT("x", 8)
+    left_table, right_table = orderer.left_table(), orderer.right_table()
+    codes = {id(code) for table in (left_table, right_table)
+             for item_codes in table.values() for code in item_codes}
+    assert len(codes) == len(orderer.all_codes())
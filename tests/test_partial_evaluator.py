@@ -0,0 +1,59 @@
+"""Tests for evaluating expressions with some of their letters fixed."""
+
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from solver import Evaluator
+from solver.expression_optimizer import free_letters, optimize
+from solver.partial_evaluator import make_partial_evaluator
+
+EXPRESSIONS = [
+    'AB + DC + AD - √C', '(A + D)(B - C) / 2', 'A^2 + 2AD + B^3 - C!',
+    '√(AD + BC)', '(A - D) / (B - C)', 'A + B',
+]
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_same_values(expression):
+    rng = random.Random(expression)
+    evaluator = Evaluator.create_evaluator(expression)
+    partial_evaluator = make_partial_evaluator(evaluator, 'AD', 'BC')
+    for _ in range(20):
+        fixed = {'A': rng.randint(-3, 12), 'D': rng.randint(-3, 12)}
+        # Binding again for new fixed values must forget the old ones.
+        evaluate = partial_evaluator.bind(fixed)
+        for b, c in itertools.product(range(-2, 8), repeat=2):
+            assert list(evaluate((b, c))) == list(evaluator(fixed | {'B': b, 'C': c}))
+
+
+def test_fixed_operands_are_grouped():
+    tree = optimize(('+', ('+', 'A', 'B'), 'D'), fixed={'A', 'D'})
+    assert tree == ('+', ('+', 'A', 'D'), 'B')
+    tree = optimize(('*', ('*', 'B', 'A'), ('*', 'C', 'D')), fixed={'A', 'D'})
+    assert tree == ('*', ('*', ('*', 'A', 'D'), 'B'), 'C')
+    assert free_letters(('function', 'f', (('+', 'A', 3), 'B'))) == {'A', 'B'}
+
+
+def test_failing_fixed_subtree():
+    evaluator = Evaluator.create_evaluator('√A + B')
+    evaluate = make_partial_evaluator(evaluator, 'A', 'B').bind({'A': 3})
+    assert list(evaluate((6,))) == []
+    evaluate = make_partial_evaluator(evaluator, 'A', 'B').bind({'A': 4})
+    assert list(evaluate((6,))) == ['8']
+
+
+def test_not_partially_evaluated():
+    evaluator = Evaluator.create_evaluator('A + B', wrapper=lambda evaluator, values: ())
+    assert make_partial_evaluator(evaluator, 'A', 'B') is None
+    # All the letters must be either fixed or varying.
+    assert make_partial_evaluator(Evaluator.create_evaluator('A + B + C'), 'A', 'B') is None
+
+
+def test_overridden_functions():
+    evaluator = Evaluator.create_evaluator('A! + B', {'fact': lambda x: 10 * x})
+    evaluate = make_partial_evaluator(evaluator, 'A', 'B').bind({'A': 3})
+    assert list(evaluate((4,))) == ['34']
@@ -0,0 +1,120 @@
+"""Tests for the Playfair square solver."""
+
+from __future__ import annotations
+
+import random
+
+from solver.playfair import (
+    ConstraintRow,
+    PlayfairEncoder,
+    PlayfairScanner,
+    PlayfairSolver,
+    playfair,
+)
+from solver.playfair.playfair_constraints import LETTERS
+from solver.playfair.playfair_scanner import key_squares, trigram_log_probabilities
+
+
+def test_rows_are_consistent_when_their_letters_agree():
+    row = ConstraintRow({'A': (0, 0), 'B': (1, 2)})
+    assert row.is_consistent_with(ConstraintRow({'A': (0, 0), 'C': (4, 4)}))
+    assert row.is_consistent_with(ConstraintRow.empty())
+    # A letter in two places, or two letters in one place.
+    assert not row.is_consistent_with(ConstraintRow({'A': (0, 1)}))
+    assert not row.is_consistent_with(ConstraintRow({'C': (1, 2)}))
+    assert repr(row + ConstraintRow({'Z': (4, 4)})) == 'A....|..B..|.....|.....|....Z'
+    assert row == ConstraintRow.from_string('A......B' + '.' * 17)
+    assert row.missing_letters() == set('CDEFGHIKLMNOPQRSTUVWXYZ')
+
+
+def test_fill_in_tail():
+    # The last twelve squares must be in alphabetical order, and there are just twelve
+    # letters left for them.
+    row = ConstraintRow.from_string('ABCDEFGHIKLMN' + '.' * 12)
+    assert repr(row.fill_in_tail(12)) == 'ABCDE|FGHIK|LMNOP|QRSTU|VWXYZ'
+    # Thirteen letters for twelve squares could go in many ways.
+    row = ConstraintRow.from_string('ABCDEFGHIKLM' + '.' * 13)
+    assert row.fill_in_tail(12) == row
+    # No letter can follow Z in the tail.
+    assert ConstraintRow({'Z': (2, 3)}).fill_in_tail(12) is None
+    # The one letter left goes in the one empty square.
+    row = ConstraintRow.from_string('ABCDEFGHIKLMNOPQRSTUV.XYZ')
+    assert repr(row.fill_in_tail(0)) == 'ABCDE|FGHIK|LMNOP|QRSTU|VWXYZ'
+
+
+def test_solver():
+    plain_text = 'TOPSYTURVYINVERTEDUPSIDEDOWN'
+    # Some of the cipher text is hidden.
+    cipher_text = 'WK..A.YVRUSMI..HFEPBWSEF..SO'
+    encoded = PlayfairEncoder('THISWAYUPBCDEFGKLMNOQRVXZ').encode(plain_text)
+    assert all(x in ('.', y) for x, y in zip(cipher_text, encoded, strict=True))
+    solver = PlayfairSolver(plain_text=plain_text, cipher_text=cipher_text, tail=16)
+    assert [repr(result) for result in solver.solve()] == ['THISW|AYUPB|CDEFG|KLMNO|QRVXZ']
+    assert solver.count == 41
+
+
+def test_dancing_links_backend():
+    solver = PlayfairSolver(plain_text='TOPSYTURVYINVERTEDUPSIDEDOWN',
+                            cipher_text='WK..A.YVRUSMI..HFEPBWSEF..SO', tail=16)
+    assert [repr(result) for result in solver.solve(backend='dancing_links')] == [
+        'THISW|AYUPB|CDEFG|KLMNO|QRVXZ']
+
+
+def test_tail_items_clash_when_out_of_order():
+    def colors(row: ConstraintRow) -> dict[str, str]:
+        return dict(playfair._row_items(row, 12))
+
+    def clash(row1: ConstraintRow, row2: ConstraintRow) -> bool:
+        colors1, colors2 = colors(row1), colors(row2)
+        return any(colors2.get(item, color) != color for item, color in colors1.items())
+
+    # The tail starts at (2, 3).  C then E, with a square between them, is fine.
+    row = ConstraintRow({'C': (2, 4)})
+    assert not clash(row, ConstraintRow({'E': (3, 1)}))
+    # B after C, or D two squares after C, can't be sorted.
+    assert clash(row, ConstraintRow({'B': (3, 0)}))
+    assert clash(row, ConstraintRow({'D': (3, 1)}))
+    # Two letters in one square, and one letter in two squares.
+    assert clash(row, ConstraintRow({'D': (2, 4)}))
+    assert clash(row, ConstraintRow({'C': (0, 0)}))
+
+
+def test_key_squares():
+    keys = ['THISWAYUP', 'JUMBLE', 'BALLOON', '']
+    squares = [''.join(LETTERS[i] for i in square) for square in key_squares(keys)]
+    assert squares[:2] == [PlayfairEncoder(key).box for key in keys[:2]]
+    assert squares[2] == 'BALONCDEFGHIKMPQRSTUVWXYZ'
+    assert squares[3] == LETTERS
+
+
+def test_scanner_finds_the_key():
+    plain_text = 'TOPSYTURVYINVERTEDUPSIDEDOWNANDTHENINSIDEOUTANDBACKTOFRONT'
+    cipher_text = PlayfairEncoder('THISWAYUP').encode(plain_text)
+    rng = random.Random(1)
+    keys = [''.join(rng.sample(LETTERS, 9)) for _ in range(2000)] + ['THISWAYUP']
+    scanner = PlayfairScanner(cipher_text, trigram_log_probabilities(plain_text * 3))
+    decoded = scanner.decode(key_squares(keys[:100]))
+    assert [''.join(LETTERS[i] for i in text) for text in decoded] == [
+        PlayfairEncoder(key).decode(cipher_text) for key in keys[:100]]
+    results = scanner.scan(keys, top=3, chunk_size=500)
+    assert results[0][1] == 'THISWAYUP'
+    assert results[0][2] == plain_text
+    assert results == scanner.scan(keys, top=3, chunk_size=500, workers=2)
+
+
+def test_scan_breaks_ties_the_same_way_for_any_chunks():
+    plain_text = 'TOPSYTURVYINVERTEDUPSIDEDOWNANDTHENINSIDEOUTANDBACKTOFRONT'
+    cipher_text = PlayfairEncoder('THISWAYUP').encode(plain_text)
+    scanner = PlayfairScanner(cipher_text, trigram_log_probabilities(plain_text * 3))
+    # A repeated letter is skipped, so each keyword and its doubled copies give the same
+    # key square, and so tie.
+    rng = random.Random(0)
+    keys = [key[:i] + key[i - 1:] for key in (''.join(rng.sample(LETTERS, 6)) for _ in range(60))
+            for i in range(1, 6)]
+    rng.shuffle(keys)
+    # The best scores, with ties going to the keyword that sorts last.
+    expected = sorted(zip(scanner.score(key_squares(keys)).tolist(), keys, strict=True))[-3:]
+    assert len({score for score, _ in expected}) < 3
+    for chunk_size, workers in ((4096, 1), (7, 1), (50, 1), (50, 2), (1, 1)):
+        results = scanner.scan(keys, top=3, chunk_size=chunk_size, workers=workers)
+        assert [(score, key) for score, key, _ in results] == expected[::-1]
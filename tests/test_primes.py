@@ -0,0 +1,65 @@
+"""Tests for the shared prime sieve and primality test."""
+
+from __future__ import annotations
+
+import random
+
+import more_itertools
+import pytest
+
+from solver import Clue, generators, primes
+from solver.primes import composites_between, is_prime, primes_between
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    """Use tiny segments, so that short ranges cross many segment boundaries."""
+    monkeypatch.setattr(primes, '_SEGMENT_SPAN', 64)
+    monkeypatch.setattr(primes, '_SEGMENT_ODDS', 32)
+    primes._segment.cache_clear()
+    yield
+    primes._segment.cache_clear()
+
+
+@pytest.mark.usefixtures('small_segments')
+def test_primes_between_matches_sieve():
+    expected = list(more_itertools.sieve(5000))
+    assert list(primes_between(0, 5000)) == expected
+    for low, high in ((0, 3), (2, 3), (3, 4), (63, 65), (64, 129), (1000, 1000), (4000, 4097)):
+        assert list(primes_between(low, high)) == [p for p in expected if low <= p < high]
+
+
+@pytest.mark.usefixtures('small_segments')
+def test_composites_between():
+    assert list(composites_between(1, 30)) == [1, 4, 6, 8, 9, 10, 12, 14, 15, 16, 18, 20,
+                                               21, 22, 24, 25, 26, 27, 28]
+    assert list(composites_between(90, 98)) == [90, 91, 92, 93, 94, 95, 96]
+
+
+@pytest.mark.usefixtures('small_segments')
+def test_segment_cache_holds_a_long_range():
+    high = 1024 * primes._SEGMENT_SPAN
+    first = list(primes_between(0, high))
+    misses = primes._segment.cache_info().misses
+    assert list(primes_between(0, high)) == first == list(more_itertools.sieve(high))
+    assert primes._segment.cache_info().misses == misses
+
+
+def test_is_prime():
+    assert [n for n in range(-3, 30) if is_prime(n)] == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    # Strong pseudoprimes to the bases 2, 3, 5 and 7, and a Carmichael number.
+    assert not is_prime(3_215_031_751)
+    assert not is_prime(3_825_123_056_546_413_051)
+    assert not is_prime(9_746_347_772_161)
+    assert is_prime(2 ** 61 - 1)
+    rng = random.Random(42)
+    for _ in range(2000):
+        n = rng.randrange(1, 10 ** rng.randrange(2, 20))
+        assert is_prime(n) == more_itertools.is_prime(n)
+
+
+def test_generators():
+    clue = Clue('1a', True, (1, 1), 3)
+    assert list(generators.prime(clue)) == [p for p in more_itertools.sieve(1000) if p >= 100]
+    assert set(generators.not_prime(clue)) == set(range(100, 1000)) - set(generators.prime(clue))
+    assert list(generators.prime_generator(20, primes=False)) == [2, 9, 15]
@@ -0,0 +1,64 @@
+"""Tests for headless rendering."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from solver import Clue, ConstraintSolver, render_mode, set_render_mode
+from solver.render import HEADLESS_ENVIRONMENT_VARIABLE, grid_lines, rendering
+
+
+@pytest.fixture(autouse=True)
+def reset_render_mode(monkeypatch):
+    monkeypatch.delenv(HEADLESS_ENVIRONMENT_VARIABLE, raising=False)
+    yield
+    set_render_mode(None)
+
+
+def make_solver() -> ConstraintSolver:
+    def gen(*values):
+        return lambda clue: values
+
+    clue_1a = Clue('1a', True, (1, 1), 2, generator=gen('12', '34'))
+    clue_1d = Clue('1d', False, (1, 1), 2, generator=gen('35'))
+    return ConstraintSolver([clue_1a, clue_1d])
+
+
+def test_grid_lines():
+    lines = grid_lines(max_row=3, max_column=3,
+                       clued_locations={(1, 1), (1, 2), (2, 1)},
+                       location_to_entry={(1, 1): '3', (1, 2): '4'})
+    assert lines == ['3 4', '. #']
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('', 'graphics'), ('0', 'graphics'), ('1', 'text'), ('true', 'text'),
+    ('json', 'json'), ('none', 'none'),
+])
+def test_environment_variable(monkeypatch, value, expected):
+    monkeypatch.setenv(HEADLESS_ENVIRONMENT_VARIABLE, value)
+    assert render_mode() == expected
+
+
+def test_rendering_context_restores_mode(monkeypatch):
+    monkeypatch.setenv(HEADLESS_ENVIRONMENT_VARIABLE, 'json')
+    with rendering(False):
+        assert render_mode() == 'json'
+    with rendering(True):
+        assert render_mode() == 'graphics'
+    assert render_mode() == 'json'
+
+
+def test_solve_render_false_prints_text(capsys):
+    make_solver().solve(show_time=False, render=False)
+    assert capsys.readouterr().out.splitlines()[:2] == ['3 4', '5 #']
+    assert render_mode() == 'graphics'
+
+
+def test_json_mode(capsys):
+    set_render_mode('json')
+    make_solver().solve(show_time=False)
+    data = json.loads(capsys.readouterr().out)
+    assert data == {'grid': ['3 4', '5 #'], 'clues': {'1a': '34', '1d': '35'}}
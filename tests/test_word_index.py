@@ -0,0 +1,81 @@
+"""Tests for the compiled word index."""
+
+from __future__ import annotations
+
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from solver.word_index import WordIndex
+
+SYLLABLES = [consonant + vowel for consonant in "BCDLMNRST" for vowel in "AEIOU"] + ["ING", "S"]
+
+
+@pytest.fixture(scope='module')
+def words() -> list[str]:
+    rng = random.Random(47)
+    return sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(1, 4))) for _ in range(3000)})
+
+
+@pytest.fixture(scope='module')
+def index(words) -> WordIndex:
+    return WordIndex.from_words(words)
+
+
+def test_contains_and_iterates_over_the_words(words, index):
+    assert len(index) == len(words)
+    assert list(index) == words
+    assert all(word in index for word in words)
+    assert not any(word + 'Q' in index or word[:-1] in index
+                   for word in words if word[:-1] not in words)
+    assert '' not in index and 3 not in index
+
+
+def test_patterns_and_lengths(words, index):
+    for pattern in ('BA..', '..NA..', 'M.....ING', 'S', '.' * 6, 'XYZ', '.' * 70):
+        assert list(index.match(pattern)) == [word for word in words
+                                              if re.fullmatch(pattern, word)]
+    assert list(index.words(5)) == [word for word in words if len(word) == 5]
+    assert list(index.match('......', distinct=True)) == [
+        word for word in words if len(word) == len(set(word)) == 6]
+
+
+def test_anagrams(words, index):
+    for word in words[::100]:
+        expected = [other for other in words if Counter(other) == Counter(word)]
+        assert list(index.anagrams(word[::-1].lower())) == expected
+
+
+def test_normalization():
+    index = WordIndex.from_words(["can't", 'Jay-walk', 'naïve', 'two words', 'JAY'],
+                                 fold={'J': 'I'})
+    assert list(index) == ['CANT', 'IAY', 'IAYWALK', 'TWOWORDS']
+    # Lookups are normalized the same way.
+    assert 'jay' in index and 'JAY' in index and "Can't" in index and 'Two Words' in index
+    assert 'JA' not in index and 'naïve' not in index
+    assert list(index.match('j.y')) == ['IAY']
+    assert list(index.anagrams('yaj')) == ['IAY']
+
+
+def test_from_file_is_cached(tmp_path, words):
+    path = tmp_path / 'words.txt'
+    path.write_text('\n'.join(words))
+    directory = tmp_path / 'cache'
+    index = WordIndex.from_file(path, directory=directory)
+    cached = list(directory.iterdir())
+    assert len(cached) == 1
+    # A second load maps the saved index, rather than compiling again.
+    cached[0].touch()
+    modified = cached[0].stat().st_mtime_ns
+    again = WordIndex.from_file(path, directory=directory)
+    assert list(again) == list(index) == words
+    folded = WordIndex.from_file(path, directory=directory, fold={'J': 'I'})
+    assert all(word.replace('I', 'J').lower() in folded for word in words[:10])
+    assert cached[0].stat().st_mtime_ns == modified
+    # A different fold, or a changed word list, is compiled separately.
+    WordIndex.from_file(path, directory=directory, fold={'J': 'I'})
+    assert len(list(directory.iterdir())) == 2
+    path.write_text('\n'.join(words[:10]))
+    assert len(WordIndex.from_file(path, directory=directory)) == 10